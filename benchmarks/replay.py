@@ -0,0 +1,224 @@
+import os
+import re
+import csv
+import json
+from datetime import datetime, timedelta
+
+from utils.records import VideoRecord
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_VK_ITEM_RE = re.compile(r'<div class="VideoHighlights__item">.*?</div>\s*</div>', re.S)
+_TIKTOK_CARD_RE = re.compile(r'<div data-e2e="search-card-item".*?</div>\s*(?=<div data-e2e|</div>\s*</div>\s*</body>)', re.S)
+
+
+def load_fixture(name):
+    """Читает файл фикстуры как текст"""
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_youtube_infos():
+    """Возвращает записанные метаданные видео yt-dlp"""
+    return json.loads(load_fixture("youtube_info.json"))
+
+
+def scale_youtube_infos(count, now=None):
+    """
+    Размножает записанные метаданные yt-dlp до нужного количества
+
+    Даты переносятся относительно now, чтобы доля видео внутри окна
+    фильтра не зависела от дня запуска бенчмарка.
+
+    Args:
+        count (int): Количество видео
+        now (datetime, optional): Момент отсчета
+
+    Returns:
+        list: Список словарей метаданных с уникальными ID
+    """
+    now = now or datetime.now()
+    templates = load_youtube_infos()
+    result = []
+    for i in range(count):
+        info = dict(templates[i % len(templates)])
+        info['id'] = f"{info['id']}{i:07d}"
+        age = timedelta(days=i % 45, hours=i % 24)
+        for field in ('timestamp', 'release_timestamp'):
+            if info.get(field):
+                info[field] = int((now - age).timestamp())
+        if info.get('upload_date'):
+            info['upload_date'] = (now - age).strftime('%Y%m%d')
+        result.append(info)
+    return result
+
+
+def scale_vk_page(count):
+    """Собирает страницу клипов VK с count элементами из записанной страницы"""
+    html = load_fixture("vk_clips.html")
+    items = _VK_ITEM_RE.findall(html)
+    clones = []
+    for i in range(count):
+        item = items[i % len(items)]
+        clones.append(re.sub(r'_(\d+)"', lambda m: f'_{m.group(1)}{i:07d}"', item, count=1))
+    start = html.index(items[0])
+    end = html.index(items[-1]) + len(items[-1])
+    return html[:start] + "\n".join(clones) + html[end:]
+
+
+def scale_vk_api_response(count, now=None):
+    """
+    Размножает записанный ответ video.search API VK до count клипов
+
+    Даты переносятся так, чтобы самый новый клип был опубликован за час до now.
+
+    Returns:
+        dict: Содержимое поля response (items, profiles, groups, count)
+    """
+    now = now or datetime.now()
+    response = json.loads(load_fixture("vk_video_search.json"))['response']
+    items = response['items']
+    shift = now.timestamp() - 3600 - max(item['date'] for item in items)
+    clones = []
+    for i in range(count):
+        item = dict(items[i % len(items)])
+        item['id'] = int(f"{item['id']}{i:07d}")
+        item['date'] = int(item['date'] + shift)
+        clones.append(item)
+    return {**response, 'count': count, 'items': clones}
+
+
+def scale_tiktok_page(count):
+    """Собирает страницу поиска TikTok с count карточками"""
+    html = load_fixture("tiktok_search.html")
+    cards = _TIKTOK_CARD_RE.findall(html)
+    clones = []
+    for i in range(count):
+        card = cards[i % len(cards)]
+        clones.append(re.sub(r'/video/(\d+)"', lambda m: f'/video/{m.group(1)}{i:07d}"', card, count=1))
+    start = html.index(cards[0])
+    end = html.index(cards[-1]) + len(cards[-1])
+    return html[:start] + "\n".join(clones) + html[end:]
+
+
+def scale_instagram_page(count):
+    """Собирает страницу хэштега Instagram с count постами в window._sharedData"""
+    html = load_fixture("instagram_tag.html")
+    prefix = 'window._sharedData = '
+    start = html.index(prefix) + len(prefix)
+    end = html.index(';</script>', start)
+    shared_data = json.loads(html[start:end])
+    media = shared_data['entry_data']['TagPage'][0]['graphql']['hashtag']['edge_hashtag_to_media']
+    templates = media['edges']
+    edges = []
+    for i in range(count):
+        edge = json.loads(json.dumps(templates[i % len(templates)]))
+        edge['node']['shortcode'] += f"{i:07d}"
+        edges.append(edge)
+    media['edges'] = edges
+    return html[:start] + json.dumps(shared_data, ensure_ascii=False) + html[end:]
+
+
+def make_records(count, now=None):
+    """
+    Создает синтетические записи VideoRecord на основе заголовков из фикстур
+
+    Args:
+        count (int): Количество записей
+        now (datetime, optional): Момент сбора
+
+    Returns:
+        list: Список записей VideoRecord
+    """
+    now = (now or datetime.now()).replace(microsecond=0)
+    titles = [info['title'] for info in load_youtube_infos()]
+    titles += [m.strip() for m in re.findall(r'__description">([^<]+)<', load_fixture("vk_clips.html"))]
+    platforms = ('YouTube Shorts', 'VK Клипы', 'TikTok', 'Instagram Reels')
+    records = []
+    for i in range(count):
+        views = (i * 7919) % 5_000_000 + 100
+        records.append(VideoRecord(
+            platform=platforms[i % len(platforms)],
+            video_id=f"bench{i:07d}",
+            title=titles[i % len(titles)],
+            url=f"https://example.com/video/{i}",
+            views=views,
+            likes=views // 25,
+            comments=views // 900,
+            shares=views // 3000,
+            publish_date=now - timedelta(days=i % 30),
+            channel=f"channel{i % 97}",
+            query="funny cats",
+            collected_at=now
+        ))
+    return records
+
+
+def write_history_csv(path, count):
+    """
+    Записывает CSV-файл истории с count строками на основе записанного образца
+
+    Args:
+        path (str): Путь к файлу
+        count (int): Количество строк
+    """
+    with open(os.path.join(FIXTURES_DIR, "history_sample.csv"), 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        templates = list(reader)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(count):
+            row = dict(templates[i % len(templates)])
+            row['video_id'] = f"{row['video_id']}{i:07d}"
+            writer.writerow(row)
+
+
+class StaticElement:
+    """Элемент статической страницы с интерфейсом, который используют парсеры Selenium"""
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self):
+        return self._tag.get_text(" ", strip=True)
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def find_element(self, by, selector):
+        found = self._tag.select_one(selector)
+        if found is None:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(selector)
+        return StaticElement(found)
+
+    def find_elements(self, by, selector):
+        return [StaticElement(tag) for tag in self._tag.select(selector)]
+
+
+class StaticPageDriver(StaticElement):
+    """
+    Воспроизводит сохраненную HTML-страницу вместо WebDriver
+
+    Поддерживает только поиск элементов по CSS-селекторам: этого достаточно,
+    чтобы прогонять функции извлечения данных без браузера и сети.
+    """
+
+    def __init__(self, html):
+        from bs4 import BeautifulSoup
+        super().__init__(BeautifulSoup(html, 'html.parser'))
+        self.page_source = html
+
+    def execute_script(self, script, *args):
+        return None
+
+    def quit(self):
+        pass
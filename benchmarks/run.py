@@ -0,0 +1,360 @@
+"""
+Набор бенчмарков парсеров и этапов анализа на записанных фикстурах
+
+Запуск (из корня проекта, сеть не требуется):
+    python -m benchmarks.run --scales 1000 10000 100000 --out bench.json
+    python -m benchmarks.run --only viral --compare bench.json
+    python -m benchmarks.run --only import
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import replay
+
+DEFAULT_SCALES = (1000, 10000, 100000)
+# Порог замедления медианы относительно предыдущего запуска, при котором выводится предупреждение
+REGRESSION_THRESHOLD = 1.10
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Бюджет времени импорта точек входа (мс, накопленное время по -X importtime)
+IMPORT_BUDGETS_MS = {'main': 150, 'pipeline': 150, 'scheduler': 150}
+# Зависимости, которые не должны загружаться при импорте точек входа:
+# они нужны только при обращении к конкретной платформе или для --visualize
+HEAVY_MODULES = ('yt_dlp', 'selenium', 'requests', 'bs4', 'lxml', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'nltk')
+
+BENCHMARKS = []
+
+
+def benchmark(name, max_scale=None, workdir=False):
+    """
+    Регистрирует бенчмарк
+
+    Декорируемая функция получает масштаб и возвращает функцию без аргументов,
+    время выполнения которой измеряется (подготовка данных в замер не входит),
+    либо пару (функция, подготовка): подготовка вызывается перед каждым
+    повтором вне замера, а ее результат передается функции.
+
+    Args:
+        name (str): Имя бенчмарка
+        max_scale (int, optional): Максимальный масштаб (для медленных DOM-бенчмарков)
+        workdir (bool): Передать вторым аргументом временный каталог; он удаляется после замера
+    """
+    def decorator(setup):
+        BENCHMARKS.append({'name': name, 'setup': setup, 'max_scale': max_scale, 'workdir': workdir})
+        return setup
+    return decorator
+
+
+@benchmark("youtube.post_processing")
+def bench_youtube_post_processing(scale):
+    from parsers.youtube_parser import _build_video_record
+    infos = replay.scale_youtube_infos(scale)
+    query = "funny cats"
+    query_words = query.split()
+
+    def run():
+        results = []
+        for info in infos:
+            record = _build_video_record(info, query, query_words, True)
+            if record is not None and (record.days_ago or 0) <= 30:
+                results.append(record)
+        return results
+    return run
+
+
+@benchmark("vk.extract_clips_data", max_scale=10000)
+def bench_vk_extract_clips_data(scale):
+    from parsers.vk_parser import extract_clips_data
+    driver = replay.StaticPageDriver(replay.scale_vk_page(scale))
+    cutoff_date = datetime.now() - timedelta(days=30)
+    return lambda: extract_clips_data(driver, scale, "смешные коты", cutoff_date, set())
+
+
+@benchmark("tiktok.extract_search_cards", max_scale=10000)
+def bench_tiktok_extract_search_cards(scale):
+    from parsers.tiktok_parser import extract_search_cards
+    page = replay.scale_tiktok_page(scale)
+    return lambda: extract_search_cards(page, "funny cats", scale)
+
+
+@benchmark("instagram.extract_tag_page_posts")
+def bench_instagram_extract_tag_page_posts(scale):
+    from parsers.instagram_parser import extract_tag_page_posts
+    page = replay.scale_instagram_page(scale)
+    return lambda: extract_tag_page_posts(page, "funny cats", scale)
+
+
+@benchmark("viral_metrics.calculate_viral_score")
+def bench_calculate_viral_score(scale):
+    from utils.viral_metrics import calculate_viral_score
+    now = datetime.now()
+    previous = replay.make_records(scale, now - timedelta(hours=6))
+    # Половина текущих видео встречалась в предыдущем замере
+    current_template = replay.make_records(scale, now)
+    for record in current_template[scale // 2:]:
+        record.video_id += "_new"
+
+    def prepare():
+        return [_copy_record(r) for r in current_template]
+
+    return (lambda current: calculate_viral_score(current, previous)), prepare
+
+
+@benchmark("storage.save_to_csv", workdir=True)
+def bench_save_to_csv(scale, workdir):
+    from utils.storage import save_to_csv
+    records = replay.make_records(scale)
+    filename = os.path.join(workdir, "history", "viral_videos_bench.csv")
+    return lambda: save_to_csv(records, filename)
+
+
+@benchmark("storage.load_previous_data", workdir=True)
+def bench_load_previous_data(scale, workdir):
+    from utils.storage import load_previous_data
+    replay.write_history_csv(os.path.join(workdir, "data", "history", "viral_videos_funny_cats_bench.csv"), scale)
+
+    def run():
+        # load_previous_data ищет историю относительно текущего каталога
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            return load_previous_data("funny cats")
+        finally:
+            os.chdir(cwd)
+    return run
+
+
+def _report_benchmark(function_name, uses_records=False, with_query=False):
+    """Регистрирует бенчмарк функции анализа из html_report"""
+    def setup(scale):
+        from visualization import html_report
+        analyze = getattr(html_report, function_name)
+        records = replay.make_records(scale)
+        if uses_records:
+            return lambda: analyze(records)
+        titles = [record.title for record in records]
+        if with_query:
+            return lambda: analyze(titles, "funny cats")
+        return lambda: analyze(titles)
+    benchmark(f"html_report.{function_name}")(setup)
+
+
+_report_benchmark("analyze_keywords")
+_report_benchmark("analyze_keyword_phrases")
+_report_benchmark("analyze_question_keywords")
+_report_benchmark("analyze_matching_keywords", with_query=True)
+_report_benchmark("analyze_keywords_by_views", uses_records=True)
+
+
+def _copy_record(record):
+    """Копия записи, чтобы каждый повтор начинался с одинаковых данных"""
+    copy = record.__class__.__new__(record.__class__)
+    for slot in record.__slots__:
+        setattr(copy, slot, getattr(record, slot))
+    return copy
+
+
+def run_benchmark(entry, scale, repeat):
+    """
+    Выполняет один бенчмарк на одном масштабе
+
+    Returns:
+        dict: Результат измерения (или причина пропуска)
+    """
+    result = {'name': entry['name'], 'scale': scale}
+    with contextlib.ExitStack() as stack:
+        args = (scale,)
+        if entry.get('workdir'):
+            args += (stack.enter_context(tempfile.TemporaryDirectory(prefix="bench_")),)
+        try:
+            func = entry['setup'](*args)
+        except ImportError as e:
+            result.update(status='skipped', reason=f"нет зависимости: {e}")
+            return result
+        func, prepare = func if isinstance(func, tuple) else (func, None)
+
+        timings = []
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(repeat):
+                if prepare is None:
+                    start = time.perf_counter()
+                    func()
+                else:
+                    prepared = prepare()
+                    start = time.perf_counter()
+                    func(prepared)
+                timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    result.update(
+        status='ok',
+        repeat=repeat,
+        min=round(min(timings), 6),
+        median=round(median, 6),
+        mean=round(statistics.mean(timings), 6),
+        per_item_us=round(median / scale * 1e6, 3) if scale else None,
+    )
+    return result
+
+
+def measure_import(module):
+    """
+    Измеряет импорт модуля в отдельном процессе с -X importtime
+
+    Returns:
+        tuple: (накопленное время импорта в секундах, загруженные тяжелые зависимости)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, check=True, cwd=PROJECT_ROOT)
+    total = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        # Формат строки: "import time: self [us] | cumulative | imported package"
+        fields = line.split('|')
+        if not line.startswith('import time:') or len(fields) != 3:
+            continue
+        try:
+            cumulative = int(fields[1])
+        except ValueError:
+            continue  # Заголовок
+        name = fields[2].strip()
+        if name.split('.')[0] in HEAVY_MODULES:
+            loaded.add(name.split('.')[0])
+        if name == module:
+            total = cumulative
+    return total / 1e6, sorted(loaded)
+
+
+def run_import_benchmark(module, repeat):
+    """
+    Проверяет время импорта точки входа и отсутствие тяжелых зависимостей
+
+    Returns:
+        dict: Результат измерения (масштаб всегда 1)
+    """
+    result = {'name': f"import.{module}", 'scale': 1}
+    try:
+        # Первый запуск компилирует байткод и не учитывается
+        measure_import(module)
+        measurements = [measure_import(module) for _ in range(repeat)]
+    except subprocess.CalledProcessError as e:
+        result.update(status='skipped', reason=f"ошибка импорта: {e.stderr.strip().splitlines()[-1]}")
+        return result
+
+    timings = [timing for timing, _ in measurements]
+    median = statistics.median(timings)
+    budget = IMPORT_BUDGETS_MS[module]
+    result.update(
+        status='ok',
+        repeat=repeat,
+        min=round(min(timings), 6),
+        median=round(median, 6),
+        mean=round(statistics.mean(timings), 6),
+        budget_ms=budget,
+        over_budget=median * 1000 > budget,
+        heavy_modules=sorted({name for _, loaded in measurements for name in loaded}),
+    )
+    return result
+
+
+def _git_revision():
+    """Текущий коммит (если проект находится в git-репозитории)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_results(current, previous_path):
+    """
+    Сравнивает медианы с результатами предыдущего запуска
+
+    Args:
+        current (list): Текущие результаты
+        previous_path (str): Путь к JSON-файлу предыдущего запуска
+    """
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r['name'], r['scale']): r for r in json.load(f)['results'] if r.get('status') == 'ok'}
+
+    print(f"\nСравнение с {previous_path}:")
+    for result in current:
+        old = previous.get((result['name'], result['scale']))
+        if result.get('status') != 'ok' or not old or not old['median']:
+            continue
+        ratio = result['median'] / old['median']
+        mark = "  <-- замедление" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"  {result['name']:<45} {result['scale']:>7}  x{ratio:.2f}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарки парсеров и этапов анализа')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help='Количество видео для каждого прогона')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество повторов каждого замера')
+    parser.add_argument('--only', type=str, default=None, help='Запускать только бенчмарки, имя которых содержит строку')
+    parser.add_argument('--out', type=str, default=None, help='Путь к JSON-файлу с результатами')
+    parser.add_argument('--compare', type=str, default=None, help='JSON-файл предыдущего запуска для сравнения')
+    args = parser.parse_args(argv)
+
+    results = []
+    for entry in BENCHMARKS:
+        if args.only and args.only not in entry['name']:
+            continue
+        for scale in args.scales:
+            if entry['max_scale'] and scale > entry['max_scale']:
+                continue
+            result = run_benchmark(entry, scale, args.repeat)
+            results.append(result)
+            if result['status'] == 'ok':
+                print(f"{result['name']:<45} {scale:>7}  median {result['median']:.4f} с  ({result['per_item_us']} мкс/видео)")
+            else:
+                print(f"{result['name']:<45} {scale:>7}  пропущен ({result['reason']})")
+
+    for module in IMPORT_BUDGETS_MS:
+        if args.only and args.only not in f"import.{module}":
+            continue
+        result = run_import_benchmark(module, args.repeat)
+        results.append(result)
+        if result['status'] != 'ok':
+            print(f"{result['name']:<45} {1:>7}  пропущен ({result['reason']})")
+            continue
+        marks = ""
+        if result['over_budget']:
+            marks += "  <-- превышен бюджет"
+        if result['heavy_modules']:
+            marks += f"  <-- загружены: {', '.join(result['heavy_modules'])}"
+        print(f"{result['name']:<45} {1:>7}  median {result['median'] * 1000:.1f} мс "
+              f"(бюджет {result['budget_ms']} мс){marks}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'revision': _git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+    out = args.out or os.path.join("benchmarks", "results", f"bench_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {out}")
+
+    if args.compare:
+        compare_results(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Локальная заглушка API VK для проверки сбора клипов по HTTP без сети
+
+Отдает записанный ответ video.search (fixtures/vk_video_search.json),
+размноженный до --total клипов, с постраничной выдачей по offset и count.
+Токен STUB_INVALID_TOKEN имитирует отклоненную авторизацию (ошибка 5),
+после которой сборщик переключается на браузер.
+
+Запуск (из корня проекта):
+    python -m benchmarks.vk_stub --port 8765 --total 500
+    VK_API_URL=http://127.0.0.1:8765/method VK_API_TOKEN=stub python main.py --query "коты" --platforms vk
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import replay
+
+STUB_INVALID_TOKEN = "invalid"
+
+
+def make_handler(response):
+    """
+    Создает обработчик запросов, отдающий клипы из response
+
+    Args:
+        response (dict): Полный ответ video.search (см. replay.scale_vk_api_response)
+    """
+
+    # sort=0 - выдача по дате добавления, как в API
+    by_date = sorted(response['items'], key=lambda item: item['date'], reverse=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path.rstrip('/') != "/method/video.search":
+                self._send(404, {'error': {'error_code': 3, 'error_msg': 'Unknown method passed'}})
+            elif params.get('access_token') in (None, '', STUB_INVALID_TOKEN):
+                self._send(200, {'error': {'error_code': 5, 'error_msg': 'User authorization failed'}})
+            else:
+                offset = int(params.get('offset', 0))
+                count = int(params.get('count', 20))
+                items = by_date if params.get('sort') == '0' else response['items']
+                page = {**response, 'items': items[offset:offset + count]}
+                self._send(200, {'response': page})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub(total=500, port=0):
+    """
+    Запускает заглушку в фоновом потоке
+
+    Args:
+        total (int): Количество клипов в выдаче
+        port (int): Порт (0 - любой свободный)
+
+    Returns:
+        tuple: (сервер, адрес для VK_API_URL); остановка - server.shutdown()
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(replay.scale_vk_api_response(total)))
+    threading.Thread(target=server.serve_forever, name="vk_stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/method"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Локальная заглушка API VK (video.search)')
+    parser.add_argument('--port', type=int, default=8765, help='Порт сервера')
+    parser.add_argument('--total', type=int, default=500, help='Количество клипов в выдаче')
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(replay.scale_vk_api_response(args.total)))
+    print(f"Заглушка API VK: VK_API_URL=http://127.0.0.1:{args.port}/method")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
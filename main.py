@@ -1,39 +1,84 @@
 import argparse
-import time
 import os
-import csv
-import webbrowser
 from datetime import datetime
 
-# Импорт парсеров
-from parsers.youtube_parser import parse_youtube_shorts
-from parsers.vk_parser import parse_vk_clips
-from parallel_processing import run_parallel_search
+# Сбор и анализ данных (парсеры импортируются при первом обращении к платформе)
+from pipeline import Session, make_job, load_jobs, parse_platforms, collect, score_and_store, run_batch
+from parsers.registry import has_capability
 
 # Утилиты
-from utils.viral_metrics import calculate_viral_score
-from utils.storage import save_to_csv, load_previous_data
+from utils import instrumentation
+from utils.instrumentation import span
+from utils.log import setup_logging, get_logger
+from utils import profiling
+
+logger = get_logger("main")
 
 def main():
     parser = argparse.ArgumentParser(description='Парсер виральных видео')
-    parser.add_argument('--query', type=str, required=True, help='Поисковый запрос или тематика')
+    parser.add_argument('--query', type=str, default=None, help='Поисковый запрос или тематика')
+    parser.add_argument('--queries-file', type=str, default=None,
+                        help='Файл с запросами для пакетного режима: текст (запрос в строке) или JSON '
+                             'с параметрами limit, days, platforms, priority для каждого запроса')
     parser.add_argument('--limit', type=int, default=200, help='Максимальное количество видео для сбора')
     parser.add_argument('--days', type=int, default=30, help='Только видео за последние N дней')
     parser.add_argument('--visualize', action='store_true', help='Создать визуализацию результатов')
-    parser.add_argument('--parallel', action='store_true', help='Использовать многопроцессорную обработку')
-    parser.add_argument('--workers', type=int, default=0, help='Количество параллельных процессов (0 = авто)')
+    parser.add_argument('--parallel', action='store_true', help='Параллельный сбор: YouTube - в нескольких процессах, VK - в нескольких браузерах')
+    parser.add_argument('--workers', type=int, default=0, help='Количество параллельных процессов или браузеров (0 = авто)')
     parser.add_argument('--strict-match', action='store_true', help='Строгая проверка наличия запроса в контенте')
+    parser.add_argument('--recent-first', action='store_true',
+                        help='YouTube: искать по дате загрузки и останавливаться на видео старше --days')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help='VK: число вкладок одного браузера, ищущих варианты запроса параллельно')
     parser.add_argument('--platforms', type=str, default='youtube', 
-                        help='Платформы для сбора данных (youtube,vk или all)')
+                        help='Платформы для сбора данных (youtube,vk,tiktok,instagram или all)')
     parser.add_argument('--no-headless', action='store_true', 
                         help='Показывать браузер при парсинге (для отладки)')
     parser.add_argument('--browser-profile', type=str, default=None,
                         help='Путь к профилю браузера для использования существующих cookies')
+    parser.add_argument('--full-browser', action='store_true',
+                        help='Загружать в браузере изображения, шрифты и медиа (по умолчанию отключены для скорости)')
     parser.add_argument('--manual-auth', action='store_true',
                         help='Включить паузу для ручной авторизации')
+    parser.add_argument('--log-level', type=str, default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Уровень логирования (DEBUG - подробный вывод по каждому видео)')
+    parser.add_argument('--metrics-out', type=str, default=None,
+                        help='Сохранить время этапов и счетчики в файл (*.prom - формат Prometheus, иначе JSON lines)')
+    parser.add_argument('--profile', type=str, choices=profiling.MODES, default=None,
+                        help='Профилировать запуск: cprofile - точный профиль, sample - сэмплирование для долгих запусков')
+    parser.add_argument('--profile-out', type=str, default=None,
+                        help='Каталог для файлов профиля (по умолчанию profiles/<время запуска>)')
     
     args = parser.parse_args()
+    if not args.query and not args.queries_file:
+        parser.error("укажите --query или --queries-file")
+    setup_logging(args.log_level)
+
+    execute = run_queries_file if args.queries_file else run
+    if args.profile:
+        profile_dir = args.profile_out or os.path.join("profiles", datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+        profiling.start(args.profile, profile_dir)
+        try:
+            execute(args)
+        finally:
+            profiling.stop()
+            profiling.print_summary(profile_dir)
+            print(f"\nФайлы профиля сохранены в {profile_dir}")
+    else:
+        execute(args)
+
+    instrumentation.print_summary()
+    if args.metrics_out:
+        print(f"Метрики сохранены в {instrumentation.export(args.metrics_out)}")
+
+def run(args):
+    """
+    Выполняет сбор, анализ и сохранение данных по параметрам командной строки
     
+    Args:
+        args (argparse.Namespace): Параметры запуска
+    """
     print(f"Начинаю сбор данных по запросу: '{args.query}' за последние {args.days} дней")
     
     # Создаем директории
@@ -41,110 +86,56 @@ def main():
     os.makedirs("data/history", exist_ok=True)
     os.makedirs("visualization/output", exist_ok=True)
     
-    # Собираем данные с выбранных платформ
-    all_results = []
+    # Задание сбора и общие ресурсы (браузер, yt-dlp, история)
+    job = make_job(
+        args.query,
+        limit=args.limit,
+        days=args.days,
+        platforms=args.platforms,
+        parallel=args.parallel,
+        workers=args.workers,
+        strict_match=args.strict_match,
+        recent_first=args.recent_first,
+        tabs=args.tabs
+    )
     
-    # Определяем платформы для сбора данных
-    platforms = args.platforms.lower().split(',')
-    if 'all' in platforms:
-        platforms = ['youtube', 'vk']
+    if args.manual_auth and any(has_capability(platform, 'manual_auth')
+                                for platform in parse_platforms(job['platforms'])):
+        print("\n========== ИНСТРУКЦИЯ ПО РУЧНОЙ АВТОРИЗАЦИИ ==========")
+        print("1. В открывшемся окне браузера войдите в свой аккаунт VK, если требуется")
+        print("2. После успешного входа скрипт автоматически продолжит работу")
+        print("========================================================\n")
     
-    # Сбор данных с YouTube
-    if 'youtube' in platforms:
-        print(f"Сбор данных с YouTube Shorts...")
-        start_time = time.time()
+    with Session(headless=not args.no_headless, browser_profile=args.browser_profile,
+                 lean_browser=not args.full_browser) as session:
+        # Собираем данные с выбранных платформ
+        all_results = []
+        for platform_results in collect(job, session).values():
+            all_results.extend(platform_results)
         
-        try:
-            # Определяем метод сбора данных - параллельный или последовательный
-            if args.parallel:
-                print(f"Используется многопроцессорная обработка")
-                youtube_results = run_parallel_search(
-                    main_query=args.query,
-                    limit=args.limit,
-                    days_ago=args.days,
-                    max_workers=args.workers if args.workers > 0 else None,
-                    strict_query_match=args.strict_match
-                )
-            else:
-                print(f"Используется однопоточная обработка")
-                youtube_results = parse_youtube_shorts(
-                    query=args.query,
-                    limit=args.limit,
-                    days_ago=args.days,
-                    strict_query_match=args.strict_match
-                )
-                
-            all_results.extend(youtube_results)
-            elapsed = time.time() - start_time
-            print(f"Сбор данных с YouTube занял {elapsed:.2f} секунд. Собрано {len(youtube_results)} видео")
-        except Exception as e:
-            print(f"Ошибка при сборе данных с YouTube Shorts: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    # Сбор данных с VK
-    if 'vk' in platforms:
-        print(f"Сбор данных с VK Клипов...")
-        start_time = time.time()
-        
-        try:
-            if args.manual_auth:
-                print("\n========== ИНСТРУКЦИЯ ПО РУЧНОЙ АВТОРИЗАЦИИ ==========")
-                print("1. В открывшемся окне браузера войдите в свой аккаунт VK, если требуется")
-                print("2. После успешного входа скрипт автоматически продолжит работу")
-                print("========================================================\n")
-            
-            vk_results = parse_vk_clips(
-                query=args.query,
-                limit=args.limit,
-                days_ago=args.days,
-                headless=not args.no_headless,
-                browser_profile=args.browser_profile
-            )
-            
-            all_results.extend(vk_results)
-            elapsed = time.time() - start_time
-            print(f"Сбор данных с VK занял {elapsed:.2f} секунд. Собрано {len(vk_results)} видео")
-        except Exception as e:
-            print(f"Ошибка при сборе данных с VK Клипов: {e}")
-            import traceback
-            traceback.print_exc()
+        # Расчет метрик виральности относительно прошлого замера и сохранение
+        results_with_metrics = score_and_store(args.query, all_results, session) if all_results else []
     
-    # Загрузка предыдущих данных для сравнения
-    previous_data = load_previous_data(args.query)
-    
-    # Расчет метрик виральности
-    if all_results:
-        results_with_metrics = calculate_viral_score(all_results, previous_data)
-        
-        # Сохранение результатов
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"data/viral_videos_{args.query.replace(' ', '_')}_{timestamp}.csv"
-        save_to_csv(results_with_metrics, filename)
-        
-        # Сохранение копии для истории
-        history_filename = f"data/history/viral_videos_{args.query.replace(' ', '_')}_{timestamp}.csv"
-        save_to_csv(results_with_metrics, history_filename)
-        
+    if results_with_metrics:
         print(f"Всего собрано {len(results_with_metrics)} видео")
         
         # Показываем топ-10 по виральности с указанием платформы
         print("\nТоп-10 самых виральных видео:")
         for i, item in enumerate(results_with_metrics[:min(10, len(results_with_metrics))], 1):
-            title = item.get('title', '')
+            title = item.title
             if isinstance(title, str) and len(title) > 40:
                 title = title[:37] + "..."
                 
-            platform = item.get('platform', 'Неизвестно')
-            print(f"{i}. [{platform}] {title}")
-            print(f"   👁️ {item.get('views', 'N/A')} | 👍 {item.get('likes', 'N/A')} | 💬 {item.get('comments', 'N/A')}")
-            print(f"   📅 Опубликовано: {item.get('publish_date_formatted', 'N/A')} ({item.get('days_ago', 'N/A')} дней назад)")
-            print(f"   URL: {item.get('url', 'N/A')}")
+            days_ago = item.days_ago if item.days_ago is not None else 'N/A'
+            print(f"{i}. [{item.platform}] {title}")
+            print(f"   👁️ {item.views} | 👍 {item.likes} | 💬 {item.comments}")
+            print(f"   📅 Опубликовано: {item.publish_date_formatted} ({days_ago} дней назад)")
+            print(f"   URL: {item.url}")
         
         # Выводим статистику по платформам
         platforms_stats = {}
         for item in results_with_metrics:
-            platform = item.get('platform', 'Неизвестно')
+            platform = item.platform
             if platform not in platforms_stats:
                 platforms_stats[platform] = 0
             platforms_stats[platform] += 1
@@ -155,10 +146,12 @@ def main():
         
         # Визуализация если требуется
         if args.visualize:
+            import webbrowser
             try:
                 # Сначала пробуем создать HTML-отчет (без зависимостей)
                 from visualization.html_report import generate_html_report
-                html_file = generate_html_report(results_with_metrics, args.query)
+                with span("render", kind="html"):
+                    html_file = generate_html_report(results_with_metrics, args.query)
                 if html_file:
                     print(f"\nHTML-отчет сохранен в {html_file}")
                     # Открываем в браузере
@@ -167,19 +160,60 @@ def main():
                     # Если не удалось создать HTML, пробуем Dashboard (требует matplotlib)
                     try:
                         from visualization.dashboard import generate_dashboard
-                        dashboard_file = generate_dashboard(results_with_metrics, args.query)
+                        with span("render", kind="dashboard"):
+                            dashboard_file = generate_dashboard(results_with_metrics, args.query)
                         if dashboard_file:
                             print(f"\nДашборд сохранен в {dashboard_file}")
                             # Открываем в браузере
                             webbrowser.open('file://' + os.path.abspath(dashboard_file))
                     except Exception as e:
-                        print(f"\nОшибка при создании дашборда: {e}")
+                        logger.error("Ошибка при создании дашборда: %s", e)
             except Exception as e:
-                print(f"\nОшибка при создании отчета: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Ошибка при создании отчета: %s", e)
     else:
         print("Не удалось собрать данные. Проверьте запрос, соединение или доступность платформ.")
 
+def run_queries_file(args):
+    """
+    Пакетный режим: сбор по всем запросам из файла за один запуск
+    
+    Параметры командной строки используются как значения по умолчанию,
+    файл может переопределить их для каждого запроса.
+    
+    Args:
+        args (argparse.Namespace): Параметры запуска
+    """
+    jobs, _ = load_jobs(
+        args.queries_file,
+        limit=args.limit,
+        days=args.days,
+        platforms=args.platforms,
+        parallel=args.parallel,
+        workers=args.workers,
+        strict_match=args.strict_match,
+        recent_first=args.recent_first,
+        tabs=args.tabs
+    )
+    if not jobs:
+        print(f"В файле {args.queries_file} нет запросов")
+        return
+    
+    print(f"Пакетный сбор по {len(jobs)} запросам из {args.queries_file}")
+    os.makedirs("data/history", exist_ok=True)
+    
+    with Session(headless=not args.no_headless, browser_profile=args.browser_profile,
+                 lean_browser=not args.full_browser) as session:
+        results = run_batch(jobs, session)
+    
+    print("\nИтоги по запросам:")
+    for job in jobs:
+        query_results = results.get(job['query'], [])
+        if not query_results:
+            print(f"- {job['query']}: нет данных")
+            continue
+        top = query_results[0]
+        title = top.title if len(top.title) <= 40 else top.title[:37] + "..."
+        print(f"- {job['query']}: {len(query_results)} видео, лидер: [{top.platform}] {title} ({top.views} просмотров)")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
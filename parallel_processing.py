@@ -1,9 +1,24 @@
+import heapq
+import math
 import multiprocessing
+import queue
 import time
 from datetime import datetime
-import os
 import sys
 from functools import partial
+from utils import instrumentation
+from utils import log
+from utils import profiling
+
+logger = log.get_logger("parallel")
+
+# Процессы пула запускаются через spawn, а не fork: пул создается из потока asyncio.to_thread,
+# и fork мог бы скопировать блокировку (логирования, метрик), удерживаемую в этот момент другим потоком
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Состояние рабочего процесса параллельного поиска
+_stop_event = None  # Сигнал досрочной остановки: общий лимит уже собран
+_worker_ydl = None  # Экземпляр yt-dlp, переиспользуемый всеми задачами процесса
 
 def process_in_parallel(func, items, max_workers=None, chunk_size=1):
     """
@@ -22,19 +37,37 @@ def process_in_parallel(func, items, max_workers=None, chunk_size=1):
         # Используем количество доступных процессоров - 1, чтобы не загружать систему
         max_workers = max(1, multiprocessing.cpu_count() - 1)
     
-    print(f"Запуск многопроцессорной обработки с {max_workers} процессами...")
+    logger.info("Запуск многопроцессорной обработки с %s процессами...", max_workers)
     
     # Создаем пул процессов
     start_time = time.time()
-    with multiprocessing.Pool(processes=max_workers) as pool:
+    with _create_pool(max_workers) as pool:
         # Запускаем обработку с использованием map_async
         results = pool.map(func, items, chunk_size)
         
     elapsed = time.time() - start_time
-    print(f"Многопроцессорная обработка выполнена за {elapsed:.2f} секунд")
+    logger.info("Многопроцессорная обработка выполнена за %.2f секунд", elapsed)
     
     return results
 
+def _create_pool(max_workers, stop_event=None):
+    """
+    Создает пул процессов
+    
+    Дочерние процессы пишут логи в общую очередь основного процесса
+    и профилируют задачи, если профилирование включено. Объекты синхронизации,
+    передаваемые в пул (stop_event), создаются в MP_CONTEXT.
+    """
+    return MP_CONTEXT.Pool(processes=max_workers, initializer=_init_worker,
+                           initargs=(log.worker_config(), profiling.worker_config(), stop_event))
+
+def _init_worker(log_config, profile_config, stop_event=None):
+    """Настраивает логирование, профилирование и сигнал остановки в дочернем процессе"""
+    global _stop_event
+    log.init_worker(*log_config)
+    profiling.init_worker(profile_config)
+    _stop_event = stop_event
+
 def split_search_queries(query, max_workers):
     """
     Разделяет поисковый запрос на части для параллельной обработки
@@ -65,97 +98,162 @@ def split_search_queries(query, max_workers):
     # Ограничиваем количество запросов доступным числом процессов
     return base_queries[:max_workers]
 
-def parallel_search_worker(query_config):
+def search_page_worker(unit):
     """
-    Функция-обработчик для параллельного поиска
+    Функция-обработчик для параллельного поиска: одна страница результатов одного запроса
     
     Args:
-        query_config (dict): Конфигурация поискового запроса
+        unit (dict): Единица работы: запрос, ID видео страницы (None для первой страницы,
+            тогда список результатов запрашивается здесь) и параметры поиска
         
     Returns:
-        list: Результаты поиска
+        tuple: Записи VideoRecord, признак исчерпания результатов запроса, ID видео
+            следующих страниц (только для первой страницы) и снимок метрик задачи
     """
+    # Метрики считаются отдельно для каждой задачи и объединяются в основном процессе
+    instrumentation.reset()
+    with profiling.profile_section("worker"):
+        records, exhausted, listing = _run_page_task(unit)
+    return records, exhausted, listing, instrumentation.snapshot()
+
+def _run_page_task(unit):
+    """Выполняет поиск по одной странице (см. search_page_worker)"""
+    global _worker_ydl
+    if _stop_event is not None and _stop_event.is_set():
+        return [], True, None
     try:
-        from parsers.youtube_parser import parse_youtube_shorts
+        from parsers.registry import load_parser
+        youtube = load_parser('youtube')
+        if _worker_ydl is None:
+            _worker_ydl = youtube.create_youtube_dl()
         
-        query = query_config['query']
-        limit = query_config['limit']
-        days_ago = query_config['days_ago']
-        strict_query_match = query_config.get('strict_query_match', True)
-        
-        print(f"[Процесс {os.getpid()}] Обработка запроса: '{query}'")
-        
-        # Выполняем поиск и получаем результаты
-        results = parse_youtube_shorts(
-            query=query, 
-            limit=limit, 
-            days_ago=days_ago,
-            strict_query_match=strict_query_match
+        logger.debug("Обработка запроса '%s', страница %s", unit['query'], unit['page'] + 1)
+        video_ids, listing = unit['video_ids'], None
+        if video_ids is None:
+            # Первая страница: список результатов запрашивается один раз на вариацию запроса
+            listing = youtube.fetch_search_listing(unit['query'], unit['max_results'], unit['days_ago'],
+                                                   unit['recent_first'], ydl=_worker_ydl)
+            video_ids, listing = listing[:unit['page_size']], listing[unit['page_size']:]
+        results, exhausted = youtube.parse_youtube_page(
+            query=unit['query'],
+            video_ids=video_ids,
+            days_ago=unit['days_ago'],
+            strict_query_match=unit['strict_query_match'],
+            recent_first=unit['recent_first'],
+            ydl=_worker_ydl,
+            stop_event=_stop_event
         )
-        
-        print(f"[Процесс {os.getpid()}] Собрано {len(results)} видео по запросу '{query}'")
-        return results
+        logger.debug("Собрано %s видео по запросу '%s', страница %s", len(results), unit['query'], unit['page'] + 1)
+        return results, exhausted, listing
     
     except Exception as e:
-        print(f"[Процесс {os.getpid()}] Ошибка при обработке запроса '{query}': {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+        logger.exception("Ошибка при обработке запроса '%s': %s", unit['query'], e)
+        # Экземпляр yt-dlp мог остаться в неисправном состоянии
+        _worker_ydl = None
+        return [], True, None
 
-def run_parallel_search(main_query, limit=200, days_ago=30, max_workers=None, strict_query_match=True):
+def run_parallel_search(main_query, limit=200, days_ago=30, max_workers=None, strict_query_match=True,
+                        recent_first=False):
     """
     Запускает параллельный поиск по нескольким вариациям запроса
     
+    Работа делится на мелкие единицы (вариация запроса × страница результатов)
+    в общей очереди. Список результатов каждой вариации запрашивается один раз
+    вместе с ее первой страницей, последующие страницы получают готовые ID
+    видео. Освободившийся процесс сразу получает следующую страницу,
+    первые страницы всех вариаций обрабатываются раньше последующих, а новые
+    страницы перестают выдаваться (и текущие прерываются), как только собрано
+    limit уникальных видео.
+    
     Args:
         main_query (str): Основной поисковый запрос
         limit (int): Общий лимит результатов
         days_ago (int): Фильтр по дате
         max_workers (int, optional): Максимальное число параллельных процессов
+        strict_query_match (bool): Строгая проверка наличия запроса в контенте
+        recent_first (bool): Поиск по дате загрузки с ранней остановкой по окну days_ago
         
     Returns:
         list: Объединенные результаты со всех запросов
     """
+    from parsers.registry import load_parser
+    page_size = load_parser('youtube').PAGE_SIZE
+    
     if max_workers is None:
         max_workers = max(1, multiprocessing.cpu_count() - 1)
     
     # Разделяем запрос на вариации
     queries = split_search_queries(main_query, max_workers)
+    # Как и при последовательном поиске, по одной вариации просматривается не больше limit*2 результатов
+    max_results = max(1, math.ceil(limit * 2 / page_size)) * page_size
+    
+    # Очередь страниц: (номер страницы, номер вариации) - сначала первые страницы всех вариаций
+    pending = [(0, index) for index in range(len(queries))]
+    heapq.heapify(pending)
+    # Номер вариации -> ID видео после первой страницы (см. search_page_worker)
+    listings = {}
+    completed = queue.Queue()
+    stop_event = MP_CONTEXT.Event()
+    in_flight = 0
+    pages_done = 0
     
-    # Определяем количество результатов для каждого запроса
-    per_query_limit = max(50, limit // len(queries))
-    
-    # Подготавливаем конфигурации для параллельных процессов
-    query_configs = [
-        {
-            'query': q,
-            'limit': per_query_limit,
-            'days_ago': days_ago,
-            'strict_query_match': strict_query_match
-        }
-        for q in queries
-    ]
-    
-    # Запускаем параллельный поиск
-    results_lists = process_in_parallel(
-        parallel_search_worker,
-        query_configs,
-        max_workers=len(queries),
-        chunk_size=1
-    )
-    
-    # Объединяем и дедуплицируем результаты
     all_results = []
     seen_video_ids = set()
     
-    for results in results_lists:
-        for video in results:
-            video_id = video.get('video_id')
-            if video_id not in seen_video_ids:
-                seen_video_ids.add(video_id)
-                all_results.append(video)
+    logger.info("Параллельный поиск по %s вариациям запроса в %s процессах...", len(queries), max_workers)
+    start_time = time.time()
+    with _create_pool(max_workers, stop_event) as pool:
+        while True:
+            # Каждый освободившийся процесс получает следующую страницу из очереди
+            while pending and in_flight < max_workers and not stop_event.is_set():
+                page, index = heapq.heappop(pending)
+                unit = {
+                    'query': queries[index],
+                    'page': page,
+                    'video_ids': listings[index][(page - 1) * page_size:page * page_size] if page else None,
+                    'max_results': max_results,
+                    'page_size': page_size,
+                    'days_ago': days_ago,
+                    'strict_query_match': strict_query_match,
+                    'recent_first': recent_first
+                }
+                pool.apply_async(search_page_worker, (unit,),
+                                 callback=partial(_put_completed, completed, page, index),
+                                 error_callback=partial(_put_completed, completed, page, index))
+                in_flight += 1
+            if not in_flight:
+                break
+            
+            page, index, result = completed.get()
+            in_flight -= 1
+            pages_done += 1
+            if isinstance(result, Exception):
+                logger.error("Ошибка при обработке запроса '%s': %s", queries[index], result)
+                continue
+            
+            records, exhausted, listing, metrics = result
+            instrumentation.merge(metrics)
+            if listing is not None:
+                listings[index] = listing
+            for video in records:
+                if video.video_id not in seen_video_ids:
+                    seen_video_ids.add(video.video_id)
+                    all_results.append(video)
+            
+            if len(all_results) >= limit:
+                # Общий лимит собран: новые страницы не выдаются, текущие прерываются
+                stop_event.set()
+            elif not exhausted and page * page_size < len(listings.get(index, ())):
+                heapq.heappush(pending, (page + 1, index))
     
-    print(f"Всего собрано уникальных видео: {len(all_results)}")
+    instrumentation.incr("pages_processed", pages_done, platform="youtube")
+    logger.info("Всего собрано уникальных видео: %s (страниц: %s, %.2f секунд)",
+                len(all_results), pages_done, time.time() - start_time)
     
     # Сортируем по просмотрам и возвращаем в пределах общего лимита
-    all_results.sort(key=lambda x: int(x.get('views', 0)), reverse=True)
-    return all_results[:limit]
\ No newline at end of file
+    all_results.sort(key=lambda x: x.views, reverse=True)
+    return all_results[:limit]
+
+def _put_completed(completed, page, index, result):
+    """Передает результат страницы (или исключение) из потока пула в цикл распределения"""
+    completed.put((page, index, result))
@@ -1,15 +1,34 @@
 import requests
-import json
-import re
 import time
 import urllib.parse
-from bs4 import BeautifulSoup
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.browser import setup_driver, load_cookies
+from utils import cookie_store
+from utils.html_parsing import compile_xpath, parse_html, text_of
+from utils.hydration import iter_hydration_data, iter_objects
+from utils.records import VideoRecord
+from utils.counts import parse_count
+from utils.instrumentation import span, instrument_driver
+from utils.log import get_logger
+from utils.rate_limit import is_block_url
+from parsers.registry import blocking_search, rate_limiter
 
-def parse_instagram_reels(query, limit=20):
+logger = get_logger("instagram")
+
+# Ссылки на посты страницы хэштега и поля страницы Reel (XPath компилируются один раз).
+# Разбор начинается с первого <article>/<section> - скрипты в <head> не разбираются.
+POST_LIST_MARKERS = ('<article',)
+POST_HREF_XPATH = compile_xpath("//article//a/@href")
+POST_MARKERS = ('<main', '<article', '<section')
+VIEWS_XPATH = compile_xpath("//span[contains(@class, 'videoViews')]")
+LIKES_XPATH = compile_xpath("//section//span[contains(@class, 'like')]")
+CAPTION_XPATH = compile_xpath("//div[contains(@class, 'caption')]//span")
+AUTHOR_XPATH = compile_xpath("//a[contains(@class, 'profile')]")
+
+def parse_instagram_reels(query, limit=20, lean_browser=True):
     """
     Парсит Instagram Reels используя прямой HTTP-запрос.
     Если не получается - переключается на Selenium.
@@ -22,10 +41,29 @@ def parse_instagram_reels(query, limit=20):
         if results:
             return results
     except Exception as e:
-        print(f"Ошибка при прямом парсинге Instagram: {e}")
+        logger.warning("Ошибка при прямом парсинге Instagram: %s", e)
     
     # Если прямой запрос не сработал - используем Selenium
-    return parse_instagram_selenium(query, limit)
+    return parse_instagram_selenium(query, limit, lean_browser)
+
+async def search(query, limit, since, resource=None, lean_browser=True, **options):
+    """
+    Общий интерфейс парсеров (см. parsers.registry)
+    
+    Дата публикации известна не для всех видео: записи без даты не
+    отбрасываются фильтром since.
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        since (datetime): Видео, опубликованные раньше дня since, не возвращаются
+        lean_browser (bool): Легкий режим браузера при сборе через Selenium
+        
+    Yields:
+        VideoRecord: Записи о видео
+    """
+    async for record in blocking_search(since, parse_instagram_reels, query, limit, lean_browser):
+        yield record
 
 def parse_instagram_direct(query, limit=20):
     """Парсит Instagram Reels напрямую через HTTP-запрос без Selenium"""
@@ -43,76 +81,35 @@ def parse_instagram_direct(query, limit=20):
         'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'
     }
     
-    # Загрузите cookies из файла, если они есть
-    cookies = {}
-    try:
-        import os
-        import pickle
-        cookies_file = os.path.join(os.getcwd(), "cookies", "instagram_cookies.pkl")
-        if os.path.exists(cookies_file):
-            cookie_jar = pickle.load(open(cookies_file, "rb"))
-            for cookie in cookie_jar:
-                cookies[cookie['name']] = cookie['value']
-    except:
-        pass
+    # Сохраненная сессия (общая с Selenium-сборщиком)
+    cookies = cookie_store.request_cookies("instagram")
     
     # Делаем запрос
-    response = requests.get(url, headers=headers, cookies=cookies)
+    rate_limiter('instagram').acquire()
+    with span("http_request", platform="instagram"):
+        response = requests.get(url, headers=headers, cookies=cookies)
+    
+    if response.status_code == 429 or is_block_url(response.url):
+        rate_limiter('instagram').report_block(f"HTTP {response.status_code} {response.url}")
+        return results
     
     if response.status_code == 200:
-        # Ищем _sharedData в HTML
-        shared_data_match = re.search(r'window\._sharedData = (.+?);</script>', response.text)
-        
-        if shared_data_match:
-            # Извлекаем и парсим JSON
-            shared_data = json.loads(shared_data_match.group(1))
-            
-            # Извлекаем данные о постах
-            if 'entry_data' in shared_data and 'TagPage' in shared_data['entry_data']:
-                tag_page = shared_data['entry_data']['TagPage'][0]
-                if 'graphql' in tag_page and 'hashtag' in tag_page['graphql']:
-                    posts = tag_page['graphql']['hashtag']['edge_hashtag_to_media']['edges']
-                    
-                    for post in posts:
-                        node = post['node']
-                        
-                        # Проверяем, является ли это видео
-                        if node.get('is_video', False):
-                            shortcode = node.get('shortcode', '')
-                            
-                            # Собираем данные
-                            caption = ""
-                            if 'edge_media_to_caption' in node and node['edge_media_to_caption']['edges']:
-                                caption = node['edge_media_to_caption']['edges'][0]['node']['text']
-                            
-                            results.append({
-                                "platform": "Instagram Reels",
-                                "title": caption[:100] + ('...' if len(caption) > 100 else ''),
-                                "url": f"https://www.instagram.com/p/{shortcode}/",
-                                "video_id": shortcode,
-                                "views": node.get('video_view_count', 'N/A'),
-                                "likes": node.get('edge_liked_by', {}).get('count', 0),
-                                "comments": node.get('edge_media_to_comment', {}).get('count', 0),
-                                "author": node.get('owner', {}).get('username', 'Неизвестно'),
-                                "publish_time": "N/A",
-                                "query": query,
-                                "collected_at": time.strftime('%Y-%m-%d %H:%M:%S')
-                            })
-                            
-                            if len(results) >= limit:
-                                break
+        with span("extraction", platform="instagram"):
+            results = extract_tag_page_posts(response.text, query, limit)
     
     return results
 
-def parse_instagram_selenium(query, limit=20):
+def parse_instagram_selenium(query, limit=20, lean_browser=True):
     """Парсит Instagram Reels через Selenium, если прямой запрос не сработал"""
     results = []
     driver = None
     
     try:
-        driver = setup_driver()
+        with span("driver_startup", platform="instagram"):
+            driver = setup_driver(lean=lean_browser, platform="instagram")
         if not driver:
             return results
+        driver = instrument_driver(driver, "instagram")
         
         # Загружаем cookies, если есть
         load_cookies(driver, "instagram")
@@ -122,9 +119,15 @@ def parse_instagram_selenium(query, limit=20):
         url = f"https://www.instagram.com/explore/tags/{clean_query}/"
         
         # Открываем страницу
-        driver.get(url)
+        rate_limiter('instagram').acquire()
+        with span("page_load", platform="instagram"):
+            driver.get(url)
         time.sleep(5)
         
+        if is_block_url(driver.current_url):
+            rate_limiter('instagram').report_block(driver.current_url)
+            return results
+        
         # Закрываем модальное окно, если появится
         try:
             close_button = WebDriverWait(driver, 3).until(
@@ -139,71 +142,76 @@ def parse_instagram_selenium(query, limit=20):
         driver.execute_script("window.scrollBy(0, 1000);")
         time.sleep(2)
         
-        # Парсим HTML
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Данные гидратации страницы содержат метрики всех Reels сразу:
+        # открывать страницу каждого Reel не нужно
+        page_source = driver.page_source
+        with span("extraction", platform="instagram"):
+            results = extract_tag_page_posts(page_source, query, limit)
+        if results:
+            return results
         
-        # Ищем видео посты
-        posts = soup.select("article a")
+        # Ищем ссылки на посты (разбирается только часть страницы с постами)
+        root = parse_html(page_source, POST_LIST_MARKERS)
+        hrefs = POST_HREF_XPATH(root) if root is not None else []
         
         count = 0
-        for post in posts:
+        for href in hrefs:
             try:
-                href = post.get('href', '')
                 
                 # Проверяем, это Reel или нет
                 if '/reel/' in href or '/p/' in href:
                     shortcode = href.split('/')[-2]
                     
                     # Открываем страницу Reel для получения деталей
-                    driver.get(f"https://www.instagram.com{href}")
+                    rate_limiter('instagram').acquire()
+                    with span("page_load", platform="instagram"):
+                        driver.get(f"https://www.instagram.com{href}")
                     time.sleep(3)
                     
-                    post_soup = BeautifulSoup(driver.page_source, 'html.parser')
+                    post_root = parse_html(driver.page_source, POST_MARKERS)
+                    if post_root is None:
+                        continue
                     
                     # Извлекаем метрики
                     # Просмотры
-                    views_elem = post_soup.select_one("span[class*='videoViews']")
-                    views = _clean_count(views_elem.text.strip()) if views_elem else "N/A"
+                    views = parse_count(text_of(post_root, VIEWS_XPATH, "0"))
                     
                     # Лайки
-                    likes_elem = post_soup.select_one("section span[class*='like']")
-                    likes = _clean_count(likes_elem.text.strip()) if likes_elem else "N/A"
+                    likes = parse_count(text_of(post_root, LIKES_XPATH, "0"))
                     
                     # Описание
-                    caption_elem = post_soup.select_one("div[class*='caption'] span")
-                    caption = caption_elem.text.strip() if caption_elem else "Без описания"
+                    caption = text_of(post_root, CAPTION_XPATH, "Без описания")
                     
                     # Автор
-                    author_elem = post_soup.select_one("a[class*='profile']")
-                    author = author_elem.text.strip() if author_elem else "Неизвестно"
+                    author = text_of(post_root, AUTHOR_XPATH, "Неизвестно")
                     
-                    results.append({
-                        "platform": "Instagram Reels",
-                        "title": caption[:100] + ('...' if len(caption) > 100 else ''),
-                        "url": f"https://www.instagram.com{href}",
-                        "video_id": shortcode,
-                        "views": views,
-                        "likes": likes,
-                        "comments": "N/A",  # Трудно извлечь надежно
-                        "author": author,
-                        "publish_time": "N/A",
-                        "query": query,
-                        "collected_at": time.strftime('%Y-%m-%d %H:%M:%S')
-                    })
+                    results.append(VideoRecord(
+                        platform="Instagram Reels",
+                        video_id=shortcode,
+                        title=caption[:100] + ('...' if len(caption) > 100 else ''),
+                        url=f"https://www.instagram.com{href}",
+                        views=views,
+                        likes=likes,
+                        comments=0,  # Трудно извлечь надежно
+                        publish_date=None,
+                        channel=author,
+                        query=query
+                    ))
                     
                     count += 1
                     if count >= limit:
                         break
                     
                     # Возвращаемся на страницу поиска
+                    rate_limiter('instagram').acquire()
                     driver.get(url)
                     time.sleep(2)
             
             except Exception as e:
-                print(f"Ошибка при обработке Instagram поста: {e}")
+                logger.warning("Ошибка при обработке Instagram поста: %s", e)
     
     except Exception as e:
-        print(f"Ошибка при парсинге Instagram через Selenium: {e}")
+        logger.warning("Ошибка при парсинге Instagram через Selenium: %s", e)
     
     finally:
         if driver:
@@ -211,33 +219,78 @@ def parse_instagram_selenium(query, limit=20):
     
     return results
 
-def _clean_count(count_str):
-    """Преобразует строку с числом в число"""
-    if not count_str or count_str == "N/A":
-        return "0"
-    
-    # Удаление пробелов и замена запятых на точки
-    count_str = count_str.replace(' ', '').replace(',', '.')
-    
-    # Обработка суффиксов
-    multiplier = 1
-    if 'K' in count_str or 'к' in count_str or 'К' in count_str or 'тыс' in count_str:
-        multiplier = 1000
-        count_str = count_str.replace('K', '').replace('к', '').replace('К', '').replace('тыс', '')
-    elif 'M' in count_str or 'млн' in count_str or 'М' in count_str:
-        multiplier = 1000000
-        count_str = count_str.replace('M', '').replace('млн', '').replace('М', '')
-    elif 'B' in count_str or 'млрд' in count_str or 'Б' in count_str:
-        multiplier = 1000000000
-        count_str = count_str.replace('B', '').replace('млрд', '').replace('Б', '')
+def extract_tag_page_posts(html, query, limit=20):
+    """
+    Извлекает Reels из JSON-данных гидратации страницы Instagram
     
-    try:
-        # Извлекаем числовую часть
-        number_match = re.search(r'(\d+\.?\d*)', count_str)
-        if number_match:
-            number = float(number_match.group(1))
-            return str(int(number * multiplier))
-    except:
-        pass
-    
-    return "0"
\ No newline at end of file
+    Поддерживаются window._sharedData (graphql: shortcode, edge_liked_by...)
+    и данные новых страниц (code, play_count, like_count...); см. utils.hydration.
+    
+    Args:
+        html (str): HTML страницы хэштега
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        
+    Returns:
+        list: Список записей VideoRecord
+    """
+    results = []
+    seen = set()
+    for _, data in iter_hydration_data(html):
+        for node in iter_objects(data, _is_media_node):
+            # Проверяем, является ли это видео
+            if not (node.get('is_video') or node.get('media_type') == 2):
+                continue
+            record = build_media_record(node, query)
+            if record.video_id in seen:
+                continue
+            seen.add(record.video_id)
+            results.append(record)
+            if len(results) >= limit:
+                return results
+    return results
+
+def build_media_record(node, query):
+    """
+    Преобразует описание публикации Instagram из данных гидратации в VideoRecord
+    
+    Args:
+        node (dict): Публикация в формате graphql (_sharedData) или API новых страниц
+        query (str): Поисковый запрос
+        
+    Returns:
+        VideoRecord: Запись о видео
+    """
+    if 'shortcode' in node:
+        shortcode = node['shortcode']
+        caption_edges = (node.get('edge_media_to_caption') or {}).get('edges') or []
+        caption = caption_edges[0]['node']['text'] if caption_edges else ""
+        views = node.get('video_view_count') or 0
+        likes = (node.get('edge_liked_by') or node.get('edge_media_preview_like') or {}).get('count', 0)
+        comments = (node.get('edge_media_to_comment') or {}).get('count', 0)
+        taken_at = node.get('taken_at_timestamp')
+        channel = (node.get('owner') or {}).get('username', 'Неизвестно')
+    else:
+        shortcode = node['code']
+        caption = (node.get('caption') or {}).get('text') or ""
+        views = node.get('play_count') or node.get('view_count') or 0
+        likes = node.get('like_count') or 0
+        comments = node.get('comment_count') or 0
+        taken_at = node.get('taken_at')
+        channel = (node.get('user') or {}).get('username', 'Неизвестно')
+    
+    return VideoRecord(
+        platform="Instagram Reels",
+        video_id=shortcode,
+        title=caption[:100] + ('...' if len(caption) > 100 else ''),
+        url=f"https://www.instagram.com/p/{shortcode}/",
+        views=views,
+        likes=likes,
+        comments=comments,
+        publish_date=datetime.fromtimestamp(taken_at) if taken_at else None,
+        channel=channel,
+        query=query
+    )
+
+def _is_media_node(value):
+    return ('shortcode' in value and 'is_video' in value) or ('code' in value and 'media_type' in value)
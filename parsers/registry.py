@@ -0,0 +1,150 @@
+import asyncio
+import importlib
+import threading
+
+from utils import profiling
+from utils.rate_limit import RateLimiter
+
+# Платформы и их метаданные. Модули парсеров (и их зависимости: yt-dlp,
+# selenium, requests, lxml) импортируются только при первом обращении к платформе.
+#
+#   module        - модуль парсера, реализующий общий интерфейс (см. ниже)
+#   capabilities  - возможности парсера:
+#       warm_resource - использует прогретый ресурс из пула сессии (браузер, yt-dlp)
+#       parallel      - поддерживает многопроцессный сбор (параметр parallel)
+#       parallel_browsers - при параметре parallel собирает в нескольких браузерах;
+#                       ресурс из пула - один из них, остальные запускаются на время сбора
+#       manual_auth   - может требовать ручной авторизации в браузере
+#   rate_limit    - ограничения платформы:
+#       max_concurrency - одновременных сборов по умолчанию
+#       min_interval    - средний интервал между запросами к платформе (секунды)
+#       burst           - сколько запросов можно выполнить подряд без ожидания
+#       cooldown        - пауза всех сборщиков после 429 или капчи (секунды)
+#
+# Интерфейс модуля парсера:
+#   async search(query, limit, since, resource=None, **options) -> AsyncIterator[VideoRecord]
+#       since    - datetime; видео, опубликованные раньше дня since, не возвращаются
+#       resource - ресурс из пула сессии (только при warm_resource)
+#       options  - параметры задания (strict_match, recent_first, parallel, workers, tabs)
+#                  и сессии (headless, browser_profile, lean_browser); неподдерживаемые параметры игнорируются
+#   create_resource(headless, browser_profile, lean), close_resource(resource) - при warm_resource
+#   is_alive(resource) -> bool - необязательно: False, если ресурс из пула больше нельзя
+#       использовать (браузер упал или потерял сессию) и его нужно создать заново
+#   needs_resource(**options) -> bool - необязательно: False, если ресурс из пула для этого
+#       сбора не нужен (например, VK собирает по HTTP)
+PLATFORMS = {
+    'youtube': {
+        'module': 'parsers.youtube_parser',
+        'capabilities': frozenset({'warm_resource', 'parallel'}),
+        'rate_limit': {'max_concurrency': 2, 'min_interval': 0.5, 'burst': 5, 'cooldown': 60},
+    },
+    'vk': {
+        'module': 'parsers.vk_parser',
+        'capabilities': frozenset({'warm_resource', 'manual_auth', 'parallel_browsers'}),
+        'rate_limit': {'max_concurrency': 1, 'min_interval': 2.0, 'burst': 1, 'cooldown': 300},
+    },
+    'tiktok': {
+        'module': 'parsers.tiktok_parser',
+        'capabilities': frozenset(),
+        'rate_limit': {'max_concurrency': 1, 'min_interval': 5.0, 'burst': 1, 'cooldown': 300},
+    },
+    'instagram': {
+        'module': 'parsers.instagram_parser',
+        'capabilities': frozenset(),
+        'rate_limit': {'max_concurrency': 1, 'min_interval': 10.0, 'burst': 1, 'cooldown': 600},
+    },
+}
+
+
+def available_platforms():
+    """Названия всех зарегистрированных платформ"""
+    return list(PLATFORMS)
+
+
+def get_platform(platform):
+    """
+    Метаданные платформы
+
+    Args:
+        platform (str): Название платформы (youtube, vk, tiktok, instagram)
+
+    Returns:
+        dict: Описание платформы из PLATFORMS
+    """
+    try:
+        return PLATFORMS[platform]
+    except KeyError:
+        raise ValueError(f"Неизвестная платформа: {platform}") from None
+
+
+def has_capability(platform, capability):
+    """Проверяет, поддерживает ли парсер платформы указанную возможность"""
+    return capability in get_platform(platform)['capabilities']
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(platform):
+    """
+    Общий для всех процессов ограничитель запросов к платформе
+
+    Парсеры вызывают acquire() перед каждым запросом к платформе и
+    report_block() при ответе 429 или капче (см. utils.rate_limit).
+
+    Args:
+        platform (str): Название платформы
+
+    Returns:
+        RateLimiter: Ограничитель с параметрами из rate_limit платформы
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(platform)
+        if limiter is None:
+            limits = get_platform(platform)['rate_limit']
+            limiter = RateLimiter(platform, limits['min_interval'], limits['burst'], limits['cooldown'])
+            _limiters[platform] = limiter
+        return limiter
+
+
+def load_parser(platform):
+    """
+    Импортирует модуль парсера платформы
+
+    Args:
+        platform (str): Название платформы (youtube, vk, tiktok, instagram)
+
+    Returns:
+        module: Модуль парсера
+    """
+    return importlib.import_module(get_platform(platform)['module'])
+
+
+async def blocking_search(since, func, *args, **kwargs):
+    """
+    Выполняет блокирующий парсер в отдельном потоке и выдает его результаты
+
+    Используется в реализациях search: пока один парсер ждет браузер или
+    сеть, сбор с других платформ продолжается. Видео с известной датой
+    публикации раньше дня since отбрасываются: сравниваются календарные
+    дни, как и в фильтрах парсеров, поэтому видео граничного дня остаются.
+
+    Args:
+        since (datetime): Нижняя граница даты публикации
+        func (callable): Парсер, возвращающий список VideoRecord
+        *args, **kwargs: Аргументы парсера
+
+    Yields:
+        VideoRecord: Записи о видео
+    """
+    records = await asyncio.to_thread(_run_profiled, func, *args, **kwargs)
+    since_day = since.date()
+    for record in records:
+        if record.publish_date is None or record.publish_date.date() >= since_day:
+            yield record
+
+
+def _run_profiled(func, *args, **kwargs):
+    with profiling.profile_section("platform"):
+        return func(*args, **kwargs)
@@ -3,13 +3,33 @@ import json
 import re
 import time
 import urllib.parse
-from bs4 import BeautifulSoup
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.browser import setup_driver, load_cookies
+from utils import cookie_store
+from utils.hydration import iter_hydration_data, iter_objects
+from utils.html_parsing import compile_xpath, has_class, parse_html, first, text_of
+from utils.records import VideoRecord
+from utils.counts import parse_count
+from utils.instrumentation import span, instrument_driver
+from utils.log import get_logger
+from utils.rate_limit import is_block_url
+from parsers.registry import blocking_search, rate_limiter
 
-def parse_tiktok(query, limit=20):
+logger = get_logger("tiktok")
+
+# Карточки результатов поиска и их поля (XPath компилируются один раз)
+CARD_MARKERS = ('data-e2e="search-card-item"', "data-e2e='search-card-item'", 'tiktok-1soki6-DivItemContainer')
+CARD_XPATH = compile_xpath(f"//*[@data-e2e='search-card-item' or {has_class('tiktok-1soki6-DivItemContainer')}]")
+LINK_HREF_XPATH = compile_xpath("(.//a)[1]/@href")
+DESCRIPTION_XPATH = compile_xpath(
+    f".//*[{has_class('tiktok-1ejylhp-DivContainer')} or {has_class('tiktok-j2a19r-DivDesContainer')}]")
+VIEWS_XPATH = compile_xpath(f".//*[@data-e2e='video-views' or {has_class('video-count')}]")
+STATS_XPATH = compile_xpath(f".//*[{has_class('tiktok-wxn977-StrongVideoStat')} or {has_class('stat-count')}]")
+
+def parse_tiktok(query, limit=20, lean_browser=True):
     """
     Парсит TikTok используя прямой API-запрос.
     Если не получается - переключается на Selenium.
@@ -22,10 +42,29 @@ def parse_tiktok(query, limit=20):
         if results:
             return results
     except Exception as e:
-        print(f"Ошибка при прямом парсинге TikTok: {e}")
+        logger.warning("Ошибка при прямом парсинге TikTok: %s", e)
     
     # Если API-запрос не сработал - используем Selenium
-    return parse_tiktok_selenium(query, limit)
+    return parse_tiktok_selenium(query, limit, lean_browser)
+
+async def search(query, limit, since, resource=None, lean_browser=True, **options):
+    """
+    Общий интерфейс парсеров (см. parsers.registry)
+    
+    Дата публикации известна не для всех видео: записи без даты не
+    отбрасываются фильтром since.
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        since (datetime): Видео, опубликованные раньше дня since, не возвращаются
+        lean_browser (bool): Легкий режим браузера при сборе через Selenium
+        
+    Yields:
+        VideoRecord: Записи о видео
+    """
+    async for record in blocking_search(since, parse_tiktok, query, limit, lean_browser):
+        yield record
 
 def parse_tiktok_direct(query, limit=20):
     """Парсит TikTok напрямую через API-запрос без Selenium"""
@@ -45,53 +84,51 @@ def parse_tiktok_direct(query, limit=20):
     }
     
     # Делаем запрос
-    response = requests.get(url, headers=headers)
+    rate_limiter('tiktok').acquire()
+    with span("http_request", platform="tiktok"):
+        response = requests.get(url, headers=headers, cookies=cookie_store.request_cookies("tiktok"))
+    
+    if response.status_code == 429 or is_block_url(response.url):
+        rate_limiter('tiktok').report_block(f"HTTP {response.status_code} {response.url}")
+        return results
     
     if response.status_code == 200:
         data = response.json()
         
         if 'data' in data and 'videos' in data['data']:
             for video in data['data']['videos']:
-                video_id = video.get('id', '')
-                author = video.get('author', {}).get('uniqueId', '')
-                
-                results.append({
-                    "platform": "TikTok",
-                    "title": video.get('desc', 'Без описания'),
-                    "url": f"https://www.tiktok.com/@{author}/video/{video_id}",
-                    "video_id": video_id,
-                    "views": video.get('stats', {}).get('playCount', 0),
-                    "likes": video.get('stats', {}).get('diggCount', 0),
-                    "comments": video.get('stats', {}).get('commentCount', 0),
-                    "shares": video.get('stats', {}).get('shareCount', 0),
-                    "author": author,
-                    "publish_time": time.strftime('%Y-%m-%d', time.localtime(video.get('createTime', 0))),
-                    "query": query,
-                    "collected_at": time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+                results.append(build_item_record(video, query))
                 
                 if len(results) >= limit:
                     break
     
     return results
 
-def parse_tiktok_selenium(query, limit=20):
+def parse_tiktok_selenium(query, limit=20, lean_browser=True):
     """Парсит TikTok через Selenium, если прямой запрос не сработал"""
     results = []
     driver = None
     
     try:
-        driver = setup_driver()
+        with span("driver_startup", platform="tiktok"):
+            driver = setup_driver(lean=lean_browser, platform="tiktok")
         if not driver:
             return results
+        driver = instrument_driver(driver, "tiktok")
         
         # Загружаем cookies, если есть
         load_cookies(driver, "tiktok")
         
         # Открываем страницу поиска
-        driver.get(f"https://www.tiktok.com/search?q={query.replace(' ', '%20')}")
+        rate_limiter('tiktok').acquire()
+        with span("page_load", platform="tiktok"):
+            driver.get(f"https://www.tiktok.com/search?q={query.replace(' ', '%20')}")
         time.sleep(5)
         
+        if is_block_url(driver.current_url):
+            rate_limiter('tiktok').report_block(driver.current_url)
+            return results
+        
         # Соглашаемся с cookies, если появится окно
         try:
             cookie_button = WebDriverWait(driver, 3).until(
@@ -106,70 +143,16 @@ def parse_tiktok_selenium(query, limit=20):
         driver.execute_script("window.scrollBy(0, 1000);")
         time.sleep(2)
         
-        # Используем BeautifulSoup для парсинга
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Извлекаем данные о видео
-        video_elements = soup.select("[data-e2e='search-card-item'], .tiktok-1soki6-DivItemContainer")
-        for video_element in video_elements[:limit]:
-            try:
-                # URL видео
-                link_element = video_element.select_one("a")
-                url = link_element['href'] if link_element and 'href' in link_element.attrs else ""
-                
-                if not url:
-                    continue
-                    
-                # Извлекаем ID и автора из URL
-                video_id = url.split("/")[-1] if url else ""
-                author_match = re.search(r'@([^/]+)', url)
-                author = author_match.group(1) if author_match else "unknown"
-                
-                # Текст описания
-                desc_element = video_element.select_one(".tiktok-1ejylhp-DivContainer, .tiktok-j2a19r-DivDesContainer")
-                description = desc_element.text.strip() if desc_element else "Без описания"
-                
-                # Метрики
-                view_element = video_element.select_one("[data-e2e='video-views'], .video-count")
-                views = view_element.text.strip() if view_element else "0"
-                
-                # Дополнительные метрики из HTML-кода
-                likes = "N/A"
-                comments = "N/A"
-                shares = "N/A"
-                
-                # Метрики могут быть в разных форматах
-                stats_elements = video_element.select(".tiktok-wxn977-StrongVideoStat, .stat-count")
-                if len(stats_elements) >= 1:
-                    likes = stats_elements[0].text.strip()
-                if len(stats_elements) >= 2:
-                    comments = stats_elements[1].text.strip()
-                if len(stats_elements) >= 3:
-                    shares = stats_elements[2].text.strip()
-                
-                results.append({
-                    "platform": "TikTok",
-                    "title": description,
-                    "url": url,
-                    "video_id": video_id,
-                    "views": _clean_count(views),
-                    "likes": _clean_count(likes),
-                    "comments": _clean_count(comments),
-                    "shares": _clean_count(shares),
-                    "author": author,
-                    "publish_time": "N/A",  # Трудно извлечь из HTML
-                    "query": query,
-                    "collected_at": time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                if len(results) >= limit:
-                    break
-            
-            except Exception as e:
-                print(f"Ошибка при обработке видео TikTok: {e}")
+        # Разбираем загруженную страницу: данные гидратации содержат все метрики,
+        # карточки в DOM - запасной вариант
+        page_source = driver.page_source
+        with span("extraction", platform="tiktok"):
+            results = extract_hydrated_items(page_source, query, limit)
+            if not results:
+                results = extract_search_cards(page_source, query, limit)
     
     except Exception as e:
-        print(f"Ошибка при парсинге TikTok через Selenium: {e}")
+        logger.warning("Ошибка при парсинге TikTok через Selenium: %s", e)
     
     finally:
         if driver:
@@ -177,33 +160,145 @@ def parse_tiktok_selenium(query, limit=20):
     
     return results
 
-def _clean_count(count_str):
-    """Преобразует строку с числом в число"""
-    if not count_str or count_str == "N/A":
-        return "0"
-    
-    # Удаление пробелов и замена запятых на точки
-    count_str = count_str.replace(' ', '').replace(',', '.')
-    
-    # Обработка суффиксов
-    multiplier = 1
-    if 'K' in count_str or 'к' in count_str or 'К' in count_str:
-        multiplier = 1000
-        count_str = count_str.replace('K', '').replace('к', '').replace('К', '')
-    elif 'M' in count_str or 'млн' in count_str or 'М' in count_str:
-        multiplier = 1000000
-        count_str = count_str.replace('M', '').replace('млн', '').replace('М', '')
-    elif 'B' in count_str or 'млрд' in count_str or 'Б' in count_str:
-        multiplier = 1000000000
-        count_str = count_str.replace('B', '').replace('млрд', '').replace('Б', '')
+def extract_hydrated_items(page_source, query, limit=20):
+    """
+    Извлекает видео из JSON-данных гидратации страницы TikTok
     
-    try:
-        # Извлекаем числовую часть
-        number_match = re.search(r'(\d+\.?\d*)', count_str)
-        if number_match:
-            number = float(number_match.group(1))
-            return str(int(number * multiplier))
-    except:
-        pass
-    
-    return "0"
\ No newline at end of file
+    (__UNIVERSAL_DATA_FOR_REHYDRATION__, SIGI_STATE; см. utils.hydration)
+    
+    Args:
+        page_source (str): HTML страницы
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        
+    Returns:
+        list: Список записей VideoRecord (пустой, если данных гидратации нет)
+    """
+    results = []
+    seen = set()
+    for _, data in iter_hydration_data(page_source):
+        for item in iter_objects(data, _is_video_item):
+            try:
+                record = build_item_record(item, query)
+            except (TypeError, ValueError) as e:
+                logger.debug("Пропуск видео TikTok из данных страницы: %s", e)
+                continue
+            if record.video_id in seen:
+                continue
+            seen.add(record.video_id)
+            results.append(record)
+            if len(results) >= limit:
+                return results
+    return results
+
+def build_item_record(video, query):
+    """
+    Преобразует описание видео TikTok (ответ API или данные гидратации) в VideoRecord
+    
+    Args:
+        video (dict): Описание видео (id, desc, author, stats, createTime)
+        query (str): Поисковый запрос
+        
+    Returns:
+        VideoRecord: Запись о видео
+    """
+    video_id = str(video.get('id', ''))
+    author = video.get('author') or ''
+    if isinstance(author, dict):
+        author = author.get('uniqueId', '')
+    # statsV2 содержит те же счетчики строками (в том числе сокращенными, например "1.2M")
+    stats = {**(video.get('statsV2') or {}), **(video.get('stats') or {})}
+    create_time = parse_count(video.get('createTime'))
+    
+    return VideoRecord(
+        platform="TikTok",
+        video_id=video_id,
+        title=video.get('desc', 'Без описания'),
+        url=f"https://www.tiktok.com/@{author}/video/{video_id}",
+        views=parse_count(stats.get('playCount')),
+        likes=parse_count(stats.get('diggCount')),
+        comments=parse_count(stats.get('commentCount')),
+        shares=parse_count(stats.get('shareCount')),
+        publish_date=datetime.fromtimestamp(create_time) if create_time else None,
+        channel=author,
+        query=query
+    )
+
+def _is_video_item(value):
+    return 'id' in value and 'desc' in value and ('stats' in value or 'statsV2' in value)
+
+def extract_search_cards(page_source, query, limit=20):
+    """
+    Извлекает видео из HTML страницы поиска TikTok
+    
+    Args:
+        page_source (str): HTML страницы поиска
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        
+    Returns:
+        list: Список записей VideoRecord
+    """
+    results = []
+    
+    # Разбираем только часть страницы, начиная с первой карточки
+    root = parse_html(page_source, CARD_MARKERS)
+    if root is None:
+        return results
+    
+    # Извлекаем данные о видео
+    video_elements = CARD_XPATH(root)
+    for video_element in video_elements[:limit]:
+        try:
+            # URL видео
+            url = first(video_element, LINK_HREF_XPATH) or ""
+            
+            if not url:
+                continue
+                
+            # Извлекаем ID и автора из URL
+            video_id = url.split("/")[-1] if url else ""
+            author_match = re.search(r'@([^/]+)', url)
+            author = author_match.group(1) if author_match else "unknown"
+            
+            # Текст описания
+            description = text_of(video_element, DESCRIPTION_XPATH, "Без описания")
+            
+            # Метрики
+            views = text_of(video_element, VIEWS_XPATH, "0")
+            
+            # Дополнительные метрики из HTML-кода
+            likes = "N/A"
+            comments = "N/A"
+            shares = "N/A"
+            
+            # Метрики могут быть в разных форматах
+            stats_elements = STATS_XPATH(video_element)
+            if len(stats_elements) >= 1:
+                likes = stats_elements[0].text_content().strip()
+            if len(stats_elements) >= 2:
+                comments = stats_elements[1].text_content().strip()
+            if len(stats_elements) >= 3:
+                shares = stats_elements[2].text_content().strip()
+            
+            results.append(VideoRecord(
+                platform="TikTok",
+                video_id=video_id,
+                title=description,
+                url=url,
+                views=parse_count(views),
+                likes=parse_count(likes),
+                comments=parse_count(comments),
+                shares=parse_count(shares),
+                publish_date=None,  # Трудно извлечь из HTML
+                channel=author,
+                query=query
+            ))
+            
+            if len(results) >= limit:
+                break
+        
+        except Exception as e:
+            logger.warning("Ошибка при обработке видео TikTok: %s", e)
+    
+    return results
@@ -0,0 +1,183 @@
+"""
+Сбор VK Клипов по HTTP через API VK (video.search) без браузера
+
+Нужен пользовательский токен в переменной окружения VK_API_TOKEN. Адрес
+API можно переопределить переменной VK_API_URL, например, чтобы работать
+с локальной заглушкой benchmarks/vk_stub.py. При ошибке авторизации
+вызывающий код переключается на сбор через Selenium (см. vk_parser.search).
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+import requests
+
+from utils.records import VideoRecord
+from utils.instrumentation import span, incr
+from utils.log import get_logger
+from parsers.registry import rate_limiter
+
+logger = get_logger("vk")
+
+API_URL = "https://api.vk.com/method"
+API_VERSION = "5.199"
+# Максимум записей в одном ответе video.search
+PAGE_SIZE = 200
+# Сортировка video.search по дате добавления (2 - по релевантности)
+SORT_BY_DATE = 0
+REQUEST_TIMEOUT = 15
+# Коды ошибок API: авторизация (токен недействителен, требуется проверка)
+# и ограничение запросов (слишком часто, флуд-контроль, капча)
+AUTH_ERROR_CODES = frozenset({5, 15, 17, 27, 28})
+BLOCK_ERROR_CODES = frozenset({6, 9, 14, 29})
+# Тип записи video.search для клипов: filters=short возвращает и обычные короткие видео
+CLIP_TYPE = "short_video"
+
+_http = None
+_http_lock = threading.Lock()
+# Токен отклонен API: до перезапуска сбор идет через Selenium
+_unauthorized = False
+
+
+class VkAuthError(Exception):
+    """Токен отсутствует или отклонен API VK"""
+
+
+class VkBlockedError(Exception):
+    """API VK ограничил запросы (флуд-контроль, капча)"""
+
+
+def api_token():
+    """Токен API VK из окружения (None, если не задан)"""
+    return os.environ.get("VK_API_TOKEN") or None
+
+
+def available():
+    """Можно ли собирать клипы через API (токен задан и не был отклонен)"""
+    return api_token() is not None and not _unauthorized
+
+
+def search_clips(query, limit=100, days_ago=30, token=None):
+    """
+    Ищет клипы через video.search с постраничной загрузкой
+
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество клипов
+        days_ago (int): Только клипы за последние N дней
+        token (str, optional): Токен API (по умолчанию - VK_API_TOKEN)
+
+    Returns:
+        list: Список записей VideoRecord
+
+    Raises:
+        VkAuthError: Токен не задан или отклонен
+        VkBlockedError: API ограничил запросы
+    """
+    token = token or api_token()
+    if not token:
+        raise VkAuthError("не задан VK_API_TOKEN")
+
+    # Как и в остальных сборщиках, окно считается в календарных днях (см. parsers.registry.blocking_search)
+    cutoff_day = (datetime.now() - timedelta(days=days_ago)).date()
+    results = []
+    seen = set()
+    offset = 0
+    reached_cutoff = False
+    while len(results) < limit and not reached_cutoff:
+        # sort=0 - по дате добавления: после первого клипа старше окна остальные тоже старше
+        response = _call("video.search", token, q=query, sort=SORT_BY_DATE, filters="short", extended=1,
+                         adult=0, count=PAGE_SIZE, offset=offset)
+        items = response.get('items', [])
+        owners = _owner_names(response)
+        for item in items:
+            if datetime.fromtimestamp(item.get('date', 0)).date() < cutoff_day:
+                incr("videos_skipped", platform="vk", reason="too_old")
+                reached_cutoff = True
+                break
+            record = _build_record(item, owners, query)
+            if record.video_id in seen:
+                continue
+            seen.add(record.video_id)
+            results.append(record)
+            incr("videos_collected", platform="vk")
+
+        offset += len(items)
+        incr("api_pages", platform="vk")
+        if len(items) < PAGE_SIZE or offset >= response.get('count', 0):
+            break
+
+    logger.info("Собрано %s VK клипов через API", len(results))
+    results.sort(key=lambda record: record.views, reverse=True)
+    return results[:limit]
+
+
+def _call(method, token, **params):
+    """Выполняет запрос к API через общую HTTP-сессию и разбирает ошибки"""
+    global _unauthorized
+    rate_limiter('vk').acquire()
+    url = f"{os.environ.get('VK_API_URL') or API_URL}/{method}"
+    params.update(access_token=token, v=API_VERSION)
+    with span("http_request", platform="vk"):
+        response = _session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+
+    if response.status_code == 429:
+        rate_limiter('vk').report_block(f"HTTP 429 {method}")
+        raise VkBlockedError("HTTP 429")
+    response.raise_for_status()
+
+    payload = response.json()
+    error = payload.get('error')
+    if error:
+        code, message = error.get('error_code'), error.get('error_msg', '')
+        if code in AUTH_ERROR_CODES:
+            _unauthorized = True
+            raise VkAuthError(f"{code}: {message}")
+        if code in BLOCK_ERROR_CODES:
+            rate_limiter('vk').report_block(f"API {code}: {message}")
+            raise VkBlockedError(f"{code}: {message}")
+        raise RuntimeError(f"Ошибка API VK {code}: {message}")
+    return payload.get('response', {})
+
+
+def _session():
+    """Общая HTTP-сессия: соединения с API переиспользуются между запросами и сборами"""
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = requests.Session()
+        return _http
+
+
+def _owner_names(response):
+    """Имена авторов из extended-ответа: ID владельца -> имя (у сообществ ID отрицательный)"""
+    owners = {}
+    for profile in response.get('profiles', []):
+        owners[profile['id']] = f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip()
+    for group in response.get('groups', []):
+        owners[-group['id']] = group.get('name', '')
+    return owners
+
+
+def _build_record(item, owners, query):
+    video_id = f"{item['owner_id']}_{item['id']}"
+    return VideoRecord(
+        platform='VK Клипы',
+        video_id=video_id,
+        title=item.get('title') or "Без названия",
+        url=_video_url(item, video_id),
+        views=item.get('views', 0),
+        likes=(item.get('likes') or {}).get('count', 0),
+        comments=item.get('comments', 0),
+        shares=(item.get('reposts') or {}).get('count', 0),
+        publish_date=datetime.fromtimestamp(item['date']) if item.get('date') else None,
+        channel=owners.get(item['owner_id']) or "Неизвестный автор",
+        query=query
+    )
+
+
+def _video_url(item, video_id):
+    """Адрес записи: клипы открываются по /clip, остальные короткие видео - по /video"""
+    if item.get('type') == CLIP_TYPE:
+        return f"https://vk.com/clip{video_id}"
+    return f"https://vk.com/video{video_id}"
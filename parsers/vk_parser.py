@@ -2,16 +2,74 @@ import time
 import re
 import json
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
+from utils.records import VideoRecord
+from utils.counts import parse_count
+from utils.dates import parse_date, days_since
+from utils.instrumentation import span, incr, instrument_driver
+from utils.log import get_logger, setup_logging
+from utils.browser import (apply_lean_options, apply_lean_driver, apply_warm_profile, start_with_profile,
+                           save_cookies, load_cookies)
+from utils.rate_limit import is_block_url
+from utils import cookie_store
+from parsers.registry import blocking_search, rate_limiter
+from parsers import vk_api
 
-def parse_vk_clips(query, limit=100, days_ago=30, headless=True, wait_time=10, browser_profile=None):
+logger = get_logger("vk")
+
+# Сбор в нескольких вкладках (parse_vk_clips_tabs): минимальная пауза между
+# прокрутками одной вкладки (секунды), число прокруток подряд без новых клипов,
+# после которого вкладка считается исчерпанной, и максимум прокруток вкладки
+TAB_SCROLL_WAIT = 2.0
+TAB_STALE_SCROLLS = 2
+TAB_MAX_SCROLLS = 30
+# Извлечение при прокрутке (scroll_and_extract): обработанные клипы помечаются атрибутом
+# и удаляются из DOM, кроме PRUNE_KEEP последних, к которым привязана подгрузка
+CLIP_SELECTOR = "div.VideoHighlights__item"
+CLIP_SEEN_ATTR = "data-parser-seen"
+NEW_CLIP_SELECTOR = f"{CLIP_SELECTOR}:not([{CLIP_SEEN_ATTR}])"
+PRUNE_KEEP = 6
+MAX_SCROLLS = 30
+MAX_STALE_SCROLLS = 2
+MARK_CLIPS_SCRIPT = f"""
+const [clips, prune, keep] = arguments;
+clips.forEach(clip => clip.setAttribute('{CLIP_SEEN_ATTR}', '1'));
+if (prune) {{
+    const seen = document.querySelectorAll('{CLIP_SELECTOR}[{CLIP_SEEN_ATTR}]');
+    for (let i = 0; i < seen.length - keep; i++) seen[i].remove();
+}}
+"""
+# Параллельный сбор (parse_vk_clips_parallel): браузеров по умолчанию и максимум вариантов запроса
+PARALLEL_DRIVERS = 3
+PARALLEL_MAX_VARIANTS = 6
+# Дополнение метрик (enrich_clips): запросов к VK за сбор, одновременных запросов
+# и срок годности метрик в кэше (секунды)
+ENRICH_BUDGET = 20
+ENRICH_WORKERS = 4
+ENRICH_TTL = 6 * 60 * 60
+CLIP_STATS_CACHE = "data/cache/vk_clip_stats.json"
+ENRICH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:100.0) Gecko/20100101 Firefox/100.0',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+# Счетчики клипа в его объекте данных страницы: поле записи -> ключ ("likes":12 или "likes":{"count":12})
+CLIP_STATS_KEYS = (('likes', 'likes'), ('comments', 'comments'), ('shares', 'reposts'))
+_json_decoder = json.JSONDecoder()
+
+def parse_vk_clips(query, limit=100, days_ago=30, headless=True, wait_time=10, browser_profile=None, driver=None,
+                   lean=True):
     """
     Парсер VK Клипов с использованием Selenium
     
@@ -22,88 +80,462 @@ def parse_vk_clips(query, limit=100, days_ago=30, headless=True, wait_time=10, b
         headless (bool): Запускать браузер в фоновом режиме
         wait_time (int): Время ожидания загрузки элементов (в секундах)
         browser_profile (str): Путь к профилю браузера (для использования существующих cookies)
+        driver (WebDriver, optional): Уже запущенный браузер (см. create_driver); он не закрывается
+            после сбора, поэтому его можно переиспользовать между запросами
+        lean (bool): Легкий режим браузера (см. utils.browser), если он запускается здесь
 
     Returns:
-        list: Список словарей с данными о видео
+        list: Список записей VideoRecord
     """
     results = []
     collected_video_ids = set()  # Для отслеживания уникальных видео
     cutoff_date = datetime.now() - timedelta(days=days_ago)
     
-    print(f"Сбор VK Клипов за последние {days_ago} дней по запросу '{query}'...")
+    logger.info("Сбор VK Клипов за последние %s дней по запросу '%s'...", days_ago, query)
 
     # Настройка Selenium
-    if browser_profile:
-        driver = setup_driver_with_profile(browser_profile, headless)
-    else:
-        # Запрашиваем ручную авторизацию, если профиль не указан
-        driver = setup_driver(headless)
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_driver(headless, browser_profile, lean)
     
     if not driver:
-        print("Не удалось инициализировать драйвер браузера")
+        logger.error("Не удалось инициализировать драйвер браузера")
         return results
+    # Считаем обращения к браузеру
+    driver = instrument_driver(driver, "vk")
 
     try:
-        # Переходим на страницу клипов
-        driver.get("https://vk.com/clips")
-        
-        # Проверяем, авторизованы ли мы
-        if not is_logged_in(driver):
-            print("Вы не авторизованы в VK. Дайте 15 секунд, чтобы войти вручную...")
-            time.sleep(15)  # Даем время для ручного входа
-            
-            # Проверяем еще раз после паузы
-            if not is_logged_in(driver):
-                print("Авторизация не выполнена. Парсинг может быть ограничен.")
-        else:
-            print("Авторизация в VK успешна!")
+        if not open_clips_page(driver):
+            return results
         
         # Ждем загрузки страницы
         time.sleep(3)
         
         # Ищем клипы по запросу
-        search_clips(driver, query, wait_time)
+        rate_limiter('vk').acquire()
+        with span("search", platform="vk"):
+            search_clips(driver, query, wait_time)
         
-        # Прокручиваем страницу для загрузки большего количества клипов
-        clips_loaded = scroll_for_clips(driver, limit, wait_time)
+        # Прокручиваем страницу, извлекая подгруженные клипы после каждой прокрутки
+        results.extend(scroll_and_extract(driver, limit, query, cutoff_date, collected_video_ids, wait_time))
         
-        print(f"Найдено клипов: {clips_loaded}. Извлекаем данные...")
-
-        # Извлекаем данные о клипах
-        clips_data = extract_clips_data(driver, limit, query, cutoff_date, collected_video_ids)
-        
-        # Добавляем полученные данные в результаты
-        results.extend(clips_data)
-        
-        print(f"Собрано {len(results)} VK клипов")
+        logger.info("Собрано %s VK клипов", len(results))
     
     except Exception as e:
-        print(f"Ошибка при парсинге VK клипов: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Ошибка при парсинге VK клипов: %s", e)
     
     finally:
-        # Закрываем браузер
-        driver.quit()
+        # Закрываем браузер, если он был запущен для этого поиска
+        if owns_driver:
+            driver.quit()
     
     # Сортируем результаты по просмотрам (если есть)
-    results.sort(key=lambda x: _safe_int(x.get('views', '0').replace(' ', '')), reverse=True)
+    results.sort(key=lambda x: x.views, reverse=True)
     
     # Статистика по метрикам
     if results:
-        with_likes = len([v for v in results if _safe_int(v.get('likes', '0').replace(' ', '')) > 0])
-        with_comments = len([v for v in results if _safe_int(v.get('comments', '0').replace(' ', '')) > 0])
+        with_likes = sum(1 for v in results if v.likes > 0)
+        with_comments = sum(1 for v in results if v.comments > 0)
         
-        print(f"Статистика метрик: клипы с лайками: {with_likes}/{len(results)}, с комментариями: {with_comments}/{len(results)}")
+        logger.info("Статистика метрик: клипы с лайками: %s/%s, с комментариями: %s/%s", with_likes, len(results), with_comments, len(results))
     
     return results[:limit]
 
-def setup_driver(headless=True):
+def parse_vk_clips_tabs(query, limit=100, days_ago=30, tabs=3, headless=True, wait_time=10,
+                       browser_profile=None, driver=None, lean=True):
+    """
+    Парсер VK Клипов в нескольких вкладках одного браузера
+    
+    Каждая вкладка ищет свой вариант запроса (см. query_variants). Вкладки
+    прокручиваются по очереди: пока в одной подгружаются клипы, в другой
+    проверяется результат прокрутки или извлекаются данные. Браузер и
+    авторизация в VK общие для всех вкладок.
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео для сбора (по всем вкладкам)
+        days_ago (int): Сбор видео за последние N дней
+        tabs (int): Количество вкладок
+        headless (bool): Запускать браузер в фоновом режиме
+        wait_time (int): Время ожидания загрузки элементов (в секундах)
+        browser_profile (str): Путь к профилю браузера
+        driver (WebDriver, optional): Уже запущенный браузер; он не закрывается после сбора
+        lean (bool): Легкий режим браузера (см. utils.browser), если он запускается здесь
+
+    Returns:
+        list: Список записей VideoRecord
+    """
+    results = []
+    collected_video_ids = set()
+    cutoff_date = datetime.now() - timedelta(days=days_ago)
+    variants = query_variants(query, tabs)
+    
+    logger.info("Сбор VK Клипов за последние %s дней по запросу '%s' в %s вкладках...",
+                days_ago, query, len(variants))
+
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_driver(headless, browser_profile, lean)
+    
+    if not driver:
+        logger.error("Не удалось инициализировать драйвер браузера")
+        return results
+    driver = instrument_driver(driver, "vk")
+    main_window = driver.current_window_handle
+    
+    try:
+        if not open_clips_page(driver):
+            return results
+        
+        # Открываем вкладки и запускаем в них поиск, не дожидаясь результатов
+        pending = []
+        for index, variant in enumerate(variants):
+            if index:
+                driver.switch_to.new_window('tab')
+                rate_limiter('vk').acquire()
+                with span("page_load", platform="vk"):
+                    driver.get("https://vk.com/clips")
+                if is_block_url(driver.current_url):
+                    rate_limiter('vk').report_block(driver.current_url)
+                    break
+            rate_limiter('vk').acquire()
+            with span("search", platform="vk"):
+                if search_clips(driver, variant, wait_time, settle=0):
+                    pending.append(_TabState(driver.current_window_handle, variant))
+        
+        with span("scroll", platform="vk", mode="tabs"):
+            while pending and len(results) < limit:
+                tab = pending.pop(0)
+                # Остальные вкладки обрабатываются, пока эта подгружает клипы
+                time.sleep(max(0.0, tab.scrolled_at + TAB_SCROLL_WAIT - time.time()))
+                driver.switch_to.window(tab.handle)
+                
+                # Новые клипы вкладки извлекаются при каждом ее посещении
+                new_clips = driver.find_elements(By.CSS_SELECTOR, NEW_CLIP_SELECTOR)
+                if new_clips:
+                    with span("extraction", platform="vk"):
+                        results.extend(extract_clips_data(driver, limit - len(results), query, cutoff_date,
+                                                          collected_video_ids, clips=new_clips))
+                        driver.execute_script(MARK_CLIPS_SCRIPT, new_clips, True, PRUNE_KEEP)
+                
+                if len(results) < limit and _scroll_tab(driver, tab, len(new_clips)):
+                    pending.append(tab)
+                    continue
+                
+                logger.debug("Вкладка '%s': обработано %s клипов после %s прокруток",
+                             tab.variant, tab.clips, tab.scrolls)
+        
+        logger.info("Собрано %s VK клипов", len(results))
+    
+    except Exception as e:
+        logger.exception("Ошибка при парсинге VK клипов во вкладках: %s", e)
+    
+    finally:
+        if owns_driver:
+            driver.quit()
+        else:
+            _close_extra_tabs(driver, main_window)
+    
+    results.sort(key=lambda x: x.views, reverse=True)
+    return results[:limit]
+
+class _TabState:
+    """Состояние вкладки при сборе в нескольких вкладках"""
+
+    __slots__ = ('handle', 'variant', 'clips', 'scrolls', 'stale', 'scrolled_at')
+
+    def __init__(self, handle, variant):
+        self.handle = handle
+        self.variant = variant
+        self.clips = 0
+        self.scrolls = 0
+        self.stale = 0
+        self.scrolled_at = time.time()
+
+def _scroll_tab(driver, tab, new_clips):
+    """
+    Учитывает клипы, подгруженные предыдущей прокруткой вкладки, и прокручивает ее дальше
+
+    Returns:
+        bool: True, если вкладку нужно прокручивать дальше
+    """
+    if new_clips:
+        tab.clips += new_clips
+        tab.stale = 0
+    elif tab.scrolls:
+        tab.stale += 1
+    if tab.stale >= TAB_STALE_SCROLLS or tab.scrolls >= TAB_MAX_SCROLLS:
+        return False
+    
+    rate_limiter('vk').acquire()
+    incr("scroll_iterations", platform="vk")
+    driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
+    tab.scrolls += 1
+    tab.scrolled_at = time.time()
+    return True
+
+def _close_extra_tabs(driver, main_window):
+    """Закрывает вкладки, открытые при сборе, чтобы браузер можно было вернуть в пул"""
+    try:
+        for handle in driver.window_handles:
+            if handle != main_window:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(main_window)
+    except Exception as e:
+        logger.warning("Не удалось закрыть вкладки браузера: %s", e)
+
+def query_variants(query, count):
+    """
+    Варианты поискового запроса для сбора в нескольких вкладках
+    
+    Args:
+        query (str): Поисковый запрос
+        count (int): Максимальное количество вариантов
+
+    Returns:
+        list: Запрос, хэштег из него и отдельные слова запроса (без повторов)
+    """
+    words = query.split()
+    candidates = [query, '#' + ''.join(words).lstrip('#')]
+    if len(words) > 1:
+        candidates.extend(word for word in words if len(word) > 3)
+    
+    variants = []
+    for candidate in candidates:
+        if candidate.lower() not in (variant.lower() for variant in variants):
+            variants.append(candidate)
+    return variants[:max(1, count)]
+
+def parse_vk_clips_parallel(query, limit=100, days_ago=30, workers=0, headless=True, wait_time=10,
+                            browser_profile=None, driver=None, lean=True):
+    """
+    Параллельный парсер VK Клипов в нескольких браузерах
+    
+    Каждый браузер берет из общей очереди варианты запроса (см. query_variants)
+    и собирает их по очереди; уже собранные клипы не извлекаются повторно
+    другими браузерами. Авторизуется только первый браузер: его cookies
+    сохраняются (см. utils.cookie_store) и загружаются в остальные, поэтому
+    ручной вход выполняется один раз. Частоту запросов всех браузеров
+    ограничивает общий rate_limiter('vk').
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео для сбора (по всем браузерам)
+        days_ago (int): Сбор видео за последние N дней
+        workers (int): Количество браузеров (0 - PARALLEL_DRIVERS)
+        headless (bool): Запускать браузеры в фоновом режиме
+        wait_time (int): Время ожидания загрузки элементов (в секундах)
+        browser_profile (str): Путь к профилю браузера для первого браузера
+        driver (WebDriver, optional): Уже запущенный браузер (из пула сессии), используется
+            как первый; он не закрывается после сбора
+        lean (bool): Легкий режим для дополнительных браузеров
+
+    Returns:
+        list: Список записей VideoRecord
+    """
+    results = []
+    results_lock = threading.Lock()
+    collected_video_ids = set()
+    cutoff_date = datetime.now() - timedelta(days=days_ago)
+    stop_event = threading.Event()
+    
+    variants = queue.Queue()
+    for variant in query_variants(query, PARALLEL_MAX_VARIANTS):
+        variants.put(variant)
+    workers = min(workers or PARALLEL_DRIVERS, variants.qsize())
+    
+    logger.info("Сбор VK Клипов за последние %s дней по запросу '%s' в %s браузерах...",
+                days_ago, query, workers)
+
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_driver(headless, browser_profile, lean)
+    if not driver:
+        logger.error("Не удалось инициализировать драйвер браузера")
+        return results
+    driver = instrument_driver(driver, "vk")
+
+    def collect(worker_driver, first):
+        """Собирает варианты запроса из очереди в одном браузере"""
+        while not stop_event.is_set():
+            try:
+                variant = variants.get_nowait()
+            except queue.Empty:
+                return
+            if not first and not open_clips_page(worker_driver, manual_auth=False):
+                stop_event.set()
+                return
+            first = False
+            
+            rate_limiter('vk').acquire()
+            with span("search", platform="vk"):
+                if not search_clips(worker_driver, variant, wait_time):
+                    continue
+            clips = scroll_and_extract(worker_driver, limit, query, cutoff_date, collected_video_ids, wait_time)
+            
+            with results_lock:
+                results.extend(clips)
+                if len(results) >= limit:
+                    stop_event.set()
+            logger.debug("Вариант '%s': собрано %s клипов", variant, len(clips))
+
+    def run_extra_worker():
+        """Запускает дополнительный браузер с сессией первого и собирает в нем"""
+        with span("driver_startup", platform="vk"):
+            extra = create_driver(headless, None, lean)
+        if not extra:
+            logger.warning("Не удалось запустить дополнительный браузер для VK")
+            return
+        extra = instrument_driver(extra, "vk")
+        try:
+            load_cookies(extra, "vk")
+            collect(extra, first=False)
+        finally:
+            extra.quit()
+
+    try:
+        if not open_clips_page(driver):
+            return results
+        # Делимся сессией первого браузера с остальными
+        save_cookies(driver, "vk")
+        time.sleep(3)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vk") as executor:
+            futures = [executor.submit(run_extra_worker) for _ in range(workers - 1)]
+            collect(driver, first=True)
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("Ошибка в дополнительном браузере VK: %s", e)
+    
+    except Exception as e:
+        logger.exception("Ошибка при параллельном парсинге VK клипов: %s", e)
+    
+    finally:
+        if owns_driver:
+            driver.quit()
+    
+    # Клип мог быть извлечен двумя браузерами одновременно
+    unique = {}
+    for record in results:
+        unique.setdefault(record.video_id, record)
+    results = sorted(unique.values(), key=lambda x: x.views, reverse=True)
+    logger.info("Собрано %s VK клипов", len(results))
+    return results[:limit]
+
+async def search(query, limit, since, resource=None, tabs=1, parallel=False, workers=0,
+                 headless=True, browser_profile=None, lean_browser=True, enrich=ENRICH_BUDGET, **options):
+    """
+    Общий интерфейс парсеров (см. parsers.registry)
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        since (datetime): Видео, опубликованные раньше дня since, не возвращаются
+        resource (WebDriver, optional): Браузер из пула сессии
+        tabs (int): Количество вкладок браузера (больше 1 - см. parse_vk_clips_tabs)
+        parallel (bool): Сбор в нескольких браузерах (см. parse_vk_clips_parallel)
+        workers (int): Количество браузеров при parallel (0 - авто)
+        headless (bool): Запускать браузеры, не взятые из пула, в фоновом режиме
+        browser_profile (str, optional): Путь к профилю браузера для VK
+        lean_browser (bool): Легкий режим браузеров, не взятых из пула
+        enrich (int): Сколько клипов дополнить лайками и комментариями (см. enrich_clips, 0 - не дополнять)
+        
+    Yields:
+        VideoRecord: Записи о видео
+    """
+    # Параметры браузера нужны и при переключении с API: тогда браузер запускается без пула
+    browser_options = dict(headless=headless, browser_profile=browser_profile, lean=lean_browser)
+    if parallel:
+        func = partial(parse_vk_clips_parallel, workers=workers, **browser_options)
+    elif tabs > 1:
+        func = partial(parse_vk_clips_tabs, tabs=tabs, **browser_options)
+    else:
+        func = partial(parse_vk_clips, **browser_options)
+    if vk_api.available():
+        func = partial(parse_vk_clips_http, fallback=func)
+    async for record in blocking_search(since, _collect_and_enrich, func, enrich, query=query, limit=limit,
+                                        days_ago=days_since(since), driver=resource):
+        yield record
+
+def needs_resource(**options):
+    """Браузер из пула нужен, только если клипы нельзя собрать через API (см. parsers.registry)"""
+    return not vk_api.available()
+
+def parse_vk_clips_http(query, limit=100, days_ago=30, fallback=parse_vk_clips, **kwargs):
+    """
+    Собирает VK Клипы через API без браузера (см. parsers.vk_api)
+    
+    Если токен не задан или отклонен либо API недоступно (сеть, ошибка
+    HTTP), сбор выполняется через Selenium. Прочие ошибки (разбор ответа,
+    неизвестные коды API) не скрываются переключением на браузер.
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео для сбора
+        days_ago (int): Сбор видео за последние N дней
+        fallback (callable): Сборщик через браузер (parse_vk_clips и аналоги)
+        **kwargs: Аргументы сборщика через браузер (driver и т.п.)
+
+    Returns:
+        list: Список записей VideoRecord
+    """
+    try:
+        with span("api", platform="vk"):
+            return vk_api.search_clips(query, limit, days_ago)
+    except vk_api.VkBlockedError as e:
+        logger.warning("API VK ограничило запросы: %s", e)
+        return []
+    except vk_api.VkAuthError as e:
+        logger.warning("Сбор через API VK невозможен (%s), используем браузер", e)
+    except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+        logger.warning("API VK недоступно (%s), используем браузер", e)
+    return fallback(query=query, limit=limit, days_ago=days_ago, **kwargs)
+
+def create_resource(headless=True, browser_profile=None, lean=True):
+    """Прогретый ресурс для пула сессии (см. parsers.registry): браузер"""
+    return create_driver(headless, browser_profile, lean)
+
+def close_resource(driver):
+    driver.quit()
+
+def is_alive(driver):
+    """Отвечает ли браузер из пула (см. parsers.registry)"""
+    try:
+        return bool(driver.window_handles)
+    except WebDriverException:
+        return False
+
+def create_driver(headless=True, browser_profile=None, lean=True):
+    """
+    Запускает браузер для парсинга VK (с профилем, если он указан)
+    
+    Args:
+        headless (bool): Запускать браузер в фоновом режиме
+        browser_profile (str, optional): Путь к профилю браузера
+        lean (bool): Легкий режим без изображений, шрифтов и медиа (см. utils.browser)
+
+    Returns:
+        WebDriver: Экземпляр веб-драйвера или None, если запустить браузер не удалось
+    """
+    with span("driver_startup", platform="vk"):
+        if browser_profile:
+            return setup_driver_with_profile(browser_profile, headless, lean)
+        # Запрашиваем ручную авторизацию, если профиль не указан
+        return setup_driver(headless, lean)
+
+def setup_driver(headless=True, lean=True):
     """
     Настраивает и возвращает веб-драйвер для Selenium
     
+    Браузер запускается с копией прогретого профиля VK (см. utils.browser_profiles):
+    кэш статики и cookies сохраняются между запусками.
+    
     Args:
         headless (bool): Запускать браузер в фоновом режиме
+        lean (bool): Легкий режим без изображений, шрифтов и медиа
 
     Returns:
         WebDriver: Экземпляр веб-драйвера
@@ -117,44 +549,51 @@ def setup_driver(headless=True):
             options = FirefoxOptions()
             if headless:
                 options.add_argument("--headless")
+            browser, clone = apply_warm_profile(options, "vk")
+            if lean:
+                apply_lean_options(options, disk_cache=True)
             
             options.add_argument("--disable-blink-features=AutomationControlled")
             options.set_preference("dom.webdriver.enabled", False)
             options.set_preference("useAutomationExtension", False)
             
-            driver = webdriver.Firefox(options=options)
-            return driver
+            driver = start_with_profile(lambda: webdriver.Firefox(options=options), "vk", browser, clone)
+            return apply_lean_driver(driver) if lean else driver
         except Exception as e:
-            print(f"Не удалось инициализировать Firefox драйвер: {e}")
+            logger.warning("Не удалось инициализировать Firefox драйвер: %s", e)
             
             # Пробуем Chrome
             try:
                 options = ChromeOptions()
                 if headless:
                     options.add_argument("--headless")
+                browser, clone = apply_warm_profile(options, "vk")
+                if lean:
+                    apply_lean_options(options, disk_cache=True)
                 
                 options.add_argument("--disable-blink-features=AutomationControlled")
                 options.add_experimental_option("excludeSwitches", ["enable-automation"])
                 options.add_experimental_option("useAutomationExtension", False)
                 
-                driver = webdriver.Chrome(options=options)
+                driver = start_with_profile(lambda: webdriver.Chrome(options=options), "vk", browser, clone)
                 driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                return driver
+                return apply_lean_driver(driver) if lean else driver
             except Exception as e:
-                print(f"Не удалось инициализировать Chrome драйвер: {e}")
+                logger.error("Не удалось инициализировать Chrome драйвер: %s", e)
                 return None
     
     except Exception as e:
-        print(f"Ошибка при настройке драйвера: {e}")
+        logger.error("Ошибка при настройке драйвера: %s", e)
         return None
 
-def setup_driver_with_profile(profile_path, headless=True):
+def setup_driver_with_profile(profile_path, headless=True, lean=True):
     """
     Настраивает и возвращает веб-драйвер с использованием существующего профиля браузера
     
     Args:
         profile_path (str): Путь к профилю браузера
         headless (bool): Запускать браузер в фоновом режиме
+        lean (bool): Легкий режим без изображений, шрифтов и медиа
 
     Returns:
         WebDriver: Экземпляр веб-драйвера
@@ -168,6 +607,8 @@ def setup_driver_with_profile(profile_path, headless=True):
             options = FirefoxOptions()
             if headless:
                 options.add_argument("--headless")
+            if lean:
+                apply_lean_options(options)
             
             options.add_argument("--disable-blink-features=AutomationControlled")
             options.set_preference("dom.webdriver.enabled", False)
@@ -178,9 +619,9 @@ def setup_driver_with_profile(profile_path, headless=True):
             
             try:
                 driver = webdriver.Firefox(options=options)
-                return driver
+                return apply_lean_driver(driver) if lean else driver
             except Exception as e:
-                print(f"Ошибка при запуске Firefox с профилем: {e}")
+                logger.error("Ошибка при запуске Firefox с профилем: %s", e)
                 return None
         else:
             # Предполагаем, что это профиль Chrome
@@ -190,6 +631,8 @@ def setup_driver_with_profile(profile_path, headless=True):
             options = ChromeOptions()
             if headless:
                 options.add_argument("--headless")
+            if lean:
+                apply_lean_options(options)
             
             options.add_argument(f"--user-data-dir={profile_path}")
             options.add_argument("--disable-blink-features=AutomationControlled")
@@ -199,15 +642,50 @@ def setup_driver_with_profile(profile_path, headless=True):
             try:
                 driver = webdriver.Chrome(options=options)
                 driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                return driver
+                return apply_lean_driver(driver) if lean else driver
             except Exception as e:
-                print(f"Ошибка при запуске Chrome с профилем: {e}")
+                logger.error("Ошибка при запуске Chrome с профилем: %s", e)
                 return None
     
     except Exception as e:
-        print(f"Ошибка при настройке драйвера с профилем: {e}")
+        logger.error("Ошибка при настройке драйвера с профилем: %s", e)
         return None
 
+def open_clips_page(driver, manual_auth=True):
+    """
+    Открывает страницу клипов и проверяет авторизацию в VK
+    
+    Args:
+        driver: Экземпляр веб-драйвера
+        manual_auth (bool): Дать время на ручной вход, если пользователь не авторизован
+
+    Returns:
+        bool: False, если VK перенаправил на страницу проверки (капча)
+    """
+    rate_limiter('vk').acquire()
+    with span("page_load", platform="vk"):
+        driver.get("https://vk.com/clips")
+    
+    # VK перенаправляет на страницу проверки (капча) при слишком частых запросах
+    if is_block_url(driver.current_url):
+        rate_limiter('vk').report_block(driver.current_url)
+        return False
+    
+    # Проверяем, авторизованы ли мы
+    if not is_logged_in(driver):
+        if not manual_auth:
+            logger.warning("Браузер не авторизован в VK. Парсинг может быть ограничен.")
+            return True
+        logger.warning("Вы не авторизованы в VK. Дайте 15 секунд, чтобы войти вручную...")
+        time.sleep(15)  # Даем время для ручного входа
+        
+        # Проверяем еще раз после паузы
+        if not is_logged_in(driver):
+            logger.warning("Авторизация не выполнена. Парсинг может быть ограничен.")
+    else:
+        logger.info("Авторизация в VK успешна!")
+    return True
+
 def is_logged_in(driver, timeout=5):
     """
     Проверяет, авторизован ли пользователь в VK
@@ -236,7 +714,7 @@ def is_logged_in(driver, timeout=5):
         except:
             return False
 
-def search_clips(driver, query, wait_time=10):
+def search_clips(driver, query, wait_time=10, settle=3):
     """
     Выполняет поиск клипов по запросу
     
@@ -244,6 +722,7 @@ def search_clips(driver, query, wait_time=10):
         driver: Экземпляр веб-драйвера
         query (str): Поисковый запрос
         wait_time (int): Время ожидания элементов
+        settle (float): Пауза для загрузки результатов (секунды)
 
     Returns:
         bool: True если поиск выполнен успешно, иначе False
@@ -260,84 +739,78 @@ def search_clips(driver, query, wait_time=10):
         search_input.send_keys(Keys.ENTER)
         
         # Ждем загрузки результатов
-        time.sleep(3)
+        time.sleep(settle)
         
-        print(f"Поиск клипов по запросу '{query}' выполнен")
+        logger.info("Поиск клипов по запросу '%s' выполнен", query)
         return True
     
     except Exception as e:
-        print(f"Ошибка при поиске клипов: {e}")
+        logger.warning("Ошибка при поиске клипов: %s", e)
         return False
 
-def scroll_for_clips(driver, limit, wait_time=10):
+def scroll_and_extract(driver, limit, query, cutoff_date, collected_video_ids, wait_time=10, prune=True):
     """
-    Прокручивает страницу для загрузки большего количества клипов
+    Прокручивает страницу и извлекает клипы по мере их подгрузки
+    
+    После каждой прокрутки извлекаются только новые клипы: обработанные
+    элементы помечаются атрибутом (CLIP_SEEN_ATTR), а при prune удаляются
+    из DOM, кроме нескольких последних, к которым привязана подгрузка.
+    Поэтому память страницы не растет с числом прокруток, а клипы,
+    которые VK переиспользует или скрывает при прокрутке, не теряются.
     
     Args:
         driver: Экземпляр веб-драйвера
-        limit (int): Максимальное количество клипов для загрузки
+        limit (int): Максимальное количество клипов для сбора
+        query (str): Поисковый запрос
+        cutoff_date (datetime): Дата отсечки для фильтрации по времени
+        collected_video_ids (set): Множество уже собранных ID видео
         wait_time (int): Время ожидания элементов
+        prune (bool): Удалять обработанные клипы из DOM
 
     Returns:
-        int: Количество загруженных клипов
+        list: Список записей VideoRecord
     """
+    results = []
     try:
-        scroll_count = 0
-        max_scrolls = 30  # Ограничение на количество прокруток
-        
-        # Находим контейнер с клипами
-        clips_container = WebDriverWait(driver, wait_time).until(
+        # Ждем появления списка клипов
+        WebDriverWait(driver, wait_time).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.VideoHighlights__list"))
         )
         
-        # Функция для получения текущего количества клипов
-        def get_clips_count():
-            clips = driver.find_elements(By.CSS_SELECTOR, "div.VideoHighlights__item")
-            return len(clips)
-        
-        # Начальное количество клипов
-        current_clips = get_clips_count()
-        
-        print(f"Начальное количество клипов: {current_clips}")
-        
-        # Прокручиваем страницу, пока не загрузим достаточное количество клипов или не достигнем ограничения
-        while current_clips < limit and scroll_count < max_scrolls:
-            # Прокручиваем к последнему клипу
-            driver.execute_script("arguments[0].scrollIntoView(false);", clips_container)
-            driver.execute_script("window.scrollBy(0, 500);")
-            
-            # Ждем загрузки новых клипов
-            time.sleep(2)
+        scroll_count = 0
+        stale_scrolls = 0
+        seen = 0
+        while True:
+            new_clips = driver.find_elements(By.CSS_SELECTOR, NEW_CLIP_SELECTOR)
+            if new_clips:
+                stale_scrolls = 0
+                seen += len(new_clips)
+                with span("extraction", platform="vk"):
+                    results.extend(extract_clips_data(driver, limit - len(results), query, cutoff_date,
+                                                      collected_video_ids, clips=new_clips))
+                    driver.execute_script(MARK_CLIPS_SCRIPT, new_clips, prune, PRUNE_KEEP)
+                logger.debug("Обработано %s клипов, собрано %s", seen, len(results))
+            elif scroll_count:
+                stale_scrolls += 1
             
-            # Проверяем, загрузились ли новые клипы
-            new_clips_count = get_clips_count()
+            if len(results) >= limit or stale_scrolls >= MAX_STALE_SCROLLS or scroll_count >= MAX_SCROLLS:
+                break
             
-            if new_clips_count > current_clips:
-                print(f"Загружено {new_clips_count} клипов")
-                current_clips = new_clips_count
-            else:
-                # Если количество не изменилось, делаем еще одну прокрутку
-                driver.execute_script("window.scrollBy(0, 1000);")
+            # Каждая прокрутка подгружает клипы запросом к VK
+            rate_limiter('vk').acquire()
+            incr("scroll_iterations", platform="vk")
+            with span("scroll", platform="vk"):
+                driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
                 time.sleep(2)
-                
-                # Проверяем еще раз
-                new_clips_count = get_clips_count()
-                if new_clips_count == current_clips:
-                    scroll_count += 1
-                else:
-                    current_clips = new_clips_count
-                    print(f"Загружено {current_clips} клипов")
-            
             scroll_count += 1
         
-        print(f"Всего загружено {current_clips} клипов после {scroll_count} прокруток")
-        return current_clips
+        logger.info("Обработано %s клипов после %s прокруток", seen, scroll_count)
     
     except Exception as e:
-        print(f"Ошибка при прокрутке страницы: {e}")
-        return 0
+        logger.warning("Ошибка при прокрутке страницы: %s", e)
+    return results
 
-def extract_clips_data(driver, limit, query, cutoff_date, collected_video_ids):
+def extract_clips_data(driver, limit, query, cutoff_date, collected_video_ids, clips=None):
     """
     Извлекает данные о клипах со страницы
     
@@ -347,99 +820,117 @@ def extract_clips_data(driver, limit, query, cutoff_date, collected_video_ids):
         query (str): Поисковый запрос
         cutoff_date (datetime): Дата отсечки для фильтрации по времени
         collected_video_ids (set): Множество уже собранных ID видео
+        clips (list, optional): Элементы клипов для извлечения (по умолчанию - все клипы на странице)
 
     Returns:
-        list: Список словарей с данными о клипах
+        list: Список записей VideoRecord
     """
     results = []
     
     try:
         # Находим все клипы на странице
-        clips = driver.find_elements(By.CSS_SELECTOR, "div.VideoHighlights__item")
+        if clips is None:
+            clips = driver.find_elements(By.CSS_SELECTOR, CLIP_SELECTOR)
         
-        print(f"Найдено {len(clips)} клипов для извлечения данных")
+        logger.debug("Найдено %s клипов для извлечения данных", len(clips))
         
         for i, clip in enumerate(clips):
             if len(results) >= limit:
                 break
             
             try:
-                # Извлекаем URL и ID видео
-                video_link_element = clip.find_element(By.CSS_SELECTOR, "a.VideoHighlightsItem__link")
-                video_url = video_link_element.get_attribute("href")
-                video_id = extract_video_id_from_url(video_url)
-                
-                if not video_id or video_id in collected_video_ids:
+                video_data = extract_clip(clip, query, cutoff_date, collected_video_ids)
+                if video_data is None:
                     continue
                 
-                # Извлекаем заголовок видео
-                try:
-                    title_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__description")
-                    title = title_element.text
-                except:
-                    title = "Без названия"
-                
-                # Извлекаем количество просмотров
-                try:
-                    views_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__views")
-                    views = views_element.text.replace("просмотров", "").replace("просмотра", "").strip()
-                except:
-                    views = "0"
-                
-                # Извлекаем имя канала
-                try:
-                    channel_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__author")
-                    channel = channel_element.text
-                except:
-                    channel = "Неизвестный автор"
-                
-                # Извлекаем дату публикации (если возможно)
-                publish_date, days_ago_value = extract_publish_date(clip)
-                
-                # Проверяем, соответствует ли видео фильтру по дате
-                if isinstance(days_ago_value, int) and days_ago_value > cutoff_date.days:
-                    print(f"Пропуск видео {video_id} - слишком старое ({days_ago_value} дней)")
-                    continue
-                
-                # Для получения дополнительных метрик (лайки, комментарии) нужно открыть страницу видео
-                # В данном случае мы упрощаем и устанавливаем приблизительные значения
-                
-                # Собираем данные о видео
-                video_data = {
-                    'platform': 'VK Клипы',
-                    'title': title,
-                    'url': video_url,
-                    'video_id': video_id,
-                    'views': views,
-                    'likes': '0',  # Требуется дополнительный запрос
-                    'comments': '0',  # Требуется дополнительный запрос
-                    'shares': '0',  # Требуется дополнительный запрос
-                    'publish_time': publish_date,
-                    'publish_date_formatted': publish_date,
-                    'days_ago': days_ago_value,
-                    'channel': channel,
-                    'query': query,
-                    'collected_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Добавляем ID в множество собранных
-                collected_video_ids.add(video_id)
-                
                 # Добавляем данные в результаты
                 results.append(video_data)
+                incr("videos_collected", platform="vk")
                 
                 if (i + 1) % 10 == 0:
-                    print(f"Обработано {i+1}/{len(clips)} клипов")
+                    logger.debug("Обработано %s/%s клипов", i+1, len(clips))
             
             except Exception as e:
-                print(f"Ошибка при извлечении данных о клипе {i}: {e}")
+                logger.warning("Ошибка при извлечении данных о клипе %s: %s", i, e)
                 continue
     
     except Exception as e:
-        print(f"Ошибка при извлечении данных о клипах: {e}")
+        logger.error("Ошибка при извлечении данных о клипах: %s", e)
     
     return results
 
+def extract_clip(clip, query, cutoff_date, collected_video_ids):
+    """
+    Извлекает данные об одном клипе
+    
+    Args:
+        clip: Элемент клипа
+        query (str): Поисковый запрос
+        cutoff_date (datetime): Дата отсечки для фильтрации по времени
+        collected_video_ids (set): Множество уже собранных ID видео (дополняется)
+
+    Returns:
+        VideoRecord: Запись о клипе или None (клип уже собран или слишком старый)
+    """
+    # Извлекаем URL и ID видео
+    video_link_element = clip.find_element(By.CSS_SELECTOR, "a.VideoHighlightsItem__link")
+    video_url = video_link_element.get_attribute("href")
+    video_id = extract_video_id_from_url(video_url)
+    
+    if not video_id or video_id in collected_video_ids:
+        return None
+    
+    # Извлекаем заголовок видео
+    try:
+        title_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__description")
+        title = title_element.text
+    except:
+        title = "Без названия"
+    
+    # Извлекаем количество просмотров
+    try:
+        views_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__views")
+        views = parse_count(views_element.text)
+    except:
+        views = 0
+    
+    # Извлекаем имя канала
+    try:
+        channel_element = clip.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__author")
+        channel = channel_element.text
+    except:
+        channel = "Неизвестный автор"
+    
+    # Извлекаем дату публикации (если возможно)
+    publish_date, days_ago_value = extract_publish_date(clip)
+    
+    # Проверяем, соответствует ли видео фильтру по дате
+    if publish_date is not None and publish_date.date() < cutoff_date.date():
+        logger.debug("Пропуск видео %s - слишком старое (%s дней)", video_id, days_ago_value)
+        incr("videos_skipped", platform="vk", reason="too_old")
+        return None
+    
+    # Лайки, комментарии и репосты есть только на странице клипа (см. enrich_clips)
+    
+    # Собираем данные о видео
+    video_data = VideoRecord(
+        platform='VK Клипы',
+        video_id=video_id,
+        title=title,
+        url=video_url,
+        views=views,
+        likes=0,
+        comments=0,
+        shares=0,
+        publish_date=publish_date,
+        channel=channel,
+        query=query
+    )
+    
+    # Добавляем ID в множество собранных
+    collected_video_ids.add(video_id)
+    return video_data
+
 def extract_video_id_from_url(url):
     """
     Извлекает ID видео из URL
@@ -476,96 +967,193 @@ def extract_publish_date(clip_element):
         clip_element: Элемент клипа
 
     Returns:
-        tuple: (formatted_date, days_ago)
+        tuple: (datetime или None, days_ago или None)
     """
     try:
         # Пытаемся найти элемент с датой
         date_element = clip_element.find_element(By.CSS_SELECTOR, "div.VideoHighlightsItem__date")
-        date_text = date_element.text.strip().lower()
-        
-        now = datetime.now()
-        
-        # Обрабатываем различные форматы даты
-        if "сегодня" in date_text:
-            return now.strftime("%Y-%m-%d"), 0
-        
-        elif "вчера" in date_text:
-            yesterday = now - timedelta(days=1)
-            return yesterday.strftime("%Y-%m-%d"), 1
-        
-        elif "неделю назад" in date_text or "неделя назад" in date_text:
-            date = now - timedelta(days=7)
-            return date.strftime("%Y-%m-%d"), 7
-        
-        elif "месяц назад" in date_text:
-            date = now - timedelta(days=30)
-            return date.strftime("%Y-%m-%d"), 30
-        
-        elif "месяца назад" in date_text:
-            # Извлекаем число месяцев
-            months = re.search(r'(\d+)\s+месяц', date_text)
-            if months:
-                months_count = int(months.group(1))
-                date = now - timedelta(days=30 * months_count)
-                return date.strftime("%Y-%m-%d"), 30 * months_count
-            else:
-                date = now - timedelta(days=60)
-                return date.strftime("%Y-%m-%d"), 60
-        
-        elif "год назад" in date_text:
-            date = now - timedelta(days=365)
-            return date.strftime("%Y-%m-%d"), 365
-        
-        else:
-            # Пытаемся распарсить дату
-            try:
-                # Формат "дд.мм.гггг"
-                date_match = re.search(r'(\d{1,2})\.(\d{1,2})\.(\d{4})', date_text)
-                if date_match:
-                    day, month, year = map(int, date_match.groups())
-                    date = datetime(year, month, day)
-                    days_ago = (now - date).days
-                    return date.strftime("%Y-%m-%d"), days_ago
-                
-                # Формат "дд месяц гггг"
-                months = {
-                    'янв': 1, 'фев': 2, 'мар': 3, 'апр': 4, 'май': 5, 'июн': 6,
-                    'июл': 7, 'авг': 8, 'сен': 9, 'окт': 10, 'ноя': 11, 'дек': 12
-                }
-                
-                for month_name, month_num in months.items():
-                    if month_name in date_text:
-                        date_match = re.search(r'(\d{1,2})\s+\w+\s+(\d{4})', date_text)
-                        if date_match:
-                            day, year = map(int, date_match.groups())
-                            date = datetime(year, month_num, day)
-                            days_ago = (now - date).days
-                            return date.strftime("%Y-%m-%d"), days_ago
-            except:
-                pass
+    except NoSuchElementException:
+        return None, None
     
-    except:
-        pass
+    # Относительные ("вчера", "3 месяца назад") и абсолютные даты разбираются общим модулем
+    publish_date = parse_date(date_element.text)
+    return publish_date, days_since(publish_date)
+
+def enrich_clips(records, budget=ENRICH_BUDGET, workers=ENRICH_WORKERS, ttl=ENRICH_TTL):
+    """
+    Дополняет клипы лайками, комментариями и репостами со страниц клипов
+    
+    Отдельный этап после сбора: поиск и прокрутка дают только просмотры.
+    Метрики, полученные не раньше ttl секунд назад, берутся из кэша
+    (CLIP_STATS_CACHE); из остальных клипов запрашиваются budget самых
+    перспективных по просмотрам в день - именно они попадают в верх
+    рейтинга виральности. Страницы загружаются по HTTP с cookies сессии
+    (см. utils.cookie_store) в workers потоках через общий rate_limiter('vk').
+    
+    Args:
+        records (list): Записи VideoRecord VK (изменяются на месте)
+        budget (int): Максимум запросов к VK
+        workers (int): Максимум одновременных запросов
+        ttl (float): Срок годности метрик в кэше (секунды)
+
+    Returns:
+        int: Количество дополненных клипов (включая взятые из кэша)
+    """
+    cache = _load_stats_cache()
+    now = time.time()
+    enriched = 0
+    candidates = []
+    for record in records:
+        cached = cache.get(record.video_id)
+        if cached and now - cached['fetched_at'] <= ttl:
+            _apply_stats(record, cached)
+            enriched += 1
+            incr("enrichment_cache_hits", platform="vk")
+        elif record.url and not (record.likes or record.comments or record.shares):
+            candidates.append(record)
+    
+    candidates.sort(key=lambda record: record.views / ((record.days_ago or 0) + 1), reverse=True)
+    candidates = candidates[:max(0, budget)]
+    if not candidates:
+        return enriched
+    
+    with span("enrichment", platform="vk"):
+        http = requests.Session()
+        http.headers.update(ENRICH_HEADERS)
+        http.cookies.update(cookie_store.request_cookies("vk"))
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="vk_enrich") as executor:
+            fetched = list(executor.map(partial(fetch_clip_stats, http),
+                                        (record.url for record in candidates),
+                                        (record.video_id for record in candidates)))
+    
+    for record, stats in zip(candidates, fetched):
+        if stats is None:
+            continue
+        stats['fetched_at'] = now
+        cache[record.video_id] = stats
+        _apply_stats(record, stats)
+        enriched += 1
+        incr("clips_enriched", platform="vk")
     
-    # Если не удалось определить дату
-    return "Неизвестно", "Неизвестно"
+    _save_stats_cache(cache, now - ttl)
+    logger.info("Метрики дополнены для %s из %s VK клипов (запросов: %s)", enriched, len(records), len(candidates))
+    return enriched
 
-def _safe_int(value):
-    """Безопасно преобразует значение в целое число"""
-    if value is None:
-        return 0
+def fetch_clip_stats(http, url, video_id):
+    """
+    Загружает страницу клипа и извлекает лайки, комментарии и репосты
     
+    Args:
+        http (requests.Session): HTTP-сессия с cookies VK
+        url (str): Адрес клипа
+        video_id (str): ID клипа вида "<owner_id>_<id>"
+
+    Returns:
+        dict: likes, comments, shares или None, если метрики не найдены
+    """
+    rate_limiter('vk').acquire()
     try:
-        # Удаляем все нечисловые символы, кроме цифр
-        value_str = ''.join(c for c in str(value) if c.isdigit())
-        if value_str:
-            return int(value_str)
-        return 0
-    except (ValueError, TypeError):
-        return 0
+        with span("http_request", platform="vk"):
+            response = http.get(url, timeout=15)
+    except requests.RequestException as e:
+        logger.debug("Не удалось загрузить клип %s: %s", url, e)
+        return None
+    
+    if response.status_code == 429 or is_block_url(response.url):
+        rate_limiter('vk').report_block(f"HTTP {response.status_code} {response.url}")
+        return None
+    if response.status_code != 200:
+        return None
+    return parse_clip_stats(response.text, video_id)
+
+def parse_clip_stats(html, video_id):
+    """
+    Извлекает метрики клипа из данных, встроенных в страницу VK
+    
+    Счетчики читаются только из JSON-объекта этого клипа (с его owner_id
+    и id): на странице есть и другие клипы (рекомендации, лента автора)
+    со своими лайками.
+    
+    Args:
+        html (str): HTML страницы клипа
+        video_id (str): ID клипа вида "<owner_id>_<id>"
+
+    Returns:
+        dict: likes, comments, shares или None, если данные клипа или лайки не найдены
+    """
+    clip = _find_clip_object(html, video_id)
+    # Без лайков страница, скорее всего, не содержит данных клипа (заглушка или вход)
+    if clip is None or 'likes' not in clip:
+        return None
+    return {field: _stat_count(clip.get(key)) for field, key in CLIP_STATS_KEYS}
+
+def _find_clip_object(html, video_id):
+    """Находит и разбирает JSON-объект клипа по owner_id и id (None, если не найден)"""
+    owner_id, _, item_id = video_id.rpartition('_')
+    if not owner_id or not item_id.isdigit():
+        return None
+    for match in re.finditer(rf'"id"\s*:\s*"?{item_id}(?!\d)', html):
+        start = _enclosing_object_start(html, match.start())
+        if start is None:
+            continue
+        try:
+            clip, _ = _json_decoder.raw_decode(html, start)
+        except ValueError:
+            continue
+        if str(clip.get('owner_id')) == owner_id:
+            return clip
+    return None
+
+def _enclosing_object_start(html, position):
+    """Позиция открывающей скобки объекта, внутри которого находится position"""
+    depth = 0
+    for index in range(position - 1, -1, -1):
+        char = html[index]
+        if char == '}':
+            depth += 1
+        elif char == '{':
+            if not depth:
+                return index
+            depth -= 1
+    return None
+
+def _stat_count(value):
+    """Значение счетчика: число или объект {"count": N}"""
+    if isinstance(value, dict):
+        value = value.get('count')
+    return parse_count(value)
+
+def _apply_stats(record, stats):
+    record.likes = stats['likes']
+    record.comments = stats['comments']
+    record.shares = stats['shares']
+
+def _load_stats_cache():
+    try:
+        with open(CLIP_STATS_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_stats_cache(cache, expired_before):
+    """Сохраняет кэш метрик, удаляя устаревшие записи"""
+    cache = {video_id: stats for video_id, stats in cache.items() if stats['fetched_at'] > expired_before}
+    os.makedirs(os.path.dirname(CLIP_STATS_CACHE), exist_ok=True)
+    temp_path = f"{CLIP_STATS_CACHE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(temp_path, CLIP_STATS_CACHE)
+
+def _collect_and_enrich(collect, enrich_budget, **kwargs):
+    """Сбор клипов (collect) и дополнение их метрик отдельным этапом"""
+    records = collect(**kwargs)
+    if records and enrich_budget:
+        enrich_clips(records, enrich_budget)
+    return records
 
 # Пример использования
 if __name__ == "__main__":
+    setup_logging()
     query = "смешные коты"
     
     # Вы можете указать путь к профилю браузера
@@ -575,4 +1163,4 @@ if __name__ == "__main__":
     
     clips = parse_vk_clips(query, limit=20, days_ago=30, headless=False)
     for clip in clips[:5]:  # Выводим первые 5 для примера
-        print(f"Title: {clip['title']}, Views: {clip['views']}, Channel: {clip['channel']}, URL: {clip['url']}")
\ No newline at end of file
+        print(f"Title: {clip.title}, Views: {clip.views}, Channel: {clip.channel}, URL: {clip.url}")
\ No newline at end of file
@@ -1,10 +1,129 @@
-import yt_dlp
-from datetime import datetime, timedelta
-import time
+import base64
+import itertools
 import urllib.parse
-import re
+from contextlib import nullcontext
+from utils.records import VideoRecord
+from utils.counts import parse_count
+from utils.dates import parse_date, days_since
+from utils.instrumentation import span, incr
+from utils.log import get_logger, setup_logging
+from utils.rate_limit import is_block_message
+from parsers.registry import blocking_search, rate_limiter
 
-def parse_youtube_shorts(query, limit=1000, days_ago=30, strict_query_match=True):
+logger = get_logger("youtube")
+
+# Поля метаданных yt-dlp с датой публикации
+DATE_FIELDS = ('timestamp', 'release_timestamp', 'upload_date', 'release_date', 'published_time')
+
+# Режим recent_first: сколько видео подряд старше окна означают конец свежих результатов
+OLD_STREAK_LIMIT = 5
+# Режим recent_first: максимум просматриваемых результатов относительно limit
+RECENT_SEARCH_FACTOR = 3
+# Значение сортировки "по дате загрузки" в параметре sp
+SORT_BY_UPLOAD_DATE = 2
+# Фильтры по дате загрузки (с запасом к границам): (максимум дней окна, значение фильтра)
+UPLOAD_DATE_FILTERS = ((0, 2), (6, 3), (28, 4), (364, 5))
+# Количество результатов поиска в одной странице (единица работы параллельного сбора)
+PAGE_SIZE = 10
+# Сколько результатов поиска YouTube отдает за один запрос при обходе списка
+LISTING_PAGE_SIZE = 20
+# Признак конца списка результатов поиска
+_END = object()
+
+# Настройки yt-dlp для получения метаданных без загрузки видео
+YDL_OPTS = {
+    'quiet': True,  # Минимизировать вывод логов
+    'extract_flat': False,  # Извлекать полные метаданные, не только плоские 
+    'skip_download': True,  # Не загружать видео
+    'noplaylist': True,  # Игнорировать плейлисты
+    'ignoreerrors': True,  # Игнорировать ошибки
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
+    'cookiefile': None,  # Можно указать путь к cookies для обхода ограничений
+}
+
+def create_youtube_dl():
+    """
+    Создает экземпляр yt-dlp с настройками парсера
+    
+    Экземпляр можно переиспользовать между вызовами parse_youtube_shorts
+    (параметр ydl), чтобы не платить за его инициализацию при каждом поиске.
+    
+    Returns:
+        YoutubeDL: Экземпляр yt-dlp
+    """
+    # yt-dlp импортируется при создании первого экземпляра: модуль парсера
+    # используется и без сети (обработка метаданных, бенчмарки)
+    import yt_dlp
+    return yt_dlp.YoutubeDL({**YDL_OPTS, 'logger': _YtdlpLogger()})
+
+class _YtdlpLogger:
+    """Передает ошибки yt-dlp в лог парсера и сообщает ограничителю запросов о блокировках"""
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        self._check_block(msg)
+        logger.debug("yt-dlp: %s", msg)
+
+    def error(self, msg):
+        self._check_block(msg)
+        logger.warning("yt-dlp: %s", msg)
+
+    def _check_block(self, msg):
+        # При ignoreerrors ошибки 429 и проверки на бота не доходят до парсера исключениями
+        if is_block_message(msg):
+            rate_limiter('youtube').report_block(msg[:200])
+
+def create_resource(headless=True, browser_profile=None, lean=True):
+    """Прогретый ресурс для пула сессии (см. parsers.registry): экземпляр yt-dlp"""
+    return create_youtube_dl()
+
+def close_resource(ydl):
+    ydl.close()
+
+async def search(query, limit, since, resource=None, strict_match=False, recent_first=False,
+                 parallel=False, workers=0, **options):
+    """
+    Общий интерфейс парсеров (см. parsers.registry)
+    
+    Args:
+        query (str): Поисковый запрос
+        limit (int): Максимальное количество видео
+        since (datetime): Видео, опубликованные раньше дня since, не возвращаются
+        resource (YoutubeDL, optional): Экземпляр yt-dlp из пула сессии
+        strict_match, recent_first: См. parse_youtube_shorts
+        parallel (bool): Многопроцессный сбор по вариациям запроса
+        workers (int): Количество процессов (0 - по числу ядер)
+        
+    Yields:
+        VideoRecord: Записи о видео
+    """
+    if parallel:
+        # Дочерние процессы создают собственные экземпляры yt-dlp
+        from parallel_processing import run_parallel_search
+        collector = blocking_search(since, run_parallel_search,
+                                    main_query=query,
+                                    limit=limit,
+                                    days_ago=days_since(since),
+                                    max_workers=workers if workers > 0 else None,
+                                    strict_query_match=strict_match,
+                                    recent_first=recent_first)
+    else:
+        collector = blocking_search(since, parse_youtube_shorts,
+                                    query=query,
+                                    limit=limit,
+                                    days_ago=days_since(since),
+                                    strict_query_match=strict_match,
+                                    recent_first=recent_first,
+                                    ydl=resource)
+    async for record in collector:
+        yield record
+
+def parse_youtube_shorts(query, limit=1000, days_ago=30, strict_query_match=True, recent_first=False, ydl=None):
     """Парсер YouTube Shorts с использованием yt-dlp
     
     Args:
@@ -12,271 +131,360 @@ def parse_youtube_shorts(query, limit=1000, days_ago=30, strict_query_match=True
         limit (int): Максимальное количество видео для сбора
         days_ago (int): Сбор видео за последние N дней
         strict_query_match (bool): Строгая проверка наличия слов запроса в заголовке/описании видео
+        recent_first (bool): Искать с сортировкой по дате загрузки и прекращать обход
+            результатов, как только видео стабильно выходят за пределы окна days_ago
+        ydl (YoutubeDL, optional): Готовый экземпляр yt-dlp (см. create_youtube_dl);
+            если не указан, создается новый и закрывается после поиска
         
     Returns:
-        list: Список словарей с данными о видео
+        list: Список записей VideoRecord
     """
     results = []
     collected_video_ids = set()  # Для отслеживания уникальных видео
-    cutoff_date = datetime.now() - timedelta(days=days_ago)
     
-    print(f"Сбор YouTube Shorts за последние {days_ago} дней по запросу '{query}'...")
-
-    # Настройка yt-dlp для получения дополнительных метаданных
-    ydl_opts = {
-        'quiet': True,  # Минимизировать вывод логов
-        'extract_flat': False,  # Извлекать полные метаданные, не только плоские 
-        'skip_download': True,  # Не загружать видео
-        'noplaylist': True,  # Игнорировать плейлисты
-        'ignoreerrors': True,  # Игнорировать ошибки
-        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
-        'cookiefile': None,  # Можно указать путь к cookies для обхода ограничений
-    }
+    logger.info("Сбор YouTube Shorts за последние %s дней по запросу '%s'...", days_ago, query)
 
     # Формируем поисковый запрос
     search_query = f"{query} shorts"
     # Подготовка слов запроса для проверки совпадений
     query_words = query.lower().split()
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with (nullcontext(ydl) if ydl is not None else create_youtube_dl()) as ydl:
         try:
-            # Выполняем поиск с увеличенным лимитом для компенсации фильтрации
-            search_results = ydl.extract_info(f"ytsearch{limit*2}:{search_query}", download=False)
-            videos = search_results.get('entries', [])
-            
-            print(f"Получено {len(videos)} результатов поиска, обрабатываем...")
+            if recent_first:
+                # Результаты отсортированы по дате и подгружаются постранично по мере обхода
+                videos = _iter_search(ydl, _build_search_url(search_query, days_ago), limit * RECENT_SEARCH_FACTOR)
+                logger.info("Поиск по дате загрузки, обрабатываем результаты по мере получения...")
+            else:
+                # Поиск с увеличенным лимитом для компенсации фильтрации; метаданные каждого
+                # видео извлекаются отдельным запросом через ограничитель
+                videos = _iter_search(ydl, f"ytsearch{limit*2}:{search_query}", limit * 2)
+                logger.info("Обрабатываем результаты поиска по мере получения...")
 
-            for index, video in enumerate(videos):
-                if len(results) >= limit:
-                    break
+            old_streak = 0  # Сколько видео подряд оказались старше окна
 
+            for index, video in enumerate(videos):
                 if not video:  # Пропускаем None объекты, которые могут появиться при ошибках
                     continue
                 
                 video_id = video.get('id')
                 if not video_id or video_id in collected_video_ids:
                     continue
+                incr("videos_seen", platform="youtube")
 
-                # Проверяем, является ли видео шортом
-                is_short = False
-                
-                # Метод 1: Длительность <= 60 секунд
-                duration = video.get('duration')
-                if duration and duration <= 60:
-                    is_short = True
-                # Метод 2: Проверка URL на /shorts/
-                elif video.get('webpage_url', '').find('/shorts/') != -1:
-                    is_short = True
-                # Метод 3: Проверка тега #shorts в описании или заголовке
-                elif (video.get('description', '').lower().find('#shorts') != -1 or 
-                      video.get('title', '').lower().find('#shorts') != -1):
-                    is_short = True
-                
-                if not is_short:
+                with span("filtering", platform="youtube"):
+                    video_data = _build_video_record(video, query, query_words, strict_query_match)
+                if video_data is None:
+                    incr("videos_skipped", platform="youtube", reason="not_matching")
                     continue
-                
-                # Строгая проверка совпадения с запросом
-                if strict_query_match:
-                    title = video.get('title', '').lower()
-                    description = video.get('description', '').lower()
-                    content = title + " " + description
-                    
-                    # Проверяем, что хотя бы одно слово из запроса присутствует
-                    match_found = False
-                    for word in query_words:
-                        if word in content:
-                            match_found = True
-                            break
-                            
-                    if not match_found:
-                        continue  # Пропускаем видео без совпадений с запросом
-
-                # Получение и обработка даты публикации
-                # Проверяем несколько возможных полей с датой
-                upload_date = None
-                video_date = None
-                days_ago_value = None
-                
-                # Список полей для проверки
-                date_fields = ['upload_date', 'release_date', 'upload_date_utc', 'timestamp']
-                
-                for field in date_fields:
-                    if field in video and video[field]:
-                        try:
-                            # Пробуем разные форматы даты
-                            if field == 'upload_date' and isinstance(video[field], str) and len(video[field]) == 8:
-                                # Формат YYYYMMDD
-                                upload_date = video[field]
-                                video_date = datetime.strptime(upload_date, '%Y%m%d')
-                                days_ago_value = (datetime.now() - video_date).days
-                                break
-                            elif field == 'timestamp' and isinstance(video[field], (int, float)):
-                                # Формат timestamp
-                                video_date = datetime.fromtimestamp(video[field])
-                                upload_date = video_date.strftime('%Y%m%d')
-                                days_ago_value = (datetime.now() - video_date).days
-                                break
-                        except (ValueError, TypeError) as e:
-                            print(f"Ошибка обработки даты из поля {field} для видео {video_id}: {e}")
-                            continue
-                
-                # Если не нашли дату в явных полях, попробуем альтернативные методы
-                if video_date is None:
-                    # Попробуем использовать альтернативное поле с датой публикации
-                    if 'published_time' in video and video['published_time']:
-                        try:
-                            publication_date_str = video['published_time']
-                            # Могут быть разные форматы даты
-                            if 'T' in publication_date_str:
-                                # ISO формат
-                                video_date = datetime.fromisoformat(publication_date_str.replace('Z', '+00:00'))
-                            else:
-                                # Проверяем другие распространенные форматы
-                                for fmt in ['%Y-%m-%d', '%d.%m.%Y', '%b %d, %Y']:
-                                    try:
-                                        video_date = datetime.strptime(publication_date_str, fmt)
-                                        break
-                                    except ValueError:
-                                        continue
-                                    
-                            if video_date:
-                                upload_date = video_date.strftime('%Y%m%d')
-                                days_ago_value = (datetime.now() - video_date).days
-                        except Exception as e:
-                            print(f"Ошибка при парсинге published_time для видео {video_id}: {e}")
-                            
-                # Если все методы не сработали, устанавливаем текущую дату с пометкой                   
-                if video_date is None:
-                    # Для отладки выведем доступные поля даты
-                    date_related_fields = {k: v for k, v in video.items() if 'date' in k.lower() or 'time' in k.lower()}
-                    if date_related_fields:
-                        print(f"Поля с датами для видео {video_id}: {date_related_fields}")
-                    
-                    # Если дату не удалось определить, используем текущую, но с пометкой
-                    video_date = datetime.now()
-                    upload_date = "Неизвестно"
-                    days_ago_value = "Неизвестно"
-                    print(f"Дата публикации не найдена для видео {video_id} (обработан {index+1}/{len(videos)})")
 
                 # Проверяем возраст видео если дата определена
-                if isinstance(days_ago_value, int) and days_ago_value > days_ago:
-                    print(f"Пропуск видео {video_id} - слишком старое ({days_ago_value} дней)")
+                days_ago_value = video_data.days_ago
+                if days_ago_value is None:
+                    logger.debug("Дата публикации не найдена для видео %s (обработан %s)", video_id, index+1)
+                elif days_ago_value > days_ago:
+                    logger.debug("Пропуск видео %s - слишком старое (%s дней)", video_id, days_ago_value)
+                    incr("videos_skipped", platform="youtube", reason="too_old")
+                    old_streak += 1
+                    if recent_first and old_streak >= OLD_STREAK_LIMIT:
+                        logger.info("%s видео подряд старше %s дней - дальнейшие результаты пропускаются", old_streak, days_ago)
+                        break
                     continue
+                old_streak = 0
 
                 collected_video_ids.add(video_id)
-
-                # Извлекаем метрики и безопасно преобразуем их в строки
-                view_count = _safe_str(video.get('view_count', 0))
-                like_count = _safe_str(video.get('like_count', 0))
-                comment_count = _safe_str(video.get('comment_count', 0))
-                share_count = _safe_str(video.get('repost_count', 0))
-                
-                # Формируем дату публикации для отображения
-                if isinstance(video_date, datetime):
-                    publish_date_formatted = video_date.strftime('%Y-%m-%d')
-                else:
-                    publish_date_formatted = "Неизвестно"
-                
-                video_data = {
-                    'platform': 'YouTube Shorts',
-                    'title': video.get('title', 'Неизвестно'),
-                    'url': f"https://www.youtube.com/shorts/{video_id}",
-                    'video_id': video_id,
-                    'views': view_count,
-                    'likes': like_count,
-                    'comments': comment_count,
-                    'shares': share_count,
-                    'publish_time': upload_date,
-                    'publish_date_formatted': publish_date_formatted,
-                    'days_ago': days_ago_value,
-                    'channel': video.get('uploader', 'Неизвестно'),
-                    'query': query,
-                    'collected_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
                 results.append(video_data)
+                incr("videos_collected", platform="youtube")
+                # Проверка после добавления: следующий результат не извлекается зря
+                if len(results) >= limit:
+                    break
                 
                 # Периодически выводим прогресс
                 if (index + 1) % 10 == 0:
-                    print(f"Обработано {index+1}/{len(videos)} видео, найдено шортсов: {len(results)}")
+                    logger.debug("Обработано %s видео, найдено шортсов: %s", index+1, len(results))
 
-            print(f"Собрано {len(results)} видео")
+            logger.info("Собрано %s видео", len(results))
 
         except Exception as e:
-            print(f"Ошибка при парсинге YouTube Shorts: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Ошибка при парсинге YouTube Shorts: %s", e)
 
     # Сортируем результаты по просмотрам
-    results.sort(key=lambda x: _safe_int(x.get('views', 0)), reverse=True)
+    results.sort(key=lambda x: x.views, reverse=True)
 
     # Выводим статистику по метрикам
     if results:
-        # Безопасно подсчитываем метрики
-        with_likes = sum(1 for v in results if _safe_int(v.get('likes', 0)) > 0)
-        with_comments = sum(1 for v in results if _safe_int(v.get('comments', 0)) > 0)
-        with_shares = sum(1 for v in results if _safe_int(v.get('shares', 0)) > 0)
+        with_likes = sum(1 for v in results if v.likes > 0)
+        with_comments = sum(1 for v in results if v.comments > 0)
+        with_shares = sum(1 for v in results if v.shares > 0)
         
-        print(f"Статистика метрик: видео с лайками: {with_likes}/{len(results)}, с комментариями: {with_comments}/{len(results)}, с репостами: {with_shares}/{len(results)}")
+        logger.info("Статистика метрик: видео с лайками: %s/%s, с комментариями: %s/%s, с репостами: %s/%s", with_likes, len(results), with_comments, len(results), with_shares, len(results))
 
     # Возвращаем результаты в пределах запрошенного лимита
     return results[:limit]
 
-def _safe_str(value):
-    """Безопасно преобразует значение в строку"""
-    if value is None:
-        return "0"
-    try:
-        return str(value)
-    except:
-        return "0"
-
-def _safe_int(value):
-    """Безопасно преобразует значение в целое число"""
-    if value is None:
-        return 0
-    if isinstance(value, int):
-        return value
-    try:
-        return int(float(value))
-    except (ValueError, TypeError):
-        return 0
-
-def _clean_count(count_str):
-    """Преобразует строку с числом в число"""
-    if not count_str or count_str == "N/A":
-        return "0"
+def fetch_search_listing(query, max_results, days_ago=30, recent_first=False, ydl=None):
+    """
+    Получает список ID видео из результатов поиска без извлечения метаданных
     
-    # Удаление пробелов и замена запятых на точки
-    count_str = str(count_str).replace(' ', '').replace(',', '.')
+    Параллельный сбор (см. parallel_processing.run_parallel_search) запрашивает
+    список один раз на вариацию запроса и раздает его страницы процессам.
+    yt-dlp загружает список по частям по мере обхода, поэтому каждая часть
+    проходит через ограничитель запросов.
     
-    # Обработка суффиксов
-    multiplier = 1
+    Args:
+        query (str): Поисковый запрос
+        max_results (int): Максимальное количество результатов
+        days_ago (int): Окно в днях (для recent_first)
+        recent_first (bool): Искать с сортировкой по дате загрузки
+        ydl (YoutubeDL, optional): Готовый экземпляр yt-dlp (см. create_youtube_dl)
+        
+    Returns:
+        list: ID видео в порядке выдачи поиска
+    """
+    search_query = f"{query} shorts"
+    if recent_first:
+        search_url = _build_search_url(search_query, days_ago)
+    else:
+        search_url = f"ytsearch{max_results}:{search_query}"
+
+    video_ids = []
+    with (nullcontext(ydl) if ydl is not None else create_youtube_dl()) as ydl:
+        rate_limiter('youtube').acquire()
+        with span("search_page", platform="youtube"):
+            search_results = ydl.extract_info(search_url, download=False, process=False)
+            entries = iter((search_results or {}).get('entries') or [])
+            for position in range(max_results):
+                if position and position % LISTING_PAGE_SIZE == 0:
+                    rate_limiter('youtube').acquire()
+                entry = next(entries, _END)
+                if entry is _END:
+                    break
+                if entry and entry.get('id'):
+                    video_ids.append(entry['id'])
+    return video_ids
+
+def parse_youtube_page(query, video_ids, days_ago=30, strict_query_match=True, recent_first=False,
+                       ydl=None, stop_event=None):
+    """
+    Собирает одну страницу результатов поиска
     
-    if any(x in count_str.lower() for x in ['k', 'к', 'тыс']):
-        multiplier = 1000
-        count_str = re.sub(r'[kкK]|тыс\.?', '', count_str.lower())
-    elif any(x in count_str.lower() for x in ['m', 'м', 'млн']):
-        multiplier = 1000000
-        count_str = re.sub(r'[mмM]|млн\.?', '', count_str.lower())
-    elif any(x in count_str.lower() for x in ['b', 'б', 'млрд']):
-        multiplier = 1000000000
-        count_str = re.sub(r'[bбB]|млрд\.?', '', count_str.lower())
+    Единица работы параллельного сбора (см. parallel_processing.run_parallel_search):
+    полные метаданные извлекаются только для видео этой страницы из списка,
+    полученного fetch_search_listing.
     
-    try:
-        # Извлекаем числовую часть
-        number_match = re.search(r'(\d+\.?\d*)', count_str)
-        if number_match:
-            number = float(number_match.group(1))
-            return str(int(number * multiplier))
-    except:
-        pass
+    Args:
+        query (str): Поисковый запрос
+        video_ids (list): ID видео страницы
+        days_ago (int): Сбор видео за последние N дней
+        strict_query_match (bool): Строгая проверка наличия слов запроса в заголовке/описании видео
+        recent_first (bool): Результаты отсортированы по дате загрузки (ранняя остановка по окну)
+        ydl (YoutubeDL, optional): Готовый экземпляр yt-dlp (см. create_youtube_dl)
+        stop_event (Event, optional): Сигнал досрочной остановки (общий лимит уже собран)
+        
+    Returns:
+        tuple: (список записей VideoRecord, True если дальше идут только видео старше окна)
+    """
+    results = []
+    query_words = query.lower().split()
+
+    with (nullcontext(ydl) if ydl is not None else create_youtube_dl()) as ydl:
+        old_streak = 0  # Сколько видео подряд оказались старше окна
+        for video_id in video_ids:
+            if stop_event is not None and stop_event.is_set():
+                break
+            try:
+                rate_limiter('youtube').acquire()
+                with span("ytdlp_extraction", platform="youtube"):
+                    video = ydl.extract_info(f"https://www.youtube.com/shorts/{video_id}", download=False)
+            except Exception as e:
+                logger.warning("Ошибка при извлечении видео %s: %s", video_id, e)
+                continue
+            if not video or not video.get('id'):
+                continue
+            incr("videos_seen", platform="youtube")
+
+            with span("filtering", platform="youtube"):
+                video_data = _build_video_record(video, query, query_words, strict_query_match)
+            if video_data is None:
+                incr("videos_skipped", platform="youtube", reason="not_matching")
+                continue
+            if video_data.days_ago is not None and video_data.days_ago > days_ago:
+                incr("videos_skipped", platform="youtube", reason="too_old")
+                old_streak += 1
+                continue
+            old_streak = 0
+            results.append(video_data)
+            incr("videos_collected", platform="youtube")
+
+    exhausted = recent_first and old_streak >= OLD_STREAK_LIMIT
+    return results, exhausted
+
+def _build_video_record(video, query, query_words, strict_query_match):
+    """
+    Проверяет метаданные видео от yt-dlp и формирует запись
+    
+    Args:
+        video (dict): Метаданные видео от yt-dlp
+        query (str): Поисковый запрос
+        query_words (list): Слова запроса в нижнем регистре
+        strict_query_match (bool): Требовать совпадение слов запроса с заголовком/описанием
+        
+    Returns:
+        VideoRecord: Запись о видео или None, если видео не является подходящим шортом
+    """
+    # Проверяем, является ли видео шортом
+    is_short = False
+    
+    # Метод 1: Длительность <= 60 секунд
+    duration = video.get('duration')
+    if duration and duration <= 60:
+        is_short = True
+    # Метод 2: Проверка URL на /shorts/
+    elif (video.get('webpage_url') or '').find('/shorts/') != -1:
+        is_short = True
+    # Метод 3: Проверка тега #shorts в описании или заголовке
+    elif ((video.get('description') or '').lower().find('#shorts') != -1 or 
+          (video.get('title') or '').lower().find('#shorts') != -1):
+        is_short = True
+    
+    if not is_short:
+        return None
+    
+    # Строгая проверка совпадения с запросом
+    if strict_query_match:
+        content = (video.get('title') or '').lower() + " " + (video.get('description') or '').lower()
+        
+        # Проверяем, что хотя бы одно слово из запроса присутствует
+        if not any(word in content for word in query_words):
+            return None  # Пропускаем видео без совпадений с запросом
+
+    return _record_from_info(video, query)
+
+def fetch_video_stats(video_ids, query='', ydl=None):
+    """
+    Запрашивает актуальные метрики известных видео по их ID
+    
+    Используется для повторного опроса отслеживаемых видео: поиск не
+    выполняется, метаданные извлекаются напрямую по URL видео.
+    
+    Args:
+        video_ids (iterable): ID видео YouTube
+        query (str): Запрос, к которому относятся видео
+        ydl (YoutubeDL, optional): Готовый экземпляр yt-dlp (см. create_youtube_dl)
+        
+    Returns:
+        dict: ID видео -> VideoRecord (недоступные видео отсутствуют)
+    """
+    results = {}
+    with (nullcontext(ydl) if ydl is not None else create_youtube_dl()) as ydl:
+        for video_id in video_ids:
+            try:
+                rate_limiter('youtube').acquire()
+                with span("ytdlp_extraction", platform="youtube", mode="refresh"):
+                    video = ydl.extract_info(f"https://www.youtube.com/shorts/{video_id}", download=False)
+            except Exception as e:
+                logger.warning("Ошибка при обновлении видео %s: %s", video_id, e)
+                continue
+            if video and video.get('id'):
+                results[video_id] = _record_from_info(video, query)
+    return results
+
+def _record_from_info(video, query):
+    """Формирует запись VideoRecord из метаданных yt-dlp"""
+    video_id = video.get('id')
+    return VideoRecord(
+        platform='YouTube Shorts',
+        video_id=video_id,
+        title=video.get('title', 'Неизвестно'),
+        url=f"https://www.youtube.com/shorts/{video_id}",
+        views=parse_count(video.get('view_count')),
+        likes=parse_count(video.get('like_count')),
+        comments=parse_count(video.get('comment_count')),
+        shares=parse_count(video.get('repost_count')),
+        publish_date=_extract_video_date(video),
+        channel=video.get('uploader', 'Неизвестно'),
+        query=query
+    )
+
+def _iter_search(ydl, search_url, max_results):
+    """
+    Лениво перебирает результаты поиска
+    
+    Страницы поиска запрашиваются по мере обхода, а полные метаданные
+    видео извлекаются только для тех результатов, до которых дошел обход;
+    каждое извлечение - отдельный запрос через ограничитель запросов.
+    
+    Args:
+        ydl (YoutubeDL): Экземпляр yt-dlp
+        search_url (str): ytsearchN:... или URL страницы результатов (см. _build_search_url)
+        max_results (int): Максимальное количество просматриваемых результатов
+        
+    Yields:
+        dict: Полные метаданные видео (или None при ошибке извлечения)
+    """
+    rate_limiter('youtube').acquire()
+    with span("search_page", platform="youtube"):
+        search_results = ydl.extract_info(search_url, download=False, process=False)
+    if not search_results:
+        return
+    
+    for entry in itertools.islice(search_results.get('entries') or [], max_results):
+        if not entry:
+            continue
+        try:
+            rate_limiter('youtube').acquire()
+            with span("ytdlp_extraction", platform="youtube"):
+                video = ydl.process_ie_result(entry, download=False)
+            yield video
+        except Exception as e:
+            logger.warning("Ошибка при извлечении видео %s: %s", entry.get('id'), e)
+            yield None
+
+def _build_search_url(search_query, days_ago):
+    """
+    Формирует URL поиска YouTube с сортировкой по дате загрузки
+    
+    Параметр sp кодирует (protobuf) сортировку по дате и самый узкий
+    фильтр по дате загрузки, который гарантированно покрывает окно days_ago.
+    
+    Args:
+        search_query (str): Поисковый запрос
+        days_ago (int): Окно в днях
+        
+    Returns:
+        str: URL страницы результатов поиска
+    """
+    params = b'\x08' + bytes([SORT_BY_UPLOAD_DATE])
+    for max_days, upload_date_filter in UPLOAD_DATE_FILTERS:
+        if days_ago <= max_days:
+            params += b'\x12\x02\x08' + bytes([upload_date_filter])
+            break
+    sp = base64.b64encode(params).decode('ascii')
+    return f"https://www.youtube.com/results?search_query={urllib.parse.quote_plus(search_query)}&sp={urllib.parse.quote(sp)}"
+
+def _extract_video_date(video):
+    """
+    Определяет дату публикации видео по метаданным yt-dlp
     
-    return "0"
+    Args:
+        video (dict): Метаданные видео от yt-dlp
+        
+    Returns:
+        datetime: Дата публикации или None, если её не удалось определить
+    """
+    # Поля в порядке убывания точности: timestamp содержит и время публикации
+    for field in DATE_FIELDS:
+        value = video.get(field)
+        if value:
+            video_date = parse_date(value)
+            if video_date is not None:
+                return video_date
+    return None
 
 # Пример использования
 if __name__ == "__main__":
+    setup_logging()
     query = "funny cats"
     videos = parse_youtube_shorts(query, limit=50, days_ago=30, strict_query_match=True)
     for video in videos[:5]:  # Выводим первые 5 для примера
-        print(f"Title: {video['title']}, URL: {video['url']}, Views: {video['views']}, Likes: {video['likes']}, Publish Date: {video['publish_date_formatted']}, Days Ago: {video['days_ago']}")
\ No newline at end of file
+        print(f"Title: {video.title}, URL: {video.url}, Views: {video.views}, Likes: {video.likes}, Publish Date: {video.publish_date_formatted}, Days Ago: {video.days_ago}")
\ No newline at end of file
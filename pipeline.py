@@ -0,0 +1,394 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager, ExitStack
+from datetime import datetime, timedelta
+from functools import partial
+
+from utils.viral_metrics import calculate_viral_score
+from utils.storage import save_to_csv, load_history_bulk, HistoryIndex
+from utils.instrumentation import span
+from utils.log import get_logger
+from parsers.registry import available_platforms, get_platform, load_parser
+
+logger = get_logger("pipeline")
+
+PLATFORMS = tuple(available_platforms())
+# Параметры задания, передаваемые в search парсеров
+SEARCH_OPTIONS = ('strict_match', 'recent_first', 'parallel', 'workers', 'tabs')
+
+# Параметры задания сбора по умолчанию (совпадают с параметрами main.py)
+DEFAULT_JOB = {
+    'limit': 200,
+    'days': 30,
+    'platforms': 'youtube',
+    'parallel': False,
+    'workers': 0,
+    'strict_match': False,
+    'recent_first': False,
+    'tabs': 1,
+    'priority': 0,
+}
+
+def make_job(query, **options):
+    """
+    Формирует задание сбора по одному запросу
+
+    Args:
+        query (str): Поисковый запрос
+        **options: Параметры, переопределяющие DEFAULT_JOB
+
+    Returns:
+        dict: Задание сбора
+    """
+    job = dict(DEFAULT_JOB)
+    job.update((key, value) for key, value in options.items() if value is not None)
+    job['query'] = query
+    return job
+
+def load_jobs(path, **defaults):
+    """
+    Загружает задания сбора из файла
+    
+    Поддерживаются JSON-файл {"defaults": {...}, "queries": [...]} (элемент
+    списка - строка запроса или словарь с query и параметрами задания, например
+    limit, platforms, priority) и текстовый файл с одним запросом в строке
+    (строки, начинающиеся с #, пропускаются).
+    
+    Args:
+        path (str): Путь к файлу
+        **defaults: Параметры по умолчанию для всех заданий
+        
+    Returns:
+        tuple: (список заданий, словарь конфигурации из JSON-файла)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    if path.endswith('.json'):
+        config = json.loads(content)
+        entries = config.get('queries', [])
+        defaults = {**defaults, **config.get('defaults', {})}
+    else:
+        config = {}
+        entries = [line.strip() for line in content.splitlines()
+                   if line.strip() and not line.lstrip().startswith('#')]
+    
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'query': entry}
+        options = {**defaults, **entry}
+        jobs.append(make_job(options.pop('query'), **options))
+    return jobs, config
+
+def parse_platforms(value):
+    """
+    Разбирает список платформ ("youtube,vk,tiktok,instagram" или "all")
+
+    Returns:
+        list: Названия платформ
+    """
+    if isinstance(value, str):
+        value = value.lower().split(',')
+    platforms = [platform.strip() for platform in value if platform.strip()]
+    if 'all' in platforms:
+        return list(PLATFORMS)
+    unknown = [platform for platform in platforms if platform not in PLATFORMS]
+    if unknown:
+        logger.warning("Неизвестные платформы пропущены: %s (доступны: %s)", ", ".join(unknown), ", ".join(PLATFORMS))
+    return [platform for platform in platforms if platform in PLATFORMS]
+
+class WarmPool:
+    """
+    Пул "прогретых" ресурсов одной платформы (браузеры, экземпляры yt-dlp)
+
+    Ресурсы создаются при первой необходимости и возвращаются в пул после
+    использования, поэтому повторный сбор не платит за запуск браузера.
+    Размер пула ограничивает число одновременных сборов с платформы.
+    Парсеры перехватывают ошибки сами, поэтому перед выдачей свободный
+    ресурс проверяется (is_alive): упавший браузер закрывается и создается заново.
+    """
+
+    def __init__(self, factory, size=1, close=None, is_alive=None):
+        self._factory = factory
+        self._close = close
+        self._is_alive = is_alive
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    @contextmanager
+    def slot(self):
+        """Занимает место в пуле без получения ресурса"""
+        with self._slots:
+            yield
+
+    @contextmanager
+    def acquire(self):
+        """
+        Выдает ресурс из пула (или создает новый)
+
+        Если при работе с ресурсом произошла ошибка, он закрывается,
+        а не возвращается в пул.
+        """
+        with self._slots:
+            resource = self._take_idle()
+
+            healthy = False
+            try:
+                yield resource
+                healthy = True
+            finally:
+                if healthy and resource is not None:
+                    self._idle.put(resource)
+                else:
+                    self._discard(resource)
+
+    def close(self):
+        """Закрывает все свободные ресурсы"""
+        while True:
+            try:
+                resource = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(resource)
+
+    def _take_idle(self):
+        """Свободный рабочий ресурс из пула или новый, если рабочих не осталось"""
+        while True:
+            try:
+                resource = self._idle.get_nowait()
+            except queue.Empty:
+                return self._factory()
+            if self._alive(resource):
+                return resource
+            logger.info("Ресурс из пула не отвечает, он будет создан заново")
+            self._discard(resource)
+
+    def _alive(self, resource):
+        if self._is_alive is None:
+            return True
+        try:
+            return self._is_alive(resource)
+        except Exception as e:
+            logger.debug("Ошибка при проверке ресурса: %s", e)
+            return False
+
+    def _discard(self, resource):
+        if resource is None or self._close is None:
+            return
+        try:
+            self._close(resource)
+        except Exception as e:
+            logger.warning("Ошибка при закрытии ресурса: %s", e)
+
+class Session:
+    """
+    Общие ресурсы для нескольких сборов подряд
+
+    Хранит прогретые экземпляры yt-dlp и браузеры для VK, а также индекс
+    истории, чтобы повторные сборы (планировщик, пакетный режим) не тратили
+    время на запуск браузера и чтение истории с диска.
+
+    Args:
+        headless (bool): Запускать браузер в фоновом режиме
+        browser_profile (str, optional): Путь к профилю браузера для VK
+        concurrency (dict, optional): Максимум одновременных сборов по платформам
+            (по умолчанию - max_concurrency из parsers.registry)
+        lean_browser (bool): Легкий режим браузеров: без изображений, шрифтов и медиа (см. utils.browser)
+    """
+
+    def __init__(self, headless=True, browser_profile=None, concurrency=None, lean_browser=True):
+        concurrency = {**{platform: get_platform(platform)['rate_limit']['max_concurrency'] for platform in PLATFORMS},
+                       **(concurrency or {})}
+        self.history = HistoryIndex()
+        self.headless = headless
+        self.browser_profile = browser_profile
+        self.lean_browser = lean_browser
+        self.pools = {
+            platform: WarmPool(partial(_create_resource, platform, headless, browser_profile, lean_browser),
+                               concurrency[platform], close=partial(_close_resource, platform),
+                               is_alive=partial(_resource_alive, platform))
+            for platform in PLATFORMS
+        }
+
+    def close(self):
+        """Закрывает все прогретые ресурсы"""
+        for pool in self.pools.values():
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def collect(job, session):
+    """
+    Собирает видео по заданию со всех указанных платформ
+    
+    Платформы опрашиваются параллельно через общий интерфейс search
+    (см. parsers.registry); число одновременных сборов с каждой платформы
+    ограничено пулами ресурсов сессии.
+
+    Args:
+        job (dict): Задание сбора (см. make_job)
+        session (Session): Общие ресурсы
+
+    Returns:
+        dict: Записи VideoRecord по платформам
+    """
+    return asyncio.run(_collect_all(job, session))
+
+async def _collect_all(job, session):
+    since = datetime.now() - timedelta(days=job['days'])
+    platforms = parse_platforms(job['platforms'])
+    collected = await asyncio.gather(*(_collect_platform(platform, job, session, since) for platform in platforms))
+    return dict(zip(platforms, collected))
+
+async def _collect_platform(platform, job, session, since):
+    logger.info("Сбор данных с %s по запросу '%s'...", platform, job['query'])
+    start_time = time.time()
+    try:
+        with span("collect", platform=platform):
+            records = await _search_platform(platform, job, session, since)
+    except Exception as e:
+        logger.exception("Ошибка при сборе данных с %s: %s", platform, e)
+        records = []
+    logger.info("Сбор данных с %s занял %.2f секунд. Собрано %s видео",
+                platform, time.time() - start_time, len(records))
+    return records
+
+def score(query, records, session):
+    """
+    Рассчитывает метрики виральности относительно прошлого замера по запросу
+
+    Args:
+        query (str): Поисковый запрос
+        records (list): Собранные записи VideoRecord
+        session (Session): Общие ресурсы (индекс истории)
+
+    Returns:
+        list: Записи с метриками, отсортированные по виральности
+    """
+    with span("history_load"):
+        previous_data = session.history.get(query)
+
+    with span("scoring"):
+        return calculate_viral_score(records, previous_data)
+
+def store(query, results, session, timestamp=None):
+    """
+    Сохраняет результаты по запросу и обновляет индекс истории
+
+    Args:
+        query (str): Поисковый запрос
+        results (list): Записи с метриками
+        session (Session): Общие ресурсы (индекс истории)
+        timestamp (str, optional): Метка времени для имен файлов
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    filename = f"data/viral_videos_{query.replace(' ', '_')}_{timestamp}.csv"
+    history_filename = f"data/history/viral_videos_{query.replace(' ', '_')}_{timestamp}.csv"
+    with span("storage"):
+        save_to_csv(results, filename)
+        # Сохранение копии для истории
+        save_to_csv(results, history_filename)
+
+    session.history.update(query, results)
+
+def score_and_store(query, records, session, timestamp=None):
+    """
+    Рассчитывает метрики виральности и сохраняет результаты (см. score и store)
+
+    Returns:
+        list: Записи с метриками, отсортированные по виральности
+    """
+    results = score(query, records, session)
+    store(query, results, session, timestamp)
+    return results
+
+def run_job(job, session):
+    """
+    Выполняет полный цикл по заданию: сбор, расчет метрик и сохранение
+
+    Returns:
+        list: Записи с метриками (пустой список, если ничего не собрано)
+    """
+    records = [record for platform_records in collect(job, session).values() for record in platform_records]
+    if not records:
+        return []
+    return score_and_store(job['query'], records, session)
+
+def run_batch(jobs, session):
+    """
+    Выполняет несколько заданий за один запуск
+
+    История всех запросов загружается одним проходом по каталогу,
+    задания выполняются в порядке убывания приоритета с общими
+    браузерами и экземплярами yt-dlp, а результаты записываются
+    на диск одним шагом после завершения всех сборов.
+
+    Args:
+        jobs (list): Задания сбора (см. make_job и load_jobs)
+        session (Session): Общие ресурсы
+
+    Returns:
+        dict: Запрос -> записи с метриками (в порядке выполнения)
+    """
+    with span("history_load", mode="bulk"):
+        session.history.preload(load_history_bulk(job['query'] for job in jobs))
+
+    results = {}
+    # sorted устойчив: при равном приоритете сохраняется порядок из файла
+    for job in sorted(jobs, key=lambda job: job['priority'], reverse=True):
+        records = [record for platform_records in collect(job, session).values() for record in platform_records]
+        if records:
+            # Повтор запроса в файле дополняет его результаты новыми видео
+            previous = results.get(job['query'], [])
+            known = {record.key for record in previous}
+            records = previous + [record for record in records if record.key not in known]
+            results[job['query']] = score(job['query'], records, session)
+        else:
+            logger.warning("По запросу '%s' ничего не собрано", job['query'])
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    with span("storage", mode="batch"):
+        for query, query_results in results.items():
+            store(query, query_results, session, timestamp)
+    return results
+
+async def _search_platform(platform, job, session, since):
+    """Сбор с одной платформы с использованием прогретых ресурсов сессии"""
+    capabilities = get_platform(platform)['capabilities']
+    parser = load_parser(platform)
+    options = {option: job[option] for option in SEARCH_OPTIONS}
+    options['headless'] = session.headless
+    options['browser_profile'] = session.browser_profile
+    options['lean_browser'] = session.lean_browser
+    # При многопроцессном сборе дочерние процессы создают собственные ресурсы
+    warm = 'warm_resource' in capabilities and not (job['parallel'] and 'parallel' in capabilities)
+    if warm and hasattr(parser, 'needs_resource'):
+        warm = parser.needs_resource(**options)
+    pool = session.pools[platform]
+
+    with ExitStack() as stack:
+        # Ожидание места в пуле и запуск браузера не задерживают сбор с других платформ
+        resource = await asyncio.to_thread(stack.enter_context, pool.acquire() if warm else pool.slot())
+        if warm and resource is None:
+            logger.error("Не удалось подготовить ресурсы для %s", platform)
+            return []
+        return [record async for record in parser.search(job['query'], job['limit'], since,
+                                                         resource=resource, **options)]
+
+def _create_resource(platform, headless, browser_profile, lean):
+    return load_parser(platform).create_resource(headless, browser_profile, lean)
+
+def _close_resource(platform, resource):
+    load_parser(platform).close_resource(resource)
+
+def _resource_alive(platform, resource):
+    parser = load_parser(platform)
+    return parser.is_alive(resource) if hasattr(parser, 'is_alive') else True
@@ -0,0 +1,289 @@
+"""
+Повторный опрос отслеживаемых видео по адаптивному расписанию
+
+Скорость роста в calculate_viral_score считается только для видео, которые
+снова попали в поисковую выдачу. Этот режим напрямую запрашивает метрики
+известных видео из истории: быстро растущие видео опрашиваются часто,
+старые и "остывшие" - редко. Порядок опроса задает очередь с приоритетом
+по времени следующего опроса, которое вычисляется из последней скорости
+роста и возраста видео. Запросы группируются по платформам и выполняются
+пакетами с общими прогретыми ресурсами.
+
+Запуск:
+    python refresher.py --budget 100 --cycle 300
+"""
+import argparse
+import csv
+import heapq
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+from pipeline import Session
+from utils.records import VideoRecord, TIMESTAMP_FORMAT
+from utils.storage import save_to_csv, load_history_bulk
+from utils.viral_metrics import calculate_viral_score
+from utils.instrumentation import span, incr
+from utils import instrumentation
+from utils.log import setup_logging, get_logger
+
+logger = get_logger("refresher")
+
+STATE_FILE = "data/tracking/tracked_videos.csv"
+
+# Границы интервала между опросами одного видео (секунды)
+MIN_INTERVAL = 15 * 60
+BASE_INTERVAL = 60 * 60
+MAX_INTERVAL = 24 * 60 * 60
+# Скорость роста (просмотров в час), при которой интервал сокращается вдвое
+VELOCITY_SCALE = 100.0
+# Возраст (дней), при котором интервал увеличивается вдвое
+AGE_SCALE = 7.0
+
+def refresh_interval(record):
+    """
+    Интервал до следующего опроса видео
+
+    Чем выше последняя скорость роста просмотров, тем чаще опрос;
+    чем старше видео, тем реже.
+
+    Args:
+        record (VideoRecord): Последний замер видео
+
+    Returns:
+        float: Интервал в секундах
+    """
+    velocity = max(0.0, record.views_velocity or 0.0)
+    age = record.days_ago or 0
+    interval = BASE_INTERVAL * (1 + age / AGE_SCALE) / (1 + velocity / VELOCITY_SCALE)
+    return min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+
+class RefreshQueue:
+    """Очередь отслеживаемых видео с приоритетом по времени следующего опроса"""
+
+    def __init__(self):
+        self._heap = []
+        self._records = {}
+        self._due = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def get(self, key):
+        return self._records.get(key)
+
+    def records(self):
+        """Последние замеры всех отслеживаемых видео"""
+        return list(self._records.values())
+
+    def due_time(self, key):
+        return self._due.get(key)
+
+    def schedule(self, record, due=None):
+        """
+        Добавляет видео в очередь (или переносит его опрос)
+
+        Args:
+            record (VideoRecord): Последний замер видео
+            due (float, optional): Время опроса (unix time); по умолчанию - через refresh_interval
+        """
+        if due is None:
+            due = time.time() + refresh_interval(record)
+        self._records[record.key] = record
+        self._due[record.key] = due
+        heapq.heappush(self._heap, (due, record.key))
+
+    def remove(self, key):
+        self._records.pop(key, None)
+        self._due.pop(key, None)
+
+    def pop_due(self, now, limit):
+        """
+        Извлекает до limit видео, время опроса которых наступило
+
+        Returns:
+            list: Записи VideoRecord в порядке наступления срока
+        """
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            when, key = heapq.heappop(self._heap)
+            # Пропускаем устаревшие элементы кучи (видео перенесено или удалено)
+            if self._due.get(key) != when:
+                continue
+            del self._due[key]
+            due.append(self._records[key])
+        return due
+
+    def next_due(self):
+        """Ближайшее время опроса или None, если очередь пуста"""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+def _fetch_youtube(records, session):
+    from parsers.youtube_parser import fetch_video_stats
+    with session.pools['youtube'].acquire() as ydl:
+        return fetch_video_stats([record.video_id for record in records], ydl=ydl)
+
+# Пакетное получение метрик по платформам: (записи, сессия) -> {ID видео: VideoRecord}
+FETCHERS = {
+    'YouTube Shorts': _fetch_youtube,
+}
+
+def refresh_due(queue, session, budget, now=None):
+    """
+    Опрашивает видео, срок опроса которых наступил, в пределах бюджета запросов
+
+    Args:
+        queue (RefreshQueue): Очередь отслеживаемых видео
+        session (pipeline.Session): Общие ресурсы
+        budget (int): Максимум запросов за вызов
+        now (float, optional): Текущее время (unix time)
+
+    Returns:
+        int: Количество обновленных видео
+    """
+    due = queue.pop_due(now or time.time(), budget)
+    by_platform = {}
+    for record in due:
+        by_platform.setdefault(record.platform, []).append(record)
+
+    refreshed = 0
+    for platform, records in by_platform.items():
+        fetcher = FETCHERS.get(platform)
+        if fetcher is None:
+            logger.warning("Обновление видео %s не поддерживается, %s видео исключены из отслеживания",
+                           platform, len(records))
+            for record in records:
+                queue.remove(record.key)
+            continue
+
+        with span("refresh", platform=platform):
+            try:
+                fresh = fetcher(records, session)
+            except Exception as e:
+                logger.exception("Ошибка при обновлении видео %s: %s", platform, e)
+                fresh = {}
+
+        for old in records:
+            new = fresh.get(old.video_id)
+            if new is None:
+                # Видео недоступно - повторим нескоро
+                incr("refresh_failed", platform=platform)
+                queue.schedule(old, time.time() + MAX_INTERVAL)
+                continue
+            new.query = old.query
+            # Скорость роста считается относительно предыдущего замера этого же видео
+            calculate_viral_score([new], [old])
+            queue.schedule(new)
+            refreshed += 1
+            incr("refreshed", platform=platform)
+
+    if due:
+        logger.info("Обновлено %s из %s видео, в очереди %s", refreshed, len(due), len(queue))
+    return refreshed
+
+def load_state(path=STATE_FILE):
+    """
+    Загружает отслеживаемые видео и время их следующего опроса
+
+    Returns:
+        list: Пары (VideoRecord, время опроса в unix time или None)
+    """
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            due = None
+            try:
+                due = datetime.strptime(row.get('next_refresh') or '', TIMESTAMP_FORMAT).timestamp()
+            except ValueError:
+                pass
+            entries.append((VideoRecord.from_dict(row), due))
+    return entries
+
+def save_state(queue, path=STATE_FILE):
+    """Сохраняет отслеживаемые видео вместе со временем следующего опроса"""
+    rows = []
+    for record in queue.records():
+        row = record.to_dict()
+        due = queue.due_time(record.key)
+        row['next_refresh'] = datetime.fromtimestamp(due).strftime(TIMESTAMP_FORMAT) if due else ''
+        rows.append(row)
+    with span("storage", mode="tracking"):
+        save_to_csv(rows, path)
+
+def build_queue(max_age_days):
+    """
+    Формирует очередь из сохраненного состояния и последних замеров истории
+
+    Видео из истории, которых еще нет в очереди или замер которых новее,
+    добавляются в очередь; видео старше max_age_days не отслеживаются.
+
+    Returns:
+        RefreshQueue: Очередь отслеживаемых видео
+    """
+    queue = RefreshQueue()
+    for record, due in load_state():
+        queue.schedule(record, due)
+
+    added = 0
+    for records in load_history_bulk().values():
+        for record in records:
+            tracked = queue.get(record.key)
+            if tracked is not None and tracked.collected_at >= record.collected_at:
+                continue
+            queue.schedule(record)
+            added += 1
+
+    for record in queue.records():
+        if record.days_ago is not None and record.days_ago > max_age_days:
+            queue.remove(record.key)
+
+    logger.info("Отслеживается %s видео (новых из истории: %s)", len(queue), added)
+    return queue
+
+def main():
+    parser = argparse.ArgumentParser(description='Повторный опрос отслеживаемых видео по адаптивному расписанию')
+    parser.add_argument('--budget', type=int, default=100, help='Максимум запросов метрик за цикл')
+    parser.add_argument('--cycle', type=int, default=300, help='Минимальная длительность цикла в секундах')
+    parser.add_argument('--max-age', type=int, default=30, help='Не отслеживать видео старше N дней')
+    parser.add_argument('--once', action='store_true', help='Выполнить один цикл и завершиться')
+    parser.add_argument('--log-level', type=str, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Уровень логирования')
+    parser.add_argument('--metrics-out', type=str, default=None,
+                        help='Файл метрик (*.prom - формат Prometheus, иначе JSON lines)')
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+
+    queue = build_queue(args.max_age)
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    with Session() as session:
+        while not stopping.is_set():
+            cycle_start = time.time()
+            if refresh_due(queue, session, args.budget):
+                save_state(queue)
+            if args.once:
+                break
+            next_due = queue.next_due()
+            if next_due is None:
+                logger.info("Нет видео для отслеживания")
+                break
+            # Бюджет расходуется не чаще раза в цикл, а при отсутствии срочных видео ждем ближайшего срока
+            stopping.wait(max(cycle_start + args.cycle, next_due) - time.time())
+
+    instrumentation.print_summary()
+    if args.metrics_out:
+        logger.info("Метрики сохранены в %s", instrumentation.export(args.metrics_out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Резидентный режим: периодический сбор по набору запросов
+
+Браузеры, экземпляры yt-dlp и индекс истории создаются один раз и
+переиспользуются между циклами, поэтому накладные расходы цикла
+(запуск Python, импорт библиотек, запуск браузера, чтение истории)
+оплачиваются только при старте.
+
+Запуск:
+    python scheduler.py --config schedule.json
+
+Формат конфигурации:
+    {
+        "defaults": {"interval": 3600, "platforms": "youtube", "limit": 200, "days": 30},
+        "concurrency": {"youtube": 2, "vk": 1},
+        "jitter": 0.1,
+        "queries": [
+            {"query": "funny cats"},
+            {"query": "смешные коты", "platforms": "youtube,vk", "interval": 7200}
+        ]
+    }
+"""
+import argparse
+import heapq
+import itertools
+import os
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import Session, load_jobs, parse_platforms, run_job
+from utils import instrumentation
+from utils.log import setup_logging, get_logger
+
+logger = get_logger("scheduler")
+
+DEFAULT_INTERVAL = 3600
+# Случайное отклонение интервала (доля), чтобы запросы не выполнялись синхронно
+DEFAULT_JITTER = 0.1
+
+def load_schedule(path):
+    """
+    Загружает конфигурацию расписания
+
+    Args:
+        path (str): Путь к JSON-файлу
+
+    Returns:
+        tuple: (список заданий, ограничения параллельности по платформам, доля jitter)
+    """
+    jobs, config = load_jobs(path, interval=DEFAULT_INTERVAL)
+    return jobs, config.get('concurrency', {}), config.get('jitter', DEFAULT_JITTER)
+
+class Scheduler:
+    """
+    Выполняет задания сбора по расписанию
+
+    Каждое задание повторяется через свой интервал (с отклонением jitter),
+    отсчитываемый от завершения предыдущего запуска. Одно и то же задание
+    никогда не выполняется дважды одновременно, а число одновременных
+    сборов с каждой платформы ограничено пулами ресурсов сессии.
+
+    Args:
+        jobs (list): Задания (см. pipeline.make_job), у каждого есть interval в секундах
+        session (pipeline.Session): Общие прогретые ресурсы
+        jitter (float): Доля случайного отклонения интервала
+        max_workers (int, optional): Максимум одновременно выполняемых заданий
+    """
+
+    def __init__(self, jobs, session, jitter=DEFAULT_JITTER, max_workers=None):
+        self.jobs = jobs
+        self.session = session
+        self.jitter = jitter
+        self.max_workers = max_workers or max(1, len(jobs))
+        self._queue = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._running = 0
+
+    def run(self, once=False):
+        """
+        Запускает цикл планировщика до вызова stop()
+
+        Args:
+            once (bool): Выполнить каждое задание один раз и завершиться
+        """
+        now = time.monotonic()
+        for job in self.jobs:
+            # Первые запуски разносятся во времени, чтобы не стартовать все задания сразу
+            delay = 0 if once else random.uniform(0, job['interval'] * self.jitter)
+            self._schedule(job, now + delay)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job") as executor:
+            while not self._stopping.is_set():
+                with self._lock:
+                    if once and not self._queue and not self._running:
+                        break
+                    due, timeout = self._pop_due(time.monotonic())
+                    self._running += len(due)
+                for job in due:
+                    executor.submit(self._execute, job, once)
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+
+    def stop(self):
+        """Останавливает планировщик после завершения текущих заданий"""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _schedule(self, job, when):
+        with self._lock:
+            heapq.heappush(self._queue, (when, next(self._counter), job))
+        self._wakeup.set()
+
+    def _pop_due(self, now):
+        """Извлекает задания, время которых наступило, и время до следующего"""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[2])
+        timeout = self._queue[0][0] - now if self._queue else None
+        return due, timeout
+
+    def _execute(self, job, once):
+        start_time = time.monotonic()
+        try:
+            results = run_job(job, self.session)
+            logger.info("Запрос '%s': собрано %s видео за %.1f с", job['query'], len(results),
+                        time.monotonic() - start_time)
+        except Exception as e:
+            logger.exception("Ошибка при выполнении запроса '%s': %s", job['query'], e)
+        finally:
+            with self._lock:
+                self._running -= 1
+            if once:
+                self._wakeup.set()
+            elif not self._stopping.is_set():
+                interval = job['interval'] * random.uniform(1 - self.jitter, 1 + self.jitter)
+                self._schedule(job, time.monotonic() + interval)
+                logger.debug("Следующий запуск '%s' через %.0f с", job['query'], interval)
+
+def main():
+    parser = argparse.ArgumentParser(description='Периодический сбор виральных видео по расписанию')
+    parser.add_argument('--config', type=str, required=True, help='JSON-файл с запросами и интервалами')
+    parser.add_argument('--once', action='store_true', help='Выполнить каждый запрос один раз и завершиться')
+    parser.add_argument('--no-headless', action='store_true', help='Показывать браузер при парсинге (для отладки)')
+    parser.add_argument('--browser-profile', type=str, default=None,
+                        help='Путь к профилю браузера для использования существующих cookies')
+    parser.add_argument('--full-browser', action='store_true',
+                        help='Загружать в браузере изображения, шрифты и медиа (по умолчанию отключены для скорости)')
+    parser.add_argument('--log-level', type=str, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Уровень логирования')
+    parser.add_argument('--metrics-out', type=str, default=None,
+                        help='Файл метрик, обновляемый при завершении (*.prom - формат Prometheus, иначе JSON lines)')
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+
+    jobs, concurrency, jitter = load_schedule(args.config)
+    if not jobs:
+        logger.error("В конфигурации %s нет запросов", args.config)
+        return
+
+    os.makedirs("data/history", exist_ok=True)
+    platforms = sorted({platform for job in jobs for platform in parse_platforms(job['platforms'])})
+    logger.info("Запросов в расписании: %s, платформы: %s", len(jobs), ", ".join(platforms))
+
+    with Session(headless=not args.no_headless, browser_profile=args.browser_profile,
+                 lean_browser=not args.full_browser,
+                 concurrency=concurrency) as session:
+        scheduler = Scheduler(jobs, session, jitter=jitter)
+        signal.signal(signal.SIGINT, lambda *_: scheduler.stop())
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+        scheduler.run(once=args.once)
+
+    instrumentation.print_summary()
+    if args.metrics_out:
+        logger.info("Метрики сохранены в %s", instrumentation.export(args.metrics_out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Тесты запускаются из корня проекта: python -m pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
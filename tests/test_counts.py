@@ -0,0 +1,51 @@
+import pytest
+
+from utils.counts import parse_count, parse_counts
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1.2K", 1_200),
+    ("1,5K", 1_500),
+    ("3M", 3_000_000),
+    ("2.5B", 2_500_000_000),
+    ("12 тыс. просмотров", 12_000),
+    ("1,2 тыс.", 1_200),
+    ("3,4 млн", 3_400_000),
+    ("1 млрд", 1_000_000_000),
+    ("5к", 5_000),
+    ("7 М", 7_000_000),
+])
+def test_suffixes(value, expected):
+    assert parse_count(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1,234,567", 1_234_567),
+    ("1.234", 1_234),
+    ("1 234 567", 1_234_567),
+    ("1 234", 1_234),
+    ("1.234,5", 1_234),
+    ("12,5", 12),
+    ("987 views", 987),
+])
+def test_separators(value, expected):
+    assert parse_count(value) == expected
+
+
+def test_word_after_number_is_not_a_suffix():
+    assert parse_count("10 комментариев") == 10
+
+
+@pytest.mark.parametrize("value", ["N/A", "n/a", "", "   ", None, "неизвестно", "просмотров нет", float("nan"), True])
+def test_missing_values(value):
+    assert parse_count(value) == 0
+
+
+def test_numbers_pass_through():
+    assert parse_count(42) == 42
+    assert parse_count(42.9) == 42
+    assert parse_count("-5") == -5
+
+
+def test_parse_counts():
+    assert parse_counts(["1K", None, 7, "N/A"]) == [1_000, 0, 7, 0]
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils import dates
+from utils.dates import parse_date, parse_dates, days_since
+
+NOW = datetime(2024, 3, 15, 12, 0, 0)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5 секунд назад", NOW - timedelta(seconds=5)),
+    ("10 мин. назад", NOW - timedelta(minutes=10)),
+    ("3 часа назад", NOW - timedelta(hours=3)),
+    ("2 дня назад", NOW - timedelta(days=2)),
+    ("неделю назад", NOW - timedelta(weeks=1)),
+    ("2 недели назад", NOW - timedelta(weeks=2)),
+    ("месяц назад", datetime(2024, 2, 15, 12)),
+    ("3 месяца назад", datetime(2023, 12, 15, 12)),
+    ("год назад", datetime(2023, 3, 15, 12)),
+    ("5 hours ago", NOW - timedelta(hours=5)),
+    ("a month ago", datetime(2024, 2, 15, 12)),
+    ("Опубликовано вчера", NOW - timedelta(days=1)),
+    ("только что", NOW),
+])
+def test_relative_dates(value, expected):
+    assert parse_date(value, NOW) == expected
+
+
+def test_month_shift_clamps_day():
+    assert parse_date("1 месяц назад", datetime(2024, 3, 31)) == datetime(2024, 2, 29)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("12 марта 2024", datetime(2024, 3, 12)),
+    ("1 янв. 2023", datetime(2023, 1, 1)),
+    ("5 мая 2022", datetime(2022, 5, 5)),
+    ("Mar 12, 2024", datetime(2024, 3, 12)),
+    ("12.03.2024", datetime(2024, 3, 12)),
+    ("12.03.24", datetime(2024, 3, 12)),
+    ("20240312", datetime(2024, 3, 12)),
+    ("2024-03-12T08:30:00", datetime(2024, 3, 12, 8, 30)),
+])
+def test_absolute_dates(value, expected):
+    assert parse_date(value, NOW) == expected
+
+
+def test_date_without_year_in_current_year():
+    assert parse_date("10 марта", NOW) == datetime(2024, 3, 10)
+
+
+def test_date_without_year_rolls_back_across_new_year():
+    january = datetime(2024, 1, 5, 9, 0)
+
+    assert parse_date("28 декабря", january) == datetime(2023, 12, 28)
+    assert parse_date("Dec 31", january) == datetime(2023, 12, 31)
+    assert parse_date("3 января", january) == datetime(2024, 1, 3)
+
+
+def test_february_29_without_year_in_common_year():
+    assert parse_date("29 февраля", datetime(2023, 3, 1)) == datetime(2023, 2, 28)
+
+
+@pytest.mark.parametrize("value", [None, "", "когда-то", "31.02.2024", True])
+def test_unrecognized(value):
+    assert parse_date(value, NOW) is None
+
+
+def test_timestamps_and_datetimes():
+    assert parse_date(NOW.timestamp()) == NOW
+    assert parse_date(NOW) is NOW
+    aware = datetime(2024, 3, 15, 9, 0, tzinfo=timezone.utc)
+    assert parse_date(aware) == aware.astimezone().replace(tzinfo=None)
+
+
+def test_spec_cache_is_independent_of_now():
+    dates._compile_spec.cache_clear()
+    first = parse_date("вчера", NOW)
+    second = parse_date("вчера", NOW + timedelta(days=10))
+
+    assert first == NOW - timedelta(days=1)
+    assert second == NOW + timedelta(days=9)
+    info = dates._compile_spec.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_spec_cache_normalizes_whitespace_and_case():
+    dates._compile_spec.cache_clear()
+    parse_date("2 Дня  назад", NOW)
+    parse_date(" 2 дня назад ", NOW)
+
+    assert dates._compile_spec.cache_info().hits == 1
+
+
+def test_parse_dates_uses_one_moment():
+    assert parse_dates(["вчера", None, "2 дня назад"], NOW) == [
+        NOW - timedelta(days=1), None, NOW - timedelta(days=2)]
+
+
+def test_days_since():
+    assert days_since(NOW - timedelta(days=3, hours=5), NOW) == 3
+    assert days_since(NOW + timedelta(days=1), NOW) == 0
+    assert days_since(None, NOW) is None
@@ -0,0 +1,64 @@
+import json
+
+from utils import instrumentation
+from utils.instrumentation import instrument_driver
+
+
+class FakeElement:
+    def __init__(self, element_id):
+        self.id = element_id
+
+    def find_element(self, *args):
+        return self
+
+
+class FakeDriver:
+    """Сериализует аргументы execute_script в JSON, как это делает Selenium"""
+
+    def __init__(self, count=3):
+        self.elements = [FakeElement(i) for i in range(count)]
+        self.scripts = []
+
+    def find_elements(self, *args):
+        return list(self.elements)
+
+    def execute_script(self, script, *args):
+        payload = json.dumps(args, default=self._element_to_json)
+        self.scripts.append(payload)
+        return payload
+
+    @staticmethod
+    def _element_to_json(value):
+        if isinstance(value, FakeElement):
+            return {'element-id': value.id}
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def setup_function():
+    instrumentation.reset()
+
+
+def test_execute_script_unwraps_element_lists():
+    driver = instrument_driver(FakeDriver(), "vk")
+    elements = driver.find_elements("css selector", "div")
+
+    driver.execute_script("mark(arguments[0])", elements, True, 6)
+
+    assert json.loads(driver._target.scripts[-1])[0] == [{'element-id': i} for i in range(3)]
+
+
+def test_execute_script_unwraps_nested_containers():
+    driver = instrument_driver(FakeDriver(), "vk")
+    elements = driver.find_elements("css selector", "div")
+
+    driver.execute_script("f()", {'items': (elements[0], [elements[1]])})
+
+    assert json.loads(driver._target.scripts[-1])[0] == {'items': [{'element-id': 0}, [{'element-id': 1}]]}
+
+
+def test_execute_script_counts_roundtrips():
+    driver = instrument_driver(FakeDriver(), "vk")
+    driver.execute_script("f()", driver.find_elements("css selector", "div"))
+
+    counters = instrumentation.snapshot()['counters']
+    assert sum(value for name, _, value in counters if name == "webdriver_roundtrips") == 2
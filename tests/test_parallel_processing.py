@@ -0,0 +1,13 @@
+import parallel_processing
+from utils import log
+
+
+def test_pool_uses_spawn():
+    with parallel_processing._create_pool(1) as pool:
+        assert pool._ctx.get_start_method() == "spawn"
+
+
+def test_process_in_parallel_with_logging_queue():
+    log.setup_logging("WARNING")
+
+    assert parallel_processing.process_in_parallel(abs, [-1, -2, 3], max_workers=2) == [1, 2, 3]
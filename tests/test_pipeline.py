@@ -0,0 +1,135 @@
+import itertools
+
+import pytest
+
+from pipeline import WarmPool
+
+
+class Resource:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+
+
+def make_pool(**kwargs):
+    counter = itertools.count(1)
+    return WarmPool(lambda: Resource(next(counter)), close=lambda resource: setattr(resource, 'closed', True),
+                    **kwargs)
+
+
+def test_healthy_resource_is_reused():
+    pool = make_pool(is_alive=lambda resource: resource.alive)
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+
+    assert second is first
+
+
+def test_dead_resource_is_replaced():
+    pool = make_pool(is_alive=lambda resource: resource.alive)
+    with pool.acquire() as first:
+        first.alive = False  # Браузер упал, но парсер перехватил ошибку
+    with pool.acquire() as second:
+        pass
+
+    assert second.number == 2
+    assert first.closed
+
+
+def test_failing_health_check_counts_as_dead():
+    def is_alive(resource):
+        raise ConnectionRefusedError()
+
+    pool = make_pool(is_alive=is_alive)
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+
+    assert second is not first
+    assert first.closed
+
+
+def test_error_discards_resource():
+    pool = make_pool()
+    with pytest.raises(RuntimeError):
+        with pool.acquire() as first:
+            raise RuntimeError()
+    with pool.acquire() as second:
+        pass
+
+    assert first.closed and second is not first
+
+
+def write_jobs(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_load_jobs_from_text_file(tmp_path):
+    from pipeline import load_jobs
+
+    path = write_jobs(tmp_path, "queries.txt", "# комментарий\nкоты\n\n  собаки  \n")
+    jobs, config = load_jobs(path, limit=50)
+
+    assert [job['query'] for job in jobs] == ["коты", "собаки"]
+    assert all(job['limit'] == 50 and job['priority'] == 0 for job in jobs)
+    assert config == {}
+
+
+def test_load_jobs_from_json_with_defaults(tmp_path):
+    import json
+    from pipeline import load_jobs
+
+    path = write_jobs(tmp_path, "jobs.json", json.dumps({
+        'defaults': {'platforms': 'vk', 'limit': 30},
+        'queries': ["коты", {'query': "собаки", 'priority': 5, 'limit': 10}],
+    }))
+    jobs, config = load_jobs(path, limit=100, days=7)
+
+    assert [(job['query'], job['platforms'], job['limit'], job['priority'], job['days']) for job in jobs] == [
+        ("коты", 'vk', 30, 0, 7), ("собаки", 'vk', 10, 5, 7)]
+    assert config['defaults'] == {'platforms': 'vk', 'limit': 30}
+
+
+def test_run_batch_priority_merge_and_bulk_history(monkeypatch):
+    import pipeline
+    from pipeline import Session, make_job, run_batch
+    from utils.records import VideoRecord
+
+    collected = {
+        "low": [VideoRecord("YouTube Shorts", "l1", views=10)],
+        "high": [VideoRecord("YouTube Shorts", "h1", views=10)],
+        "repeat": [VideoRecord("YouTube Shorts", "r1", views=10), VideoRecord("YouTube Shorts", "r2", views=20)],
+    }
+    order = []
+    repeat_batches = iter([collected["repeat"], [VideoRecord("YouTube Shorts", "r2", views=25),
+                                                 VideoRecord("YouTube Shorts", "r3", views=30)]])
+
+    def fake_collect(job, session):
+        order.append(job['query'])
+        records = next(repeat_batches) if job['query'] == "repeat" else collected.get(job['query'], [])
+        return {'youtube': records}
+
+    history_loads = []
+    stored = {}
+    monkeypatch.setattr(pipeline, "collect", fake_collect)
+    monkeypatch.setattr(pipeline, "load_history_bulk",
+                        lambda queries: history_loads.append(list(queries)) or {query: [] for query in queries})
+    monkeypatch.setattr(pipeline, "store", lambda query, results, session, timestamp=None:
+                        stored.setdefault(query, [record.video_id for record in results]))
+
+    jobs = [make_job("low"), make_job("repeat", priority=1), make_job("high", priority=5),
+            make_job("repeat", priority=1), make_job("empty", priority=9)]
+    results = run_batch(jobs, Session())
+
+    assert order == ["empty", "high", "repeat", "repeat", "low"]
+    assert history_loads == [["low", "repeat", "high", "repeat", "empty"]]
+    assert list(results) == ["high", "repeat", "low"]
+    # Повтор запроса дополняет результаты: уже собранное видео не дублируется
+    assert sorted(stored["repeat"]) == ["r1", "r2", "r3"]
+    assert "empty" not in stored
@@ -0,0 +1,46 @@
+import asyncio
+import glob
+import os
+from datetime import datetime
+
+import pytest
+
+from parsers.registry import blocking_search
+from utils import profiling
+from utils.records import VideoRecord
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    profiling.start('cprofile', str(tmp_path))
+    yield tmp_path
+    profiling.stop()
+    profiling._config = None
+
+
+def collect(since, func):
+    async def run():
+        return [record async for record in blocking_search(since, func)]
+    return asyncio.run(run())
+
+
+def make_records():
+    return [VideoRecord(platform="YouTube", video_id="v1", title="", url="", views=1, likes=0, comments=0,
+                        shares=0, publish_date=datetime.now(), channel="", query="cats")]
+
+
+def test_blocking_search_returns_records_while_process_profiler_active(profiled):
+    since = datetime(2000, 1, 1)
+
+    assert [record.video_id for record in collect(since, make_records)] == ["v1"]
+
+
+def test_section_profiler_conflict_does_not_stop_collection(profiled, monkeypatch):
+    class ConflictingProfiler:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling, "_new_profiler", lambda mode: ConflictingProfiler())
+
+    assert [record.video_id for record in collect(datetime(2000, 1, 1), make_records)] == ["v1"]
+    assert not glob.glob(os.path.join(str(profiled), "platform_*"))
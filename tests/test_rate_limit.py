@@ -0,0 +1,45 @@
+import pytest
+
+from utils.rate_limit import is_block_message, is_block_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.instagram.com/challenge/?next=/explore/tags/cats/",
+    "https://www.instagram.com/accounts/login/?next=%2Fexplore%2F",
+    "https://vk.com/challenge.html?hash=abc",
+    "https://www.google.com/sorry/index?continue=https://www.youtube.com/",
+    "https://www.tiktok.com/captcha",
+])
+def test_block_pages_detected(url):
+    assert is_block_url(url)
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.tiktok.com/search?q=dance%20challenge",
+    "https://www.tiktok.com/api/search/general/full/?keyword=captcha%20429&offset=0",
+    "https://www.instagram.com/explore/tags/icebucketchallenge/",
+    "https://vk.com/clips?q=challenge",
+    "",
+    None,
+])
+def test_search_pages_not_blocked(url):
+    assert not is_block_url(url)
+
+
+@pytest.mark.parametrize("message", [
+    "ERROR: [youtube] abc: Unable to download webpage: HTTP Error 429: Too Many Requests",
+    "ERROR: [youtube] abc: Sign in to confirm you’re not a bot. Use --cookies-from-browser",
+    "ERROR: [youtube] abc: Sign in to confirm you're not a bot",
+])
+def test_block_messages_detected(message):
+    assert is_block_message(message)
+
+
+@pytest.mark.parametrize("message", [
+    "WARNING: [youtube] abc: n challenge solving failed: Some formats may be missing",
+    "WARNING: [youtube] abc: nsig extraction failed: You may experience throttling",
+    "ERROR: [youtube] abc: Video unavailable",
+    "",
+])
+def test_other_messages_not_blocked(message):
+    assert not is_block_message(message)
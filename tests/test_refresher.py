@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta
+
+import refresher
+from refresher import RefreshQueue, refresh_due, refresh_interval, MIN_INTERVAL, MAX_INTERVAL
+from utils.records import VideoRecord
+
+
+def make_record(video_id, views=1000, velocity=0.0, age_days=0, platform="YouTube Shorts"):
+    collected_at = datetime(2024, 3, 15, 12, 0)
+    return VideoRecord(platform, video_id, views=views, views_velocity=velocity,
+                       publish_date=collected_at - timedelta(days=age_days), collected_at=collected_at)
+
+
+def test_fast_growing_videos_are_refreshed_sooner():
+    hot = refresh_interval(make_record("hot", velocity=5000))
+    warm = refresh_interval(make_record("warm", velocity=100))
+    cold = refresh_interval(make_record("cold", velocity=0))
+
+    assert hot < warm < cold
+
+
+def test_older_videos_are_refreshed_later():
+    assert refresh_interval(make_record("new", age_days=0)) < refresh_interval(make_record("old", age_days=14))
+
+
+def test_interval_bounds():
+    assert refresh_interval(make_record("viral", velocity=1e9)) == MIN_INTERVAL
+    assert refresh_interval(make_record("ancient", age_days=10_000)) == MAX_INTERVAL
+
+
+def test_pop_due_in_due_order_within_budget():
+    queue = RefreshQueue()
+    queue.schedule(make_record("c"), due=300)
+    queue.schedule(make_record("a"), due=100)
+    queue.schedule(make_record("b"), due=200)
+    queue.schedule(make_record("later"), due=10_000)
+
+    assert [record.video_id for record in queue.pop_due(now=1000, limit=2)] == ["a", "b"]
+    assert [record.video_id for record in queue.pop_due(now=1000, limit=10)] == ["c"]
+    assert queue.next_due() == 10_000
+
+
+def test_rescheduled_video_uses_latest_due_time():
+    queue = RefreshQueue()
+    queue.schedule(make_record("a"), due=100)
+    queue.schedule(make_record("b"), due=200)
+    queue.schedule(make_record("a"), due=500)  # Перенос: старый элемент кучи игнорируется
+
+    assert [record.video_id for record in queue.pop_due(now=300, limit=10)] == ["b"]
+    assert queue.next_due() == 500
+
+
+def test_removed_video_is_not_returned():
+    queue = RefreshQueue()
+    queue.schedule(make_record("a"), due=100)
+    queue.remove(("YouTube Shorts", "a"))
+
+    assert queue.pop_due(now=1000, limit=10) == []
+    assert queue.next_due() is None
+
+
+def test_refresh_due_reschedules_by_new_velocity(monkeypatch):
+    queue = RefreshQueue()
+    old = make_record("a", views=1000)
+    old.collected_at = datetime.now() - timedelta(hours=1)
+    queue.schedule(old, due=0)
+    queue.schedule(make_record("gone"), due=0)
+    queue.schedule(make_record("other", platform="TikTok"), due=0)
+
+    def fetch(records, session):
+        return {'a': VideoRecord("YouTube Shorts", "a", views=5000, publish_date=old.publish_date)}
+
+    monkeypatch.setitem(refresher.FETCHERS, "YouTube Shorts", fetch)
+
+    assert refresh_due(queue, session=None, budget=10, now=time.time()) == 1
+    assert queue.get(("YouTube Shorts", "a")).views == 5000
+    # Недоступное видео опрашивается нескоро, неподдерживаемая платформа исключается
+    assert queue.due_time(("YouTube Shorts", "gone")) >= time.time() + MAX_INTERVAL - 5
+    assert ("TikTok", "other") not in queue
+    assert queue.due_time(("YouTube Shorts", "a")) < queue.due_time(("YouTube Shorts", "gone"))
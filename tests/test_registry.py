@@ -0,0 +1,25 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from parsers.registry import blocking_search
+from utils.records import VideoRecord
+
+
+def make_record(video_id, publish_date):
+    return VideoRecord(platform="YouTube", video_id=video_id, title="", url="", views=0, likes=0, comments=0,
+                       shares=0, publish_date=publish_date, channel="", query="cats")
+
+
+def test_blocking_search_keeps_boundary_day():
+    since = datetime(2024, 3, 8, 15, 30)
+    records = [
+        make_record("boundary_morning", datetime(2024, 3, 8, 9, 0)),
+        make_record("inside", datetime(2024, 3, 10, 12, 0)),
+        make_record("too_old", datetime(2024, 3, 7, 23, 59)),
+        make_record("unknown", None),
+    ]
+
+    async def collect():
+        return [record.video_id async for record in blocking_search(since, lambda: records)]
+
+    assert asyncio.run(collect()) == ["boundary_morning", "inside", "unknown"]
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("lxml")
+
+from parsers.tiktok_parser import build_item_record
+
+
+def test_build_item_record_from_stats():
+    record = build_item_record({
+        'id': 7301, 'desc': "cats", 'author': {'uniqueId': "catlover"}, 'createTime': 1718200800,
+        'stats': {'playCount': 1500, 'diggCount': 120, 'commentCount': 7, 'shareCount': 3},
+    }, "cats")
+
+    assert (record.views, record.likes, record.comments, record.shares) == (1500, 120, 7, 3)
+    assert record.url == "https://www.tiktok.com/@catlover/video/7301"
+    assert record.publish_date == datetime.fromtimestamp(1718200800)
+
+
+def test_build_item_record_from_abbreviated_stats_v2():
+    record = build_item_record({
+        'id': "7302", 'desc': "cats", 'author': "catlover", 'createTime': "1718200800",
+        'statsV2': {'playCount': "1.2M", 'diggCount': "45.3K", 'commentCount': "N/A", 'shareCount': ""},
+    }, "cats")
+
+    assert (record.views, record.likes, record.comments, record.shares) == (1_200_000, 45_300, 0, 0)
+    assert record.publish_date == datetime.fromtimestamp(1718200800)
+
+
+def test_build_item_record_without_create_time():
+    record = build_item_record({'id': "7303", 'desc': "", 'stats': {}}, "cats")
+
+    assert record.publish_date is None
+    assert record.views == 0
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("requests")
+
+from benchmarks.vk_stub import start_stub, STUB_INVALID_TOKEN
+from parsers import registry, vk_api
+from utils.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    """Заглушка API VK и отдельный ограничитель запросов без пауз"""
+    server, url = start_stub(total=300)
+    monkeypatch.setenv("VK_API_URL", url)
+    monkeypatch.setattr(vk_api, "_unauthorized", False)
+    monkeypatch.setitem(registry._limiters, 'vk', RateLimiter('vk', 0, 1000, 60, state_dir=str(tmp_path)))
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_search_clips_pages_through_results(stub):
+    records = vk_api.search_clips("коты", limit=250, days_ago=365, token="stub")
+
+    assert len(records) == 250
+    assert len({record.video_id for record in records}) == 250
+    assert [record.views for record in records] == sorted((record.views for record in records), reverse=True)
+
+
+def test_clip_and_video_urls(stub):
+    records = vk_api.search_clips("коты", limit=300, days_ago=365, token="stub")
+    urls = {record.title: record.url for record in records}
+
+    assert urls["Кот и пылесос 😹 #коты #смешное"].startswith("https://vk.com/clip-219481029_")
+    assert urls["Кот охраняет холодильник #коты"].startswith("https://vk.com/video90127734_")
+
+
+def test_rejected_token_disables_api(stub):
+    with pytest.raises(vk_api.VkAuthError):
+        vk_api.search_clips("коты", limit=10, token=STUB_INVALID_TOKEN)
+
+    assert vk_api._unauthorized
+
+
+def test_rejected_token_falls_back_to_browser(stub, monkeypatch):
+    vk_parser = pytest.importorskip("parsers.vk_parser")
+    calls = []
+
+    def fake_browser_collector(**kwargs):
+        calls.append(kwargs)
+        return []
+
+    monkeypatch.setenv("VK_API_TOKEN", STUB_INVALID_TOKEN)
+    monkeypatch.setattr(vk_parser, "parse_vk_clips", fake_browser_collector)
+
+    async def collect():
+        return [record async for record in vk_parser.search(
+            "коты", 10, datetime.now() - timedelta(days=7), headless=False,
+            browser_profile="/tmp/profile", lean_browser=False, enrich=0)]
+
+    assert asyncio.run(collect()) == []
+    assert len(calls) == 1
+    assert calls[0]['headless'] is False
+    assert calls[0]['browser_profile'] == "/tmp/profile"
+    assert calls[0]['lean'] is False
+    assert calls[0]['driver'] is None
+
+
+def test_network_error_falls_back_to_browser(monkeypatch):
+    vk_parser = pytest.importorskip("parsers.vk_parser")
+    import requests
+
+    def unreachable(*args, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(vk_api, "search_clips", unreachable)
+
+    assert vk_parser.parse_vk_clips_http("коты", 10, 7, fallback=lambda **kwargs: ["browser"]) == ["browser"]
+
+
+def test_unexpected_api_error_is_not_hidden(monkeypatch):
+    vk_parser = pytest.importorskip("parsers.vk_parser")
+
+    def broken(*args, **kwargs):
+        raise KeyError("owner_id")
+
+    monkeypatch.setattr(vk_api, "search_clips", broken)
+
+    with pytest.raises(KeyError):
+        vk_parser.parse_vk_clips_http("коты", 10, 7, fallback=lambda **kwargs: ["browser"])
+
+
+def test_first_day_of_window_is_kept(stub, monkeypatch):
+    now = datetime.now()
+    first_day = datetime.combine((now - timedelta(days=7)).date(), datetime.min.time()) + timedelta(minutes=1)
+    day_before = first_day - timedelta(minutes=2)
+    items = [
+        {'id': 1, 'owner_id': 5, 'type': 'short_video', 'title': "first day", 'date': int(first_day.timestamp())},
+        {'id': 2, 'owner_id': 5, 'type': 'short_video', 'title': "day before", 'date': int(day_before.timestamp())},
+    ]
+    monkeypatch.setattr(vk_api, "_call", lambda *args, **kwargs: {'items': items, 'count': len(items)})
+
+    records = vk_api.search_clips("коты", limit=10, days_ago=7, token="stub")
+
+    assert [record.title for record in records] == ["first day"]
+
+
+def test_paging_stops_at_first_clip_older_than_window(stub, monkeypatch):
+    now = datetime.now()
+    pages = []
+
+    def fake_call(method, token, **params):
+        pages.append(params['offset'])
+        assert params['sort'] == vk_api.SORT_BY_DATE
+        # Полная страница: первые 50 клипов свежие, дальше - старше окна
+        items = [{'id': params['offset'] + i, 'owner_id': 5, 'type': 'short_video', 'title': str(i),
+                  'date': int((now - timedelta(days=1 if params['offset'] + i < 50 else 30)).timestamp())}
+                 for i in range(vk_api.PAGE_SIZE)]
+        return {'items': items, 'count': 10_000}
+
+    monkeypatch.setattr(vk_api, "_call", fake_call)
+
+    records = vk_api.search_clips("коты", limit=500, days_ago=7, token="stub")
+
+    assert len(records) == 50
+    assert pages == [0]
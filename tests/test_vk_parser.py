@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("selenium")
+
+from parsers.vk_parser import parse_clip_stats
+
+PAGE = """<html><script>
+var recommended = {"items": [{"id": 456239871, "owner_id": -1, "likes": {"count": 99999},
+                              "comments": 5000, "reposts": {"count": 700}}]};
+var clip = {"owner_id": -219481029, "title": "Кот и пылесос {}", "id": 456239871,
+            "likes": {"count": 842, "user_likes": 0}, "comments": 37, "reposts": {"count": 51},
+            "author": {"id": 219481029, "name": "Коты"}};
+</script></html>"""
+
+
+def test_stats_read_from_this_clip_object():
+    assert parse_clip_stats(PAGE, "-219481029_456239871") == {'likes': 842, 'comments': 37, 'shares': 51}
+
+
+def test_other_clip_counters_ignored():
+    assert parse_clip_stats(PAGE, "-219481029_1") is None
+    assert parse_clip_stats(PAGE, "-5_456239871") is None
+
+
+def test_page_without_clip_data():
+    assert parse_clip_stats("<html>Войдите, чтобы продолжить</html>", "-219481029_456239871") is None
+    assert parse_clip_stats('{"id": 7, "owner_id": 1, "title": "x"}', "1_7") is None
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import parallel_processing
+from parsers import registry, youtube_parser
+from utils.rate_limit import RateLimiter
+
+
+class FakeYdl:
+    """yt-dlp без сети: поиск отдает total результатов, видео - шорт за последний час"""
+
+    def __init__(self, total=35):
+        self.total = total
+        self.searches = []
+        self.videos = []
+
+    def extract_info(self, url, download=False, process=True):
+        if url.startswith("ytsearch"):
+            self.searches.append(url)
+            count = int(url[len("ytsearch"):url.index(":")])
+            return {'entries': ({'id': f"v{i}"} for i in range(min(count, self.total)))}
+        video_id = url.rsplit("/", 1)[1]
+        self.videos.append(video_id)
+        return {'id': video_id, 'title': "cats", 'duration': 30, 'view_count': 100,
+                'timestamp': time.time() - 3600, 'uploader': "channel"}
+
+
+@pytest.fixture(autouse=True)
+def limiter(monkeypatch, tmp_path):
+    monkeypatch.setitem(registry._limiters, 'youtube', RateLimiter('youtube', 0, 1000, 60, state_dir=str(tmp_path)))
+
+
+@pytest.fixture
+def ydl(monkeypatch):
+    ydl = FakeYdl()
+    monkeypatch.setattr(parallel_processing, "_worker_ydl", ydl)
+    monkeypatch.setattr(parallel_processing, "_stop_event", None)
+    return ydl
+
+
+def make_unit(page, video_ids=None):
+    return {'query': "cats", 'page': page, 'video_ids': video_ids, 'max_results': 40, 'page_size': 10,
+            'days_ago': 30, 'strict_query_match': True, 'recent_first': False}
+
+
+def test_listing_fetched_once_per_variant(ydl):
+    records, exhausted, listing = parallel_processing._run_page_task(make_unit(0))
+
+    assert [record.video_id for record in records] == [f"v{i}" for i in range(10)]
+    assert listing == [f"v{i}" for i in range(10, 35)]
+    assert not exhausted
+
+    records, _, listing = parallel_processing._run_page_task(make_unit(1, listing[:10]))
+
+    assert [record.video_id for record in records] == [f"v{i}" for i in range(10, 20)]
+    assert listing is None
+    assert ydl.searches == ["ytsearch40:cats shorts"]
+    assert len(ydl.videos) == 20
+
+
+def test_fetch_search_listing_limits_results():
+    ydl = FakeYdl(total=100)
+
+    assert youtube_parser.fetch_search_listing("cats", 25, ydl=ydl) == [f"v{i}" for i in range(25)]
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from parsers import registry, youtube_parser
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+    def report_block(self, reason):
+        pass
+
+
+class FakeYdl:
+    """yt-dlp без сети: videos - метаданные результатов поиска в порядке выдачи"""
+
+    def __init__(self, videos):
+        self.videos = {video['id']: video for video in videos}
+        self.order = [video['id'] for video in videos]
+        self.processed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False, process=True):
+        assert not process, "поиск должен выполняться без извлечения метаданных"
+        return {'entries': ({'_type': 'url', 'id': video_id} for video_id in self.order)}
+
+    def process_ie_result(self, entry, download=False):
+        self.processed.append(entry['id'])
+        return self.videos[entry['id']]
+
+
+def make_video(video_id, age_days, views=100):
+    return {'id': video_id, 'title': "cats", 'duration': 30, 'view_count': views,
+            'timestamp': time.time() - age_days * 86400 - 60, 'uploader': "channel"}
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = CountingLimiter()
+    monkeypatch.setitem(registry._limiters, 'youtube', limiter)
+    return limiter
+
+
+def test_search_takes_one_token_per_extracted_video(limiter):
+    ydl = FakeYdl([make_video(f"v{i}", 1) for i in range(30)])
+
+    records = youtube_parser.parse_youtube_shorts("cats", limit=5, ydl=ydl)
+
+    assert len(records) == 5
+    # Список результатов - один запрос, дальше по запросу на каждое извлеченное видео
+    assert ydl.processed == [f"v{i}" for i in range(5)]
+    assert limiter.acquired == 1 + len(ydl.processed)
+
+
+def test_recent_first_stops_after_old_streak(limiter):
+    limit = youtube_parser.OLD_STREAK_LIMIT
+    videos = [make_video("fresh1", 1), make_video("fresh2", 2)]
+    videos += [make_video(f"old{i}", 60) for i in range(limit)]
+    videos += [make_video("fresh_after", 1)]
+    ydl = FakeYdl(videos)
+
+    records = youtube_parser.parse_youtube_shorts("cats", limit=100, days_ago=30, recent_first=True, ydl=ydl)
+
+    assert sorted(record.video_id for record in records) == ["fresh1", "fresh2"]
+    assert ydl.processed == ["fresh1", "fresh2"] + [f"old{i}" for i in range(limit)]
+
+
+def test_recent_first_streak_resets_on_fresh_video(limiter):
+    limit = youtube_parser.OLD_STREAK_LIMIT
+    videos = [make_video(f"old{i}", 60) for i in range(limit - 1)]
+    videos += [make_video("fresh", 1)]
+    videos += [make_video(f"older{i}", 60) for i in range(limit - 1)]
+    videos += [make_video("fresh_last", 1)]
+    ydl = FakeYdl(videos)
+
+    records = youtube_parser.parse_youtube_shorts("cats", limit=100, days_ago=30, recent_first=True, ydl=ydl)
+
+    assert sorted(record.video_id for record in records) == ["fresh", "fresh_last"]
+
+
+def test_without_recent_first_old_videos_do_not_stop_search(limiter):
+    videos = [make_video(f"old{i}", 60) for i in range(youtube_parser.OLD_STREAK_LIMIT + 2)]
+    videos += [make_video("fresh", 1)]
+
+    records = youtube_parser.parse_youtube_shorts("cats", limit=100, days_ago=30, ydl=FakeYdl(videos))
+
+    assert [record.video_id for record in records] == ["fresh"]
+
+
+def test_page_reports_exhaustion_after_old_streak(limiter):
+    videos = [make_video(f"old{i}", 60) for i in range(youtube_parser.OLD_STREAK_LIMIT)]
+    ydl = FakeYdl(videos)
+    ydl.extract_info = lambda url, download=False, process=True: ydl.videos[url.rsplit("/", 1)[1]]
+    video_ids = [video['id'] for video in videos]
+
+    assert youtube_parser.parse_youtube_page("cats", video_ids, days_ago=30, recent_first=True, ydl=ydl) == ([], True)
+    assert youtube_parser.parse_youtube_page("cats", video_ids, days_ago=30, ydl=ydl) == ([], False)
@@ -1,17 +1,143 @@
 import random
 import time
-import os
-import pickle
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
+from utils.log import get_logger
+from utils import cookie_store
+from utils.browser_profiles import checkout_profile, attach_profile, discard_profile
 
-def setup_driver(headless=True):
+logger = get_logger("browser")
+
+# Легкий режим браузера: страницы загружаются без изображений, веб-шрифтов,
+# медиа и трекеров, в уменьшенном окне. Данные извлекаются из DOM, поэтому
+# на результат это не влияет, а трафик и время подгрузки при прокрутке
+# снижаются, и на одной машине помещается больше браузеров.
+LEAN_WINDOW_SIZE = (960, 720)
+LEAN_FIREFOX_PREFS = {
+    'permissions.default.image': 2,  # Не загружать изображения
+    'gfx.downloadable_fonts.enabled': False,  # Не загружать веб-шрифты
+    'media.autoplay.default': 5,  # Запретить автовоспроизведение видео и звука
+    'media.autoplay.blocking_policy': 2,
+    'media.preload.default': 0,  # Не подгружать медиа заранее
+    'privacy.trackingprotection.enabled': True,  # Блокировать трекеры
+    'privacy.trackingprotection.socialtracking.enabled': True,
+    'network.prefetch-next': False,  # Без предзагрузки ссылок
+    'network.dns.disablePrefetch': True,
+    'dom.ipc.processCount': 1,  # Один процесс содержимого на браузер
+}
+# Без прогретого профиля дисковый кэш бесполезен (профиль временный): кэш только в памяти
+LEAN_FIREFOX_CACHE_PREFS = {
+    'browser.cache.disk.enable': False,
+    'browser.cache.memory.enable': True,
+    'browser.cache.memory.capacity': 65536,  # КБ
+}
+# Для Chrome используются только аргументы запуска: настройки (prefs)
+# сохранились бы в профиле пользователя (--user-data-dir)
+LEAN_CHROME_ARGS = (
+    '--blink-settings=imagesEnabled=false',
+    '--autoplay-policy=user-gesture-required',
+    '--mute-audio',
+    '--disable-remote-fonts',
+    f'--window-size={LEAN_WINDOW_SIZE[0]},{LEAN_WINDOW_SIZE[1]}',
+)
+LEAN_CHROME_CACHE_ARGS = ('--disk-cache-size=1',)
+# Запросы, блокируемые в Chrome через DevTools (шрифты и медиа)
+LEAN_BLOCKED_URLS = ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm', '*.m3u8', '*.mp3')
+
+def apply_lean_options(options, disk_cache=False):
+    """
+    Добавляет настройки легкого режима к опциям Firefox или Chrome
+    
+    Args:
+        options: Опции Firefox или Chrome
+        disk_cache (bool): Сохранить дисковый кэш (браузер использует прогретый профиль)
+        
+    Returns:
+        Те же опции
+    """
+    if isinstance(options, Options):
+        prefs = LEAN_FIREFOX_PREFS if disk_cache else {**LEAN_FIREFOX_PREFS, **LEAN_FIREFOX_CACHE_PREFS}
+        for name, value in prefs.items():
+            options.set_preference(name, value)
+    else:
+        for argument in LEAN_CHROME_ARGS + (() if disk_cache else LEAN_CHROME_CACHE_ARGS):
+            options.add_argument(argument)
+    return options
+
+def apply_warm_profile(options, platform):
+    """
+    Подключает к опциям браузера рабочую копию прогретого профиля платформы
+    (см. utils.browser_profiles)
+    
+    Args:
+        options: Опции Firefox или Chrome
+        platform (str): Платформа
+        
+    Returns:
+        tuple: (браузер: firefox или chrome, путь к рабочей копии профиля)
+    """
+    browser = 'firefox' if isinstance(options, Options) else 'chrome'
+    clone = checkout_profile(platform, browser)
+    if browser == 'firefox':
+        # Профиль используется на месте: FirefoxProfile скопировал бы его во временный каталог
+        options.add_argument('-profile')
+        options.add_argument(clone)
+    else:
+        options.add_argument(f'--user-data-dir={clone}')
+    return browser, clone
+
+def start_with_profile(start, platform, browser, clone):
+    """
+    Запускает браузер с рабочей копией профиля и освобождает ее при закрытии браузера
+    
+    Args:
+        start (callable): Функция запуска браузера
+        platform (str): Платформа
+        browser (str): firefox или chrome
+        clone (str): Путь к рабочей копии профиля (None - без прогретого профиля)
+        
+    Returns:
+        WebDriver: Запущенный браузер
+    """
+    if clone is None:
+        return start()
+    try:
+        driver = start()
+    except Exception:
+        discard_profile(clone)
+        raise
+    return attach_profile(driver, platform, browser, clone)
+
+def apply_lean_driver(driver):
+    """
+    Применяет настройки легкого режима к запущенному браузеру: размер окна
+    и (в Chrome) блокировку загрузки шрифтов и медиа
+    
+    Args:
+        driver: WebDriver экземпляр
+        
+    Returns:
+        WebDriver: Тот же экземпляр
+    """
+    try:
+        driver.set_window_size(*LEAN_WINDOW_SIZE)
+        if hasattr(driver, 'execute_cdp_cmd'):
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(LEAN_BLOCKED_URLS)})
+    except Exception as e:
+        logger.warning("Не удалось применить настройки легкого режима браузера: %s", e)
+    return driver
+
+def setup_driver(headless=True, lean=True, platform=None):
     """
     Настраивает и возвращает экземпляр веб-драйвера Firefox
     
     Args:
         headless (bool): Запускать браузер в фоновом режиме без UI
+        lean (bool): Легкий режим (без изображений, шрифтов и медиа)
+        platform (str, optional): Платформа, прогретый профиль которой использовать
         
     Returns:
         WebDriver: Экземпляр веб-драйвера или None в случае ошибки
@@ -32,38 +158,42 @@ def setup_driver(headless=True):
         # Фоновый режим (без интерфейса)
         if headless:
             options.add_argument("--headless")
+        browser, clone = apply_warm_profile(options, platform) if platform else (None, None)
+        if lean:
+            apply_lean_options(options, disk_cache=clone is not None)
         
         # Путь к geckodriver
         gecko_path = "./geckodriver"  # Или "geckodriver" для Linux/Mac
         
         # Инициализация драйвера
         service = Service(executable_path=gecko_path)
-        driver = webdriver.Firefox(service=service, options=options)
+        driver = start_with_profile(lambda: webdriver.Firefox(service=service, options=options),
+                                    platform, browser, clone)
         
-        return driver
+        return apply_lean_driver(driver) if lean else driver
     except Exception as e:
-        print(f"Ошибка при настройке драйвера Firefox: {e}")
+        logger.error("Ошибка при настройке драйвера Firefox: %s", e)
         return None
 
 def save_cookies(driver, platform):
     """
-    Сохраняет cookies после авторизации на платформе
+    Сохраняет cookies после авторизации на платформе (см. utils.cookie_store)
     
     Args:
         driver: WebDriver экземпляр
         platform (str): Название платформы (youtube, tiktok, instagram, vk)
     """
-    cookies_dir = os.path.join(os.getcwd(), "cookies")
-    os.makedirs(cookies_dir, exist_ok=True)
-    
-    cookies_file = os.path.join(cookies_dir, f"{platform}_cookies.pkl")
-    pickle.dump(driver.get_cookies(), open(cookies_file, "wb"))
-    print(f"Cookies для {platform} сохранены")
+    cookie_store.save(platform, driver.get_cookies())
+    logger.info("Cookies для %s сохранены", platform)
 
 def load_cookies(driver, platform):
     """
     Загружает сохраненные cookies для платформы
     
+    add_cookie работает только на странице домена cookies. Если браузер
+    уже на домене платформы, переход не выполняется, иначе открывается
+    robots.txt платформы вместо главной страницы.
+    
     Args:
         driver: WebDriver экземпляр
         platform (str): Название платформы (youtube, tiktok, instagram, vk)
@@ -71,30 +201,22 @@ def load_cookies(driver, platform):
     Returns:
         bool: True если cookies были загружены, иначе False
     """
-    cookies_file = os.path.join(os.getcwd(), "cookies", f"{platform}_cookies.pkl")
+    cookies = cookie_store.load(platform)
+    if not cookies:
+        return False
     
-    if os.path.exists(cookies_file):
-        cookies = pickle.load(open(cookies_file, "rb"))
-        # Сначала переходим на домен
-        domain_urls = {
-            "youtube": "https://www.youtube.com",
-            "tiktok": "https://www.tiktok.com",
-            "instagram": "https://www.instagram.com",
-            "vk": "https://vk.com"
-        }
-        
-        driver.get(domain_urls.get(platform, "https://www.google.com"))
-        
-        # Загружаем cookies
-        for cookie in cookies:
-            try:
-                driver.add_cookie(cookie)
-            except:
-                pass
-                
-        print(f"Cookies для {platform} загружены")
-        return True
-    return False
+    domain_url = cookie_store.DOMAIN_URLS.get(platform, "https://www.google.com")
+    if urlparse(driver.current_url).hostname != urlparse(domain_url).hostname:
+        driver.get(f"{domain_url}/robots.txt")
+    
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logger.debug("Cookie %s для %s не загружен: %s", cookie.get('name'), platform, e)
+            
+    logger.info("Cookies для %s загружены", platform)
+    return True
 
 def human_like_scroll(driver, scroll_count=5):
     """
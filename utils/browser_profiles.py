@@ -0,0 +1,150 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from utils.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: шаблоны защищены от гонок только внутри процесса
+    fcntl = None
+
+logger = get_logger("browser")
+
+# Каталог управляемых профилей: один шаблон на платформу и браузер
+PROFILES_DIR = "browser_profiles"
+# Шаблон обновляется из профиля закрытого браузера не чаще, чем раз в это время (секунды)
+TEMPLATE_MAX_AGE = 24 * 60 * 60
+# Файлы блокировок, которые браузер оставляет в профиле во время работы
+LOCK_FILES = ('lock', '.parentlock', 'parent.lock', 'SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+_thread_lock = threading.Lock()
+
+
+def checkout_profile(platform, browser):
+    """
+    Создает рабочую копию прогретого профиля для нового браузера
+
+    Профиль платформы хранит HTTP-кэш и кэш service worker'ов, поэтому
+    статические JS и CSS не загружаются заново при каждом запуске. Каждый
+    браузер работает со своей копией (copy-on-write, если файловая система
+    это поддерживает), и одновременно запущенные браузеры не портят
+    профили друг друга.
+
+    Args:
+        platform (str): Платформа (vk, tiktok, instagram)
+        browser (str): firefox или chrome (форматы профилей различаются)
+
+    Returns:
+        str: Путь к рабочей копии профиля (пустой каталог, если шаблона еще нет)
+    """
+    template = _template_path(platform, browser)
+    clone = tempfile.mkdtemp(prefix=f"profile_{platform}_{browser}_")
+    with _locked(template):
+        if os.path.isdir(template):
+            os.rmdir(clone)
+            _clone_tree(template, clone)
+            logger.debug("Профиль %s скопирован из %s", clone, template)
+    return clone
+
+
+def release_profile(platform, browser, clone):
+    """
+    Удаляет рабочую копию профиля после закрытия браузера
+
+    Если шаблона еще нет или он устарел (TEMPLATE_MAX_AGE), копия
+    становится новым шаблоном: следующие браузеры начнут с прогретым кэшем.
+
+    Args:
+        platform (str): Платформа
+        browser (str): firefox или chrome
+        clone (str): Путь, полученный от checkout_profile
+    """
+    template = _template_path(platform, browser)
+    try:
+        with _locked(template):
+            if not os.path.isdir(template) or time.time() - os.path.getmtime(template) > TEMPLATE_MAX_AGE:
+                _remove_lock_files(clone)
+                # Новый шаблон готовится рядом и подменяет старый переименованием
+                staging = f"{template}.new"
+                shutil.rmtree(staging, ignore_errors=True)
+                _clone_tree(clone, staging)
+                previous = f"{template}.old"
+                shutil.rmtree(previous, ignore_errors=True)
+                if os.path.isdir(template):
+                    os.rename(template, previous)
+                os.rename(staging, template)
+                shutil.rmtree(previous, ignore_errors=True)
+                logger.info("Профиль браузера для %s обновлен: %s", platform, template)
+    except OSError as e:
+        logger.warning("Не удалось обновить профиль браузера для %s: %s", platform, e)
+    finally:
+        shutil.rmtree(clone, ignore_errors=True)
+
+
+def attach_profile(driver, platform, browser, clone):
+    """
+    Освобождает рабочую копию профиля при закрытии браузера (driver.quit)
+
+    Args:
+        driver: WebDriver экземпляр
+        platform (str): Платформа
+        browser (str): firefox или chrome
+        clone (str): Путь, полученный от checkout_profile
+
+    Returns:
+        WebDriver: Тот же экземпляр
+    """
+    quit_driver = driver.quit
+
+    def quit_and_release():
+        try:
+            quit_driver()
+        finally:
+            release_profile(platform, browser, clone)
+
+    driver.quit = quit_and_release
+    return driver
+
+
+def discard_profile(clone):
+    """Удаляет рабочую копию профиля, не обновляя шаблон (браузер не запустился)"""
+    shutil.rmtree(clone, ignore_errors=True)
+
+
+def _template_path(platform, browser):
+    return os.path.join(PROFILES_DIR, f"{platform}-{browser}")
+
+
+def _clone_tree(source, destination):
+    """Копирует каталог: с reflink (copy-on-write), если он поддерживается, иначе обычным копированием"""
+    try:
+        subprocess.run(['cp', '-a', '--reflink=auto', source, destination], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        shutil.rmtree(destination, ignore_errors=True)
+        shutil.copytree(source, destination, symlinks=True,
+                        ignore=shutil.ignore_patterns(*LOCK_FILES))
+    _remove_lock_files(destination)
+
+
+def _remove_lock_files(path):
+    for name in LOCK_FILES:
+        lock_path = os.path.join(path, name)
+        if os.path.lexists(lock_path):
+            os.remove(lock_path)
+
+
+@contextmanager
+def _locked(template):
+    """Блокирует шаблон профиля от одновременного копирования и обновления"""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    with _thread_lock if fcntl is None else nullcontext():
+        with open(f"{template}.lock", 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
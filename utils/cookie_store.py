@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+
+from utils.log import get_logger
+
+logger = get_logger("browser")
+
+# Каталог сохраненных сессий: cookies/<platform>_cookies.json
+COOKIES_DIR = "cookies"
+# Главные страницы платформ, на которые нужно перейти перед add_cookie
+DOMAIN_URLS = {
+    "youtube": "https://www.youtube.com",
+    "tiktok": "https://www.tiktok.com",
+    "instagram": "https://www.instagram.com",
+    "vk": "https://vk.com",
+}
+
+# Платформа -> (mtime файла, cookies): файл читается один раз для HTTP- и Selenium-сборщиков
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load(platform):
+    """
+    Загружает сохраненные cookies платформы
+
+    Cookies с истекшим сроком (expiry) отбрасываются. Результат кэшируется
+    до изменения файла, поэтому прямые HTTP-запросы и браузеры читают
+    файл один раз. Сохраненные ранее pickle-файлы переводятся в JSON
+    при первом обращении.
+
+    Args:
+        platform (str): Название платформы (youtube, tiktok, instagram, vk)
+
+    Returns:
+        list: Cookies в формате Selenium (словари name, value, domain, expiry...)
+    """
+    path = _cookies_path(platform)
+    if not os.path.exists(path):
+        _migrate_pickle(platform)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return []
+
+    with _cache_lock:
+        cached = _cache.get(platform)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cookies = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Не удалось прочитать cookies для %s: %s", platform, e)
+                cookies = []
+            cached = (mtime, cookies)
+            _cache[platform] = cached
+    return _fresh(cached[1])
+
+
+def save(platform, cookies):
+    """
+    Сохраняет cookies платформы (без истекших)
+
+    Args:
+        platform (str): Название платформы
+        cookies (list): Cookies в формате Selenium (driver.get_cookies())
+    """
+    path = _cookies_path(platform)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cookies = _fresh(cookies)
+    # Запись через временный файл: параллельные сборщики не прочитают половину файла
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cookies, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    with _cache_lock:
+        _cache.pop(platform, None)
+
+
+def request_cookies(platform):
+    """
+    Cookies платформы для прямых HTTP-запросов (requests)
+
+    Returns:
+        dict: Имя cookie -> значение
+    """
+    return {cookie['name']: cookie['value'] for cookie in load(platform)}
+
+
+def _fresh(cookies):
+    now = time.time()
+    return [cookie for cookie in cookies if not cookie.get('expiry') or cookie['expiry'] > now]
+
+
+def _cookies_path(platform):
+    return os.path.join(os.getcwd(), COOKIES_DIR, f"{platform}_cookies.json")
+
+
+def _migrate_pickle(platform):
+    """Переводит cookies из старого формата (pickle) в JSON"""
+    legacy_path = os.path.join(os.getcwd(), COOKIES_DIR, f"{platform}_cookies.pkl")
+    if not os.path.exists(legacy_path):
+        return
+    import pickle
+    try:
+        with open(legacy_path, 'rb') as f:
+            cookies = pickle.load(f)
+        save(platform, [dict(cookie) for cookie in cookies])
+        os.remove(legacy_path)
+        logger.info("Cookies для %s переведены в JSON", platform)
+    except Exception as e:
+        logger.warning("Не удалось перевести cookies для %s в JSON: %s", platform, e)
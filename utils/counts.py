@@ -0,0 +1,120 @@
+import re
+from functools import lru_cache
+
+# Один скомпилированный токенизатор: знак, число с разделителями и необязательный суффикс
+# (\s покрывает и неразрывные пробелы, которые используют VK и YouTube);
+# суффикс не должен продолжаться буквой, чтобы "10 комментариев" не стало 10K
+_COUNT_RE = re.compile(
+    r'(?P<sign>-)?(?P<number>\d[\d\s.,]*)'
+    r'(?P<suffix>(?:млрд|млн|тыс[а-я]*|mln|bn|[kкmмbб])(?![^\W\d_]))?',
+    re.IGNORECASE
+)
+_SPACES_RE = re.compile(r'\s+')
+
+_MULTIPLIERS = {
+    'k': 1_000, 'к': 1_000, 'тыс': 1_000,
+    'm': 1_000_000, 'м': 1_000_000, 'млн': 1_000_000, 'mln': 1_000_000,
+    'b': 1_000_000_000, 'б': 1_000_000_000, 'млрд': 1_000_000_000, 'bn': 1_000_000_000,
+}
+
+_EMPTY_VALUES = {'', 'n/a', 'nan', 'none', 'неизвестно'}
+
+
+def parse_count(value):
+    """
+    Преобразует значение счетчика (просмотры, лайки и т.п.) в целое число
+
+    Поддерживает суффиксы K/M/B и тыс/млн/млрд, пробелы-разделители разрядов
+    и запятую или точку в качестве десятичного разделителя.
+
+    Args:
+        value: Число или строка вида "1,2K", "12 тыс. просмотров", "1 234 567"
+
+    Returns:
+        int: Целое значение счетчика (0, если значение не распознано)
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value == value else 0
+    return _parse_count_str(str(value))
+
+
+def parse_counts(values):
+    """
+    Пакетная версия parse_count для целой колонки значений
+
+    Args:
+        values (iterable): Значения счетчиков
+
+    Returns:
+        list: Список целых чисел той же длины
+    """
+    return [parse_count(value) for value in values]
+
+
+@lru_cache(maxsize=4096)
+def _parse_count_str(text):
+    """Разбирает строку счетчика; повторяющиеся строки берутся из кэша"""
+    text = text.strip()
+    if text.lower() in _EMPTY_VALUES:
+        return 0
+
+    match = _COUNT_RE.search(text)
+    if not match:
+        return 0
+
+    suffix = match.group('suffix')
+    number = _normalize_number(match.group('number'), has_suffix=bool(suffix))
+    if number is None:
+        return 0
+
+    if suffix:
+        suffix = suffix.lower()
+        number *= _MULTIPLIERS.get(suffix) or _MULTIPLIERS[suffix[:3]]
+    result = int(round(number, 6))
+    return -result if match.group('sign') else result
+
+
+def _normalize_number(raw, has_suffix):
+    """
+    Приводит числовую часть к float с учетом локали
+
+    Args:
+        raw (str): Числовая часть, например "1 234,5" или "1,234"
+        has_suffix (bool): Есть ли у числа множитель (K, млн и т.п.)
+
+    Returns:
+        float: Число или None, если разобрать не удалось
+    """
+    raw = _SPACES_RE.sub('', raw).rstrip('.,')
+    if not raw:
+        return None
+
+    has_comma = ',' in raw
+    has_dot = '.' in raw
+
+    if has_comma and has_dot:
+        # Последний из разделителей - десятичный, второй - разделитель разрядов
+        if raw.rfind(',') > raw.rfind('.'):
+            raw = raw.replace('.', '').replace(',', '.')
+        else:
+            raw = raw.replace(',', '')
+    elif has_comma or has_dot:
+        separator = ',' if has_comma else '.'
+        parts = raw.split(separator)
+        if has_suffix and len(parts) == 2:
+            # "1,5K" / "1.5K" - десятичная дробь
+            raw = '.'.join(parts)
+        elif len(parts) > 2 or len(parts[-1]) == 3:
+            # "1,234,567" / "1.234" - разделители разрядов
+            raw = ''.join(parts)
+        else:
+            raw = '.'.join(parts)
+
+    try:
+        return float(raw)
+    except ValueError:
+        return None
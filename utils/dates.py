@@ -0,0 +1,226 @@
+import re
+from calendar import monthrange
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Единицы относительных дат: префикс слова -> единица
+_UNIT_PREFIXES = (
+    ('сек', 'seconds'), ('sec', 'seconds'),
+    ('мин', 'minutes'), ('min', 'minutes'),
+    ('час', 'hours'), ('ч', 'hours'), ('hour', 'hours'), ('hr', 'hours'),
+    ('дн', 'days'), ('ден', 'days'), ('сут', 'days'), ('day', 'days'),
+    ('нед', 'weeks'), ('week', 'weeks'),
+    ('мес', 'months'), ('month', 'months'),
+    ('год', 'years'), ('лет', 'years'), ('year', 'years'),
+)
+
+_MONTHS = {
+    'янв': 1, 'фев': 2, 'мар': 3, 'апр': 4, 'май': 5, 'мая': 5, 'июн': 6,
+    'июл': 7, 'авг': 8, 'сен': 9, 'окт': 10, 'ноя': 11, 'дек': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH_NAMES = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+
+# Фиксированные слова: текст -> сдвиг в днях
+_DAY_WORDS = {
+    'только что': 0, 'just now': 0, 'сегодня': 0, 'today': 0,
+    'вчера': 1, 'yesterday': 1, 'позавчера': 2,
+}
+_DAY_WORDS_RE = re.compile(r'\b(' + '|'.join(sorted(_DAY_WORDS, key=len, reverse=True)) + r')\b')
+
+_RELATIVE_RE = re.compile(
+    r'(?:(?P<amount>\d+|an?|одн[уа]|один|полтора)\s*)?'
+    r'(?P<unit>[a-zа-яё]+)\.?\s+(?:назад|ago)\b'
+)
+_ISO_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[t\s](\d{2}):(\d{2})(?::(\d{2}))?)?')
+_COMPACT_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})$')
+_DOTTED_RE = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})')
+_DAY_MONTH_RE = re.compile(r'(\d{1,2})\s+(' + _MONTH_NAMES + r')[a-zа-яё]*\.?(?:\s+(\d{4}))?')
+_MONTH_DAY_RE = re.compile(r'(' + _MONTH_NAMES + r')[a-z]*\.?\s+(\d{1,2}),?(?:\s+(\d{4}))?')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def parse_date(value, now=None):
+    """
+    Преобразует дату публикации из любого поддерживаемого формата в datetime
+
+    Поддерживаются относительные даты ("вчера", "2 недели назад", "5 hours ago"),
+    абсолютные даты ("12.03.2024", "12 мар 2024", "Mar 12, 2024", "20240312",
+    ISO 8601), unix timestamp и готовые объекты datetime.
+
+    Args:
+        value: Строка, число (timestamp) или datetime
+        now (datetime, optional): Момент, относительно которого считаются относительные даты
+
+    Returns:
+        datetime: Дата публикации (без часового пояса) или None, если формат не распознан
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return _naive(value)
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value)
+        except (OverflowError, OSError, ValueError):
+            return None
+
+    spec = _compile_spec(_SPACES_RE.sub(' ', str(value).strip().lower()))
+    if spec is None:
+        return None
+    return _resolve(spec, now or datetime.now())
+
+
+def parse_dates(values, now=None):
+    """
+    Пакетная версия parse_date: все значения считаются относительно одного момента
+
+    Args:
+        values (iterable): Значения дат
+        now (datetime, optional): Момент отсчета для относительных дат
+
+    Returns:
+        list: Список datetime или None той же длины
+    """
+    now = now or datetime.now()
+    return [parse_date(value, now) for value in values]
+
+
+def days_since(date, now=None):
+    """
+    Возвращает возраст даты в полных днях
+
+    Args:
+        date (datetime): Дата публикации
+        now (datetime, optional): Момент отсчета
+
+    Returns:
+        int: Количество полных дней или None, если дата неизвестна
+    """
+    if date is None:
+        return None
+    return max(0, ((now or datetime.now()) - date).days)
+
+
+@lru_cache(maxsize=2048)
+def _compile_spec(text):
+    """
+    Разбирает строку даты в независимое от текущего времени описание
+
+    Результат кэшируется, поэтому повторяющиеся строки ("вчера",
+    "2 недели назад") разбираются один раз.
+    """
+    if not text:
+        return None
+
+    match = _COMPACT_RE.match(text)
+    if match:
+        return _absolute_spec(*map(int, match.groups()))
+
+    match = _ISO_RE.search(text)
+    if match:
+        year, month, day = map(int, match.groups()[:3])
+        hour, minute, second = (int(part or 0) for part in match.groups()[3:])
+        return _absolute_spec(year, month, day, hour, minute, second)
+
+    match = _DOTTED_RE.search(text)
+    if match:
+        day, month, year = map(int, match.groups())
+        if year < 100:
+            year += 2000
+        return _absolute_spec(year, month, day)
+
+    match = _RELATIVE_RE.search(text)
+    if match:
+        unit = _match_unit(match.group('unit'))
+        if unit:
+            return ('delta', unit, _parse_amount(match.group('amount')))
+
+    match = _DAY_WORDS_RE.search(text)
+    if match:
+        return ('delta', 'days', _DAY_WORDS[match.group(1)])
+
+    match = _DAY_MONTH_RE.search(text)
+    if match:
+        day, month_name, year = match.groups()
+        return _calendar_spec(int(day), _MONTHS[month_name], year)
+
+    match = _MONTH_DAY_RE.search(text)
+    if match:
+        month_name, day, year = match.groups()
+        return _calendar_spec(int(day), _MONTHS[month_name], year)
+
+    return None
+
+
+def _absolute_spec(year, month, day, hour=0, minute=0, second=0):
+    """Описание абсолютной даты (None для несуществующей даты)"""
+    try:
+        return ('absolute', datetime(year, month, day, hour, minute, second))
+    except ValueError:
+        return None
+
+
+def _calendar_spec(day, month, year):
+    """Описание даты с названием месяца; год может отсутствовать"""
+    if year:
+        return _absolute_spec(int(year), month, day)
+    if not 1 <= day <= 31:
+        return None
+    return ('no_year', month, day)
+
+
+def _match_unit(word):
+    """Определяет единицу времени по началу слова"""
+    for prefix, unit in _UNIT_PREFIXES:
+        if word.startswith(prefix):
+            return unit
+    return None
+
+
+def _parse_amount(amount):
+    """Количество единиц; слова без числа ("неделю назад", "a month ago") означают одну"""
+    if not amount or not amount[0].isdigit():
+        return 1
+    return int(amount)
+
+
+def _resolve(spec, now):
+    """Превращает закэшированное описание в конкретную дату"""
+    kind = spec[0]
+    if kind == 'absolute':
+        return spec[1]
+
+    if kind == 'no_year':
+        _, month, day = spec
+        day = min(day, monthrange(now.year, month)[1])
+        date = datetime(now.year, month, day)
+        # Дата без года из будущего относится к прошлому году
+        if date > now:
+            day = min(spec[2], monthrange(now.year - 1, month)[1])
+            date = datetime(now.year - 1, month, day)
+        return date
+
+    _, unit, amount = spec
+    if unit == 'months':
+        return _shift_months(now, -amount)
+    if unit == 'years':
+        return _shift_months(now, -12 * amount)
+    return now - timedelta(**{unit: amount})
+
+
+def _shift_months(date, months):
+    """Сдвигает дату на целое число календарных месяцев"""
+    month_index = date.year * 12 + date.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    day = min(date.day, monthrange(year, month)[1])
+    return date.replace(year=year, month=month, day=day)
+
+
+def _naive(date):
+    """Переводит дату с часовым поясом в локальное время без пояса"""
+    if date.tzinfo is None:
+        return date
+    return date.astimezone().replace(tzinfo=None)
@@ -0,0 +1,57 @@
+import lxml.html
+from lxml import etree
+
+
+def has_class(name):
+    """XPath-условие: у элемента есть CSS-класс name (аналог селектора .name)"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def compile_xpath(expression):
+    """
+    Компилирует XPath-выражение один раз при импорте парсера
+
+    Returns:
+        etree.XPath: Функция element -> список результатов
+    """
+    return etree.XPath(expression)
+
+
+def parse_html(html, markers=None):
+    """
+    Разбирает HTML через lxml
+
+    Если указаны markers, разбирается только часть документа, начиная с
+    тега, содержащего первый найденный маркер: заголовок и большие скрипты
+    перед нужными элементами не разбираются. Элементы, открытые до этого
+    тега, в дерево не попадают, поэтому маркер должен указывать на первый
+    из искомых элементов, а не на их общий контейнер.
+
+    Args:
+        html (str): HTML страницы
+        markers (tuple, optional): Подстроки, по которым ищется начало нужной части
+
+    Returns:
+        lxml.html.HtmlElement: Корень дерева или None, если маркеры не найдены или HTML пуст
+    """
+    if markers:
+        positions = [position for position in (html.find(marker) for marker in markers) if position >= 0]
+        if not positions:
+            return None
+        start = html.rfind('<', 0, min(positions))
+        html = html[max(start, 0):]
+    if not html.strip():
+        return None
+    return lxml.html.document_fromstring(html)
+
+
+def first(element, xpath):
+    """Первый результат предкомпилированного XPath или None"""
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def text_of(element, xpath, default=""):
+    """Текст первого найденного элемента без пробелов по краям (аналог select_one(...).text.strip())"""
+    found = first(element, xpath)
+    return found.text_content().strip() if found is not None else default
@@ -0,0 +1,80 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # Стандартный json медленнее, результат тот же
+    orjson = None
+
+# JSON-данные гидратации, которые TikTok и Instagram встраивают в страницу:
+# <script id="..." type="application/json">{...}</script> и window.<имя> = {...};
+SCRIPT_IDS = ('__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE', '__NEXT_DATA__')
+ASSIGNED_NAMES = ('_sharedData', '__additionalData')
+
+_SCRIPT_RE = re.compile(r"""<script[^>]*\bid=["'](%s)["'][^>]*>""" % '|'.join(map(re.escape, SCRIPT_IDS)))
+_ASSIGNMENT_RE = re.compile(r'window\.(%s)\s*=\s*' % '|'.join(map(re.escape, ASSIGNED_NAMES)))
+_decoder = json.JSONDecoder()
+
+
+def iter_hydration_data(html):
+    """
+    Находит и разбирает встроенные в страницу JSON-данные гидратации
+
+    Содержимое <script> с известным id разбирается целиком (orjson, если
+    установлен); присваивания window.<имя> = {...} разбираются с места
+    присваивания до конца объекта, без поиска закрывающего тега регулярным
+    выражением.
+
+    Args:
+        html (str): HTML страницы
+
+    Yields:
+        tuple: (имя блока, разобранные данные); неразбираемые блоки пропускаются
+    """
+    for match in _SCRIPT_RE.finditer(html):
+        end = html.find('</script>', match.end())
+        if end < 0:
+            continue
+        data = _loads(html[match.end():end])
+        if data is not None:
+            yield match.group(1), data
+
+    for match in _ASSIGNMENT_RE.finditer(html):
+        try:
+            data, _ = _decoder.raw_decode(html, match.end())
+        except ValueError:
+            continue
+        yield match.group(1), data
+
+
+def iter_objects(data, predicate):
+    """
+    Обходит вложенные словари и списки в порядке документа
+
+    Структура данных гидратации меняется от версии к версии сайта, поэтому
+    записи ищутся по форме (predicate), а не по фиксированному пути.
+
+    Args:
+        data: Разобранный JSON
+        predicate (callable): Проверка словаря; в найденные словари обход не спускается
+
+    Yields:
+        dict: Словари, для которых predicate истинен
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if predicate(value):
+                yield value
+                continue
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+
+def _loads(text):
+    try:
+        return orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:
+        return None
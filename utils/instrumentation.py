@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Агрегаты текущего процесса: (имя, метки) -> значения
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+@contextmanager
+def span(name, **labels):
+    """
+    Замеряет время выполнения блока кода
+
+    Пример:
+        with span("page_load", platform="vk"):
+            driver.get(url)
+
+    Args:
+        name (str): Название этапа
+        **labels: Метки этапа (платформа, запрос и т.п.)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        key = _key(name, labels)
+        with _lock:
+            stats = _spans.get(key)
+            if stats is None:
+                _spans[key] = [1, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+
+
+def incr(name, value=1, **labels):
+    """
+    Увеличивает счетчик
+
+    Args:
+        name (str): Название счетчика
+        value (int): Величина приращения
+        **labels: Метки счетчика
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def snapshot():
+    """
+    Возвращает копию накопленных метрик (для передачи из дочернего процесса)
+
+    Returns:
+        dict: Сериализуемый снимок метрик
+    """
+    with _lock:
+        return {
+            'spans': [[name, list(labels), *stats] for (name, labels), stats in _spans.items()],
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+        }
+
+
+def merge(data):
+    """
+    Добавляет к метрикам процесса снимок, полученный через snapshot()
+
+    Args:
+        data (dict): Снимок метрик другого процесса
+    """
+    if not data:
+        return
+    with _lock:
+        for name, labels, count, total, maximum in data.get('spans', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            stats = _spans.setdefault(key, [0, 0.0, 0.0])
+            stats[0] += count
+            stats[1] += total
+            stats[2] = max(stats[2], maximum)
+        for name, labels, value in data.get('counters', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            _counters[key] = _counters.get(key, 0) + value
+
+
+def reset():
+    """Сбрасывает накопленные метрики"""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def export(path):
+    """
+    Сохраняет метрики в файл: *.prom - текстовый формат Prometheus, иначе JSON lines
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        str: Путь к сохраненному файлу
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    data = snapshot()
+    if path.endswith('.prom'):
+        content = _format_prometheus(data)
+    else:
+        content = _format_json_lines(data)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def print_summary():
+    """Выводит сводку по этапам, отсортированную по суммарному времени"""
+    data = snapshot()
+    if not data['spans'] and not data['counters']:
+        return
+    if data['spans']:
+        print("\nВремя по этапам:")
+    for name, labels, count, total, maximum in sorted(data['spans'], key=lambda s: s[3], reverse=True):
+        print(f"  {_display_name(name, labels):<50} {total:9.2f} с  ({count} раз, макс. {maximum:.2f} с)")
+    if data['counters']:
+        print("\nСчетчики:" if not data['spans'] else "Счетчики:")
+        for name, labels, value in sorted(data['counters']):
+            print(f"  {_display_name(name, labels):<50} {value}")
+
+
+def instrument_driver(driver, platform):
+    """
+    Оборачивает WebDriver так, чтобы считались обращения к браузеру
+
+    Каждый вызов метода драйвера или элемента (get, find_element, execute_script,
+    чтение text и т.п.) - это отдельный запрос к браузеру, и он учитывается
+    в счетчике webdriver_roundtrips.
+
+    Args:
+        driver: Экземпляр WebDriver
+        platform (str): Платформа для метки счетчика
+
+    Returns:
+        Обертка над драйвером с тем же интерфейсом
+    """
+    if driver is None or isinstance(driver, _RoundtripCounter):
+        return driver
+    return _RoundtripCounter(driver, platform)
+
+
+class _RoundtripCounter:
+    """Прокси драйвера или элемента, считающий обращения к браузеру"""
+
+    __slots__ = ('_target', '_platform')
+
+    def __init__(self, target, platform):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_platform', platform)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            # Свойства вроде text и page_source тоже запрашиваются у браузера
+            incr("webdriver_roundtrips", platform=self._platform)
+            return value
+
+        def call(*args, **kwargs):
+            incr("webdriver_roundtrips", platform=self._platform)
+            args = [_unwrap(arg) for arg in args]
+            kwargs = {key: _unwrap(arg) for key, arg in kwargs.items()}
+            return self._wrap(value(*args, **kwargs))
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def _wrap(self, result):
+        if isinstance(result, list):
+            return [self._wrap(item) for item in result]
+        if hasattr(result, 'find_element'):
+            return _RoundtripCounter(result, self._platform)
+        return result
+
+
+def _unwrap(value):
+    """
+    Передает в Selenium исходный объект вместо прокси (например, в execute_script)
+
+    Прокси внутри списков, кортежей и словарей тоже заменяются: Selenium
+    сериализует аргументы скрипта в JSON и не знает о прокси.
+    """
+    if isinstance(value, _RoundtripCounter):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+def _display_name(name, labels):
+    if not labels:
+        return name
+    return f"{name}[{', '.join(f'{k}={v}' for k, v in labels)}]"
+
+
+def _format_json_lines(data):
+    lines = []
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    for name, labels, count, total, maximum in data['spans']:
+        lines.append(json.dumps({
+            'type': 'span', 'name': name, 'labels': dict(labels), 'count': count,
+            'total_seconds': round(total, 6), 'max_seconds': round(maximum, 6),
+            'pid': os.getpid(), 'timestamp': timestamp,
+        }, ensure_ascii=False))
+    for name, labels, value in data['counters']:
+        lines.append(json.dumps({
+            'type': 'counter', 'name': name, 'labels': dict(labels), 'value': value,
+            'pid': os.getpid(), 'timestamp': timestamp,
+        }, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+def _format_prometheus(data):
+    lines = [
+        "# HELP parser_span_seconds_total Суммарное время этапа",
+        "# TYPE parser_span_seconds_total counter",
+    ]
+    for name, labels, count, total, maximum in data['spans']:
+        lines.append(f"parser_span_seconds_total{_prometheus_labels(name, labels)} {total:.6f}")
+    lines += ["# HELP parser_span_count_total Количество выполнений этапа",
+              "# TYPE parser_span_count_total counter"]
+    for name, labels, count, total, maximum in data['spans']:
+        lines.append(f"parser_span_count_total{_prometheus_labels(name, labels)} {count}")
+    lines += ["# HELP parser_events_total Счетчики событий",
+              "# TYPE parser_events_total counter"]
+    for name, labels, value in data['counters']:
+        lines.append(f"parser_events_total{_prometheus_labels(name, labels, 'event')} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _prometheus_labels(name, labels, name_label='stage'):
+    pairs = [(name_label, name)] + [(k, v) for k, v in labels]
+    escaped = (f'{k}="{_escape_label(v)}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
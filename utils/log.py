@@ -0,0 +1,151 @@
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+import time
+
+# Корневой логгер проекта: компоненты получают дочерние логгеры parser.<компонент>
+ROOT_LOGGER = "parser"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(processName)s] %(name)s: %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+# Одинаковые сообщения (по шаблону) выводятся не чаще RATE_LIMIT_BURST раз за RATE_LIMIT_INTERVAL секунд
+RATE_LIMIT_INTERVAL = 10.0
+RATE_LIMIT_BURST = 5
+
+# Стандартные атрибуты LogRecord - все остальные поля пришли через extra
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_queue = None
+_listener = None
+_level = logging.INFO
+
+
+def get_logger(component):
+    """
+    Возвращает логгер компонента
+
+    Args:
+        component (str): Имя компонента (youtube, vk, parallel, ...)
+
+    Returns:
+        logging.Logger: Логгер parser.<component>
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+class StructuredFormatter(logging.Formatter):
+    """Форматтер, добавляющий к сообщению поля из extra в виде key=value"""
+
+    def format(self, record):
+        message = super().format(record)
+        fields = [f"{key}={value}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRS]
+        if fields:
+            message = f"{message} | {' '.join(fields)}"
+        return message
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает частоту повторяющихся сообщений
+
+    Сообщения сравниваются по логгеру и шаблону (до подстановки аргументов),
+    поэтому "Пропуск видео %s" для тысяч разных видео считается одним сообщением.
+    Количество подавленных повторов выводится со следующим пропущенным сообщением.
+    """
+
+    def __init__(self, interval=RATE_LIMIT_INTERVAL, burst=RATE_LIMIT_BURST):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows = {}
+
+    def filter(self, record):
+        # Предупреждения и ошибки не ограничиваются
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+def setup_logging(level="INFO"):
+    """
+    Настраивает логирование в основном процессе
+
+    Записи всех процессов попадают в общую очередь, которую разбирает
+    один QueueListener: вывод не перемешивается, а медленный stderr
+    не тормозит рабочие процессы. Частые повторы отсекаются в каждом
+    процессе до постановки в очередь.
+
+    Args:
+        level (str): Уровень логирования (DEBUG, INFO, WARNING, ERROR)
+    """
+    global _queue, _listener, _level
+    _level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if _listener is not None:
+        logging.getLogger(ROOT_LOGGER).setLevel(_level)
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(LOG_FORMAT, DATE_FORMAT))
+
+    # Очередь создается в контексте spawn, в котором запускаются пулы процессов (см. parallel_processing)
+    _queue = multiprocessing.get_context("spawn").Queue(-1)
+    _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    _attach_queue_handler(_queue, _level)
+
+
+def shutdown_logging():
+    """Дописывает оставшиеся в очереди записи и останавливает обработчик"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def worker_config():
+    """Параметры для init_worker: передаются в пул процессов через initargs"""
+    return (_queue, _level)
+
+
+def init_worker(queue, level):
+    """
+    Настраивает логирование в дочернем процессе (initializer для multiprocessing.Pool)
+
+    Args:
+        queue: Очередь записей основного процесса (None - логирование не настроено)
+        level (int): Уровень логирования
+    """
+    if queue is not None:
+        _attach_queue_handler(queue, level)
+
+
+def _attach_queue_handler(queue, level):
+    logger = logging.getLogger(ROOT_LOGGER)
+    # При fork дочерний процесс наследует обработчики родителя - заменяем их
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.handlers.QueueHandler(queue)
+    # Фильтр стоит до очереди: QueueHandler подставляет аргументы в сообщение,
+    # а лишние записи не стоит передавать между процессами
+    handler.addFilter(RateLimitFilter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
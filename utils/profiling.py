@@ -0,0 +1,235 @@
+import glob
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from utils.log import get_logger
+
+logger = get_logger("profiling")
+
+MODES = ('cprofile', 'sample')
+# Интервал между снимками стека в режиме sample (секунды)
+SAMPLE_INTERVAL = 0.005
+
+# Настройки профилирования текущего процесса: (режим, каталог) или None
+_config = None
+# Профилировщик процесса: (профилировщик, префикс, ID потока) или None
+_active = None
+_sections = Counter()
+_sections_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профилировщик с низкими накладными расходами
+
+    Фоновый поток периодически снимает стеки всех остальных потоков процесса
+    (сбор с платформ выполняется в отдельных потоках, см. pipeline.collect).
+    Подходит для долгих запусков с Selenium, где cProfile заметно замедляет
+    выполнение, а основное время уходит на ожидание браузера.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enable(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+
+def start(mode, out_dir, label="main"):
+    """
+    Запускает профилирование текущего процесса
+
+    Args:
+        mode (str): cprofile - точный профиль вызовов, sample - сэмплирование стека
+        out_dir (str): Каталог для файлов профиля
+        label (str): Префикс имен файлов
+    """
+    global _config, _active
+    if mode not in MODES:
+        raise ValueError(f"Неизвестный режим профилирования: {mode}")
+    os.makedirs(out_dir, exist_ok=True)
+    _config = (mode, out_dir)
+    _active = (_new_profiler(mode), label, threading.get_ident())
+    _active[0].enable()
+
+
+def stop():
+    """
+    Останавливает профилирование и сохраняет результаты
+
+    Returns:
+        list: Пути к сохраненным файлам
+    """
+    global _active
+    if _active is None:
+        return []
+    profiler, label, _ = _active
+    _active = None
+    profiler.disable()
+    return _write_profile(profiler, label)
+
+
+def worker_config():
+    """Параметры для init_worker: передаются в пул процессов через initargs"""
+    return _config
+
+
+def init_worker(config):
+    """
+    Включает профилирование задач в дочернем процессе
+
+    Args:
+        config (tuple): Режим и каталог из worker_config() (None - профилирование выключено)
+    """
+    global _config, _active
+    # При fork дочерний процесс наследует профилировщик родителя - отключаем его
+    if _active is not None:
+        _active[0].disable()
+        _active = None
+    _config = config
+
+
+@contextmanager
+def profile_section(label):
+    """
+    Профилирует блок кода, если профилирование включено в этом процессе
+
+    Используется в рабочих процессах пула и в потоках сбора с платформ:
+    каждая задача сохраняет собственные файлы с PID процесса в имени.
+    cProfile видит только поток, в котором включен, поэтому в других потоках
+    создается отдельный профиль; сэмплирующий профилировщик процесса
+    уже охватывает все потоки.
+
+    Args:
+        label (str): Префикс имен файлов
+    """
+    if _config is None or (_active is not None and (_config[0] == 'sample' or _active[2] == threading.get_ident())):
+        yield
+        return
+    profiler = _new_profiler(_config[0])
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: cProfile работает через sys.monitoring и допускает один профилировщик
+        # на процесс; профиль процесса уже охватывает этот поток, а сбор не должен прерываться
+        logger.debug("Профиль секции %s не включен: профилировщик процесса уже активен", label)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _write_profile(profiler, label)
+
+
+def print_summary(out_dir, limit=20):
+    """
+    Выводит самые затратные функции по всем файлам профиля в каталоге
+
+    Профили основного и рабочих процессов объединяются.
+
+    Args:
+        out_dir (str): Каталог с файлами профиля
+        limit (int): Количество функций в сводке
+    """
+    stats_files = sorted(glob.glob(os.path.join(out_dir, "*.pstats")))
+    if stats_files:
+        import pstats
+        stats = pstats.Stats(*stats_files, stream=sys.stdout)
+        print(f"\nСамые затратные функции ({len(stats_files)} файлов профиля, по собственному времени):")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+        return
+
+    samples = Counter()
+    for path in glob.glob(os.path.join(out_dir, "*.collapsed")):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    samples[stack.rsplit(';', 1)[-1]] += int(count)
+    total = sum(samples.values())
+    if not total:
+        return
+    print(f"\nСамые затратные функции ({total} снимков стека, по собственному времени):")
+    for name, count in samples.most_common(limit):
+        print(f"  {count / total * 100:5.1f}%  {count:7}  {name}")
+
+
+def _new_profiler(mode):
+    if mode == 'cprofile':
+        # cProfile и pstats импортируются только при включенном профилировании
+        import cProfile
+        return cProfile.Profile()
+    return SamplingProfiler()
+
+
+def _write_profile(profiler, label):
+    """Сохраняет профиль: pstats (только cprofile) и свернутые стеки для flamegraph"""
+    _, out_dir = _config
+    with _sections_lock:
+        _sections[label] += 1
+        base = os.path.join(out_dir, f"{label}_{os.getpid()}_{_sections[label]}")
+    paths = []
+
+    if not isinstance(profiler, SamplingProfiler):
+        profiler.dump_stats(base + ".pstats")
+        paths.append(base + ".pstats")
+        stacks = _collapse_cprofile(profiler)
+    else:
+        stacks = profiler.stacks
+
+    with open(base + ".collapsed", 'w', encoding='utf-8') as f:
+        for stack, count in stacks.items():
+            f.write(f"{stack} {count}\n")
+    paths.append(base + ".collapsed")
+
+    logger.debug("Профиль сохранен: %s", ", ".join(paths))
+    return paths
+
+
+def _collapse_cprofile(profiler):
+    """
+    Свернутые стеки из cProfile
+
+    cProfile хранит только пары вызывающий -> вызываемый, поэтому стеки
+    получаются двухуровневыми; вес - собственное время в микросекундах.
+    """
+    import pstats
+    stacks = Counter()
+    for func, (_, _, _, _, callers) in pstats.Stats(profiler).stats.items():
+        name = _frame_name(*func)
+        for caller, caller_stats in callers.items():
+            weight = int(caller_stats[2] * 1e6)
+            if weight:
+                stacks[f"{_frame_name(*caller)};{name}"] += weight
+    return stacks
+
+
+def _frame_name(filename, lineno, funcname):
+    if filename == '~':
+        return funcname
+    return f"{funcname} ({os.path.basename(filename)}:{lineno})"
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlparse
+
+from utils.instrumentation import incr
+from utils.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: ограничение действует только внутри процесса
+    fcntl = None
+
+logger = get_logger("rate_limit")
+
+# Каталог общего состояния ограничителей (один файл на платформу)
+STATE_DIR = os.path.join(tempfile.gettempdir(), "parser_rate_limit")
+# Максимальная пауза после повторных блокировок (секунды)
+MAX_COOLDOWN = 3600
+# Блокировка, случившаяся позже этого числа пауз после предыдущей, не считается повторной
+STRIKE_RESET_FACTOR = 4
+# Максимальный шаг ожидания: состояние перечитывается, чтобы заметить новую блокировку
+MAX_WAIT_STEP = 5.0
+
+# Признаки ограничения запросов или проверки на бота в текстах ошибок (HTTP 429, проверка YouTube)
+BLOCK_PATTERN = re.compile(r"HTTP Error 429|too many requests|confirm you.?re not a bot|unusual traffic",
+                           re.IGNORECASE)
+# Страницы проверки, на которые платформы перенаправляют при блокировке. Сравнивается
+# только путь: запрос "dance challenge" или тег #icebucketchallenge блокировкой не считаются
+BLOCK_PATH_PATTERN = re.compile(r"^/(?:challenge|captcha|checkpoint|sorry|accounts/login)(?:[/.]|$)",
+                                re.IGNORECASE)
+
+_thread_lock = threading.Lock()
+
+
+def is_block_message(message):
+    """Проверяет, указывает ли текст ошибки на блокировку (429 или проверку на бота)"""
+    return bool(message) and BLOCK_PATTERN.search(message) is not None
+
+
+def is_block_url(url):
+    """Проверяет, является ли адрес страницей проверки или капчи (параметры запроса не учитываются)"""
+    return bool(url) and BLOCK_PATH_PATTERN.search(urlparse(url).path) is not None
+
+
+class RateLimiter:
+    """
+    Ограничитель запросов к платформе, общий для всех потоков и процессов
+
+    Маркерная корзина (token bucket): запросы выполняются не чаще rate
+    в секунду с допустимым всплеском burst. Состояние хранится в файле под
+    блокировкой fcntl, поэтому ограничение разделяют рабочие процессы
+    --parallel, планировщик и параллельно запущенные main.py.
+
+    Если один из сборщиков получил 429 или капчу (report_block), выключатель
+    (circuit breaker) приостанавливает запросы к платформе во всех процессах
+    на время паузы; повторные блокировки удваивают паузу.
+
+    Args:
+        platform (str): Название платформы
+        min_interval (float): Средний интервал между запросами (секунды)
+        burst (int): Сколько запросов можно выполнить подряд без ожидания
+        cooldown (float): Пауза после первой блокировки (секунды)
+        state_dir (str): Каталог файлов состояния
+    """
+
+    def __init__(self, platform, min_interval=1.0, burst=1, cooldown=60, state_dir=STATE_DIR):
+        self.platform = platform
+        # None - ограничивается только пауза после блокировки
+        self.rate = 1.0 / min_interval if min_interval > 0 else None
+        self.burst = max(1, burst)
+        self.cooldown = cooldown
+        self.path = os.path.join(state_dir, f"{platform}.json")
+        os.makedirs(state_dir, exist_ok=True)
+
+    def acquire(self):
+        """
+        Ожидает разрешения на один запрос
+
+        Returns:
+            float: Время ожидания в секундах
+        """
+        waited = 0.0
+        announced = False
+        while True:
+            with self._state() as state:
+                now = time.time()
+                if state['blocked_until'] > now:
+                    wait = state['blocked_until'] - now
+                    if not announced:
+                        logger.info("Запросы к %s приостановлены еще на %.0f с", self.platform, wait)
+                        announced = True
+                elif self.rate is None:
+                    break
+                else:
+                    elapsed = max(0.0, now - state['updated'])
+                    state['tokens'] = min(self.burst, state['tokens'] + elapsed * self.rate)
+                    state['updated'] = now
+                    if state['tokens'] >= 1:
+                        state['tokens'] -= 1
+                        break
+                    wait = (1 - state['tokens']) / self.rate
+            wait = min(wait, MAX_WAIT_STEP)
+            time.sleep(wait)
+            waited += wait
+
+        if waited:
+            incr("rate_limit_wait_ms", int(waited * 1000), platform=self.platform)
+        return waited
+
+    def report_block(self, reason):
+        """
+        Сообщает о блокировке (429, капча) и приостанавливает запросы во всех процессах
+
+        Args:
+            reason (str): Описание блокировки для лога
+        """
+        with self._state() as state:
+            now = time.time()
+            if state['blocked_until'] > now:
+                # Блокировку уже заметил другой сборщик
+                return
+            if now - state['last_block'] > self.cooldown * 2 ** state['strikes'] * STRIKE_RESET_FACTOR:
+                state['strikes'] = 0
+            pause = min(MAX_COOLDOWN, self.cooldown * 2 ** state['strikes'])
+            state['strikes'] += 1
+            state['last_block'] = now
+            state['blocked_until'] = now + pause
+            state['tokens'] = 0.0
+        incr("rate_limit_blocks", platform=self.platform)
+        logger.warning("Блокировка на %s (%s): запросы всех процессов приостановлены на %.0f с",
+                       self.platform, reason, pause)
+
+    @contextmanager
+    def _state(self):
+        """Читает и сохраняет состояние под межпроцессной блокировкой"""
+        with _thread_lock if fcntl is None else nullcontext():
+            with open(self.path, 'a+', encoding='utf-8') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                state.setdefault('tokens', float(self.burst))
+                state.setdefault('updated', time.time())
+                state.setdefault('blocked_until', 0.0)
+                state.setdefault('last_block', 0.0)
+                state.setdefault('strikes', 0)
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
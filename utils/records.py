@@ -0,0 +1,164 @@
+from datetime import datetime
+from utils.counts import parse_count
+from utils.dates import parse_date
+
+UNKNOWN = "Неизвестно"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+# Поля с целочисленными метриками
+COUNT_FIELDS = ('views', 'likes', 'comments', 'shares',
+                'views_growth', 'likes_growth', 'comments_growth')
+# Поля с дробными метриками
+FLOAT_FIELDS = ('views_velocity', 'likes_velocity', 'comments_velocity', 'viral_score')
+
+
+class VideoRecord:
+    """
+    Компактное типизированное представление одного видео
+
+    Все числовые метрики хранятся как int/float, даты - как datetime.
+    Преобразование в строки выполняется только на границах:
+    при сохранении в CSV (to_dict) и при загрузке истории (from_dict).
+    """
+
+    __slots__ = ('platform', 'video_id', 'title', 'url',
+                 'views', 'likes', 'comments', 'shares',
+                 'publish_date', 'channel', 'query', 'collected_at',
+                 'views_growth', 'likes_growth', 'comments_growth',
+                 'views_velocity', 'likes_velocity', 'comments_velocity',
+                 'viral_score')
+
+    def __init__(self, platform, video_id, title='', url='',
+                 views=0, likes=0, comments=0, shares=0,
+                 publish_date=None, channel=UNKNOWN, query='', collected_at=None,
+                 views_growth=0, likes_growth=0, comments_growth=0,
+                 views_velocity=0.0, likes_velocity=0.0, comments_velocity=0.0,
+                 viral_score=0.0):
+        self.platform = platform
+        self.video_id = video_id
+        self.title = title
+        self.url = url
+        self.views = views
+        self.likes = likes
+        self.comments = comments
+        self.shares = shares
+        self.publish_date = publish_date
+        self.channel = channel
+        self.query = query
+        self.collected_at = collected_at or datetime.now().replace(microsecond=0)
+        self.views_growth = views_growth
+        self.likes_growth = likes_growth
+        self.comments_growth = comments_growth
+        self.views_velocity = views_velocity
+        self.likes_velocity = likes_velocity
+        self.comments_velocity = comments_velocity
+        self.viral_score = viral_score
+
+    def __repr__(self):
+        return f"VideoRecord({self.platform!r}, {self.video_id!r}, views={self.views})"
+
+    @property
+    def key(self):
+        """Ключ для сопоставления видео между замерами"""
+        return (self.platform, self.video_id)
+
+    @property
+    def days_ago(self):
+        """Возраст видео в днях на момент сбора или None, если дата неизвестна"""
+        if self.publish_date is None:
+            return None
+        return max(0, (self.collected_at - self.publish_date).days)
+
+    @property
+    def publish_date_formatted(self):
+        """Дата публикации для отображения"""
+        if self.publish_date is None:
+            return UNKNOWN
+        return self.publish_date.strftime(DATE_FORMAT)
+
+    def to_dict(self):
+        """
+        Преобразует запись в словарь для сохранения в CSV или построения отчета
+
+        Returns:
+            dict: Словарь с ключами в формате истории (числа остаются числами)
+        """
+        days_ago = self.days_ago
+        return {
+            'platform': self.platform,
+            'title': self.title,
+            'url': self.url,
+            'video_id': self.video_id,
+            'views': self.views,
+            'likes': self.likes,
+            'comments': self.comments,
+            'shares': self.shares,
+            'publish_time': self.publish_date_formatted,
+            'publish_date_formatted': self.publish_date_formatted,
+            'days_ago': days_ago if days_ago is not None else UNKNOWN,
+            'channel': self.channel,
+            'query': self.query,
+            'collected_at': self.collected_at.strftime(TIMESTAMP_FORMAT),
+            'views_growth': self.views_growth,
+            'likes_growth': self.likes_growth,
+            'comments_growth': self.comments_growth,
+            'views_velocity': self.views_velocity,
+            'likes_velocity': self.likes_velocity,
+            'comments_velocity': self.comments_velocity,
+            'viral_score': self.viral_score,
+        }
+
+    @classmethod
+    def from_dict(cls, row):
+        """
+        Создает запись из словаря (строка CSV истории или словарь старого формата)
+
+        Args:
+            row (dict): Словарь с данными о видео
+
+        Returns:
+            VideoRecord: Типизированная запись
+        """
+        record = cls(
+            platform=row.get('platform', UNKNOWN),
+            video_id=row.get('video_id'),
+            title=row.get('title', ''),
+            url=row.get('url', ''),
+            publish_date=parse_date(row.get('publish_date_formatted') or row.get('publish_time')),
+            channel=row.get('channel') or row.get('author') or UNKNOWN,
+            query=row.get('query', ''),
+            collected_at=_parse_timestamp(row.get('collected_at')),
+        )
+        for field in COUNT_FIELDS:
+            setattr(record, field, parse_count(row.get(field)))
+        for field in FLOAT_FIELDS:
+            setattr(record, field, _to_float(row.get(field)))
+        return record
+
+
+def as_record(item):
+    """Возвращает VideoRecord для записи или словаря старого формата"""
+    if isinstance(item, VideoRecord):
+        return item
+    return VideoRecord.from_dict(item)
+
+
+def _to_float(value):
+    """Безопасно преобразует значение в дробное число"""
+    if value is None or value == '':
+        return 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _parse_timestamp(value):
+    """Разбирает время сбора данных"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except (ValueError, TypeError):
+        return None
@@ -1,15 +1,24 @@
 import os
+import re
 import csv
 import glob
 import time
+import threading
 from datetime import datetime
+from utils.records import VideoRecord
+from utils.log import get_logger
+
+logger = get_logger("storage")
+
+# Имя файла истории: viral_videos_<запрос>_<время сбора>.csv
+_HISTORY_FILE_RE = re.compile(r'^viral_videos_(?P<query>.+)_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.csv$')
 
 def save_to_csv(data, filename):
     """
     Сохраняет данные в CSV-файл
     
     Args:
-        data (list): Список словарей с данными
+        data (list): Список записей VideoRecord (или словарей)
         filename (str): Имя файла для сохранения
         
     Returns:
@@ -20,13 +29,16 @@ def save_to_csv(data, filename):
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         
         if not data:
-            print(f"Нет данных для сохранения в {filename}")
+            logger.warning("Нет данных для сохранения в %s", filename)
             return False
             
+        # Записи преобразуются в строки только здесь, на границе хранения
+        rows = [item.to_dict() if isinstance(item, VideoRecord) else item for item in data]
+        
         # Определяем заголовки (все возможные ключи)
         fieldnames = set()
-        for item in data:
-            fieldnames.update(item.keys())
+        for row in rows:
+            fieldnames.update(row.keys())
         
         fieldnames = sorted(list(fieldnames))
         
@@ -34,16 +46,16 @@ def save_to_csv(data, filename):
         with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
-            writer.writerows(data)
+            writer.writerows(rows)
             
         # Убираем дублирующее сообщение - здесь будем выводить только при сохранении в основной файл, 
         # а не в history
         if not '/history/' in filename:
-            print(f"Данные сохранены в {filename}")
+            logger.info("Данные сохранены в %s", filename)
         return True
         
     except Exception as e:
-        print(f"Ошибка при сохранении данных в CSV: {e}")
+        logger.error("Ошибка при сохранении данных в CSV: %s", e)
         return False
 
 def load_previous_data(query=None):
@@ -54,7 +66,7 @@ def load_previous_data(query=None):
         query (str, optional): Поисковый запрос для загрузки данных
         
     Returns:
-        list: Список словарей с предыдущими данными
+        list: Список записей VideoRecord с предыдущими данными
     """
     try:
         # Находим все CSV-файлы в папке history
@@ -73,26 +85,110 @@ def load_previous_data(query=None):
         # Проверяем, не слишком ли старый файл (более 7 дней)
         file_age = time.time() - os.path.getmtime(latest_file)
         if file_age > 7 * 24 * 60 * 60:  # Более 7 дней
-            print(f"Предупреждение: последний файл данных старше 7 дней ({latest_file})")
+            logger.warning("Последний файл данных старше 7 дней (%s)", latest_file)
         
         # Загружаем данные
         result = []
         with open(latest_file, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                # Преобразуем числовые значения к числам
-                for key in row:
-                    if key in ['views', 'likes', 'comments', 'shares', 'views_growth', 
-                               'likes_growth', 'comments_growth', 'views_velocity', 
-                               'likes_velocity', 'comments_velocity', 'viral_score']:
-                        try:
-                            row[key] = int(float(row[key])) if '.' in row[key] else int(row[key])
-                        except (ValueError, TypeError):
-                            pass
-                result.append(row)
+                # Числовые значения и даты разбираются один раз при загрузке
+                result.append(VideoRecord.from_dict(row))
                 
         return result
     
     except Exception as e:
-        print(f"Ошибка при загрузке предыдущих данных: {e}")
-        return []
\ No newline at end of file
+        logger.error("Ошибка при загрузке предыдущих данных: %s", e)
+        return []
+
+def load_history_bulk(queries=None):
+    """
+    Загружает последние замеры сразу для нескольких запросов
+    
+    Каталог истории просматривается один раз, а для каждого запроса
+    читается только его самый свежий файл.
+    
+    Args:
+        queries (iterable, optional): Поисковые запросы (None - все запросы из истории)
+        
+    Returns:
+        dict: Запрос -> список записей VideoRecord (пустой, если истории нет)
+    """
+    wanted = {query.replace(' ', '_'): query for query in queries} if queries is not None else None
+    latest = {}
+    for path in glob.glob("data/history/viral_videos_*.csv"):
+        match = _HISTORY_FILE_RE.match(os.path.basename(path))
+        if not match:
+            continue
+        if wanted is None:
+            # Пробелы в имени файла заменены на "_", точный запрос хранится в самих записях
+            query = match.group('query')
+        elif match.group('query') in wanted:
+            query = wanted[match.group('query')]
+        else:
+            continue
+        mtime = os.path.getmtime(path)
+        if query not in latest or mtime > latest[query][0]:
+            latest[query] = (mtime, path)
+    
+    result = {query: [] for query in wanted.values()} if wanted is not None else {}
+    for query, (_, path) in latest.items():
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                result[query] = [VideoRecord.from_dict(row) for row in csv.DictReader(f)]
+        except Exception as e:
+            logger.error("Ошибка при загрузке истории из %s: %s", path, e)
+    return result
+
+class HistoryIndex:
+    """
+    Последние замеры по запросам, хранящиеся в памяти
+    
+    При периодическом сборе история по запросу читается с диска только
+    один раз, дальше индекс обновляется свежими результатами каждого цикла.
+    """
+    
+    def __init__(self):
+        self._latest = {}
+        self._lock = threading.Lock()
+    
+    def get(self, query):
+        """
+        Возвращает последний замер по запросу (при первом обращении загружает его с диска)
+        
+        Args:
+            query (str): Поисковый запрос
+            
+        Returns:
+            list: Список записей VideoRecord
+        """
+        with self._lock:
+            records = self._latest.get(query)
+        if records is None:
+            records = load_previous_data(query)
+            with self._lock:
+                records = self._latest.setdefault(query, records)
+        return records
+    
+    def preload(self, histories):
+        """
+        Заполняет индекс заранее загруженной историей (см. load_history_bulk)
+        
+        Args:
+            histories (dict): Запрос -> список записей VideoRecord
+        """
+        with self._lock:
+            for query, records in histories.items():
+                self._latest.setdefault(query, records)
+    
+    def update(self, query, records):
+        """
+        Запоминает свежий замер по запросу
+        
+        Args:
+            query (str): Поисковый запрос
+            records (list): Записи VideoRecord последнего замера
+        """
+        with self._lock:
+            self._latest[query] = list(records)
+
@@ -10,6 +10,7 @@ import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.util import ngrams
+from utils.records import as_record
 
 # Скачиваем необходимые данные для NLTK при первом использовании
 try:
@@ -27,27 +28,28 @@ def generate_dashboard(data, query):
     с анализом ключевых слов
     
     Args:
-        data (list): Список словарей с данными о видео
+        data (list): Список записей VideoRecord с данными о видео
         query (str): Поисковый запрос
         
     Returns:
         str: Путь к сохраненному файлу визуализации
     """
     try:
-        # Конвертируем в DataFrame
-        df = pd.DataFrame(data)
+        # Конвертируем в DataFrame: числовые колонки в записях уже целые
+        records = [as_record(item) for item in data]
+        df = pd.DataFrame({
+            'title': [r.title for r in records],
+            'views': [r.views for r in records],
+            'likes': [r.likes for r in records],
+            'comments': [r.comments for r in records],
+            'days_ago': [r.days_ago for r in records],
+        })
         
         # Проверяем, есть ли данные
         if len(df) == 0:
             print("Недостаточно данных для визуализации")
             return None
         
-        # Конвертируем числовые колонки
-        numeric_cols = ['views', 'likes', 'comments']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-        
         # Создаем директорию для визуализаций
         os.makedirs('visualization/output', exist_ok=True)
         
@@ -93,11 +95,8 @@ def generate_dashboard(data, query):
         plt.subplot(3, 2, 4)
         if 'days_ago' in df.columns and len(df) > 0:
             try:
-                # Конвертируем в числовой формат, если нужно
-                if df['days_ago'].dtype == 'object':
-                    df['days_ago_num'] = pd.to_numeric(df['days_ago'], errors='coerce')
-                else:
-                    df['days_ago_num'] = df['days_ago']
+                # Неизвестный возраст (None) становится NaN
+                df['days_ago_num'] = df['days_ago'].astype(float)
                 
                 # Создаем bins для гистограммы
                 bins = [0, 1, 3, 7, 14, 30, 60, 90, 180, 365]
@@ -4,6 +4,7 @@ import json
 import csv
 from collections import Counter
 from datetime import datetime
+from utils.records import as_record, UNKNOWN
 
 def generate_html_report(data, query):
     """
@@ -11,7 +12,7 @@ def generate_html_report(data, query):
     без зависимостей от numpy/pandas/matplotlib
     
     Args:
-        data (list): Список словарей с данными о видео
+        data (list): Список записей VideoRecord с данными о видео
         query (str): Поисковый запрос
         
     Returns:
@@ -21,21 +22,14 @@ def generate_html_report(data, query):
         # Создаем директорию для отчетов
         os.makedirs('visualization/output', exist_ok=True)
         
-        # Подготовка данных для отчета
-        # Преобразуем числовые значения
-        for item in data:
-            for key in ['views', 'likes', 'comments']:
-                if key in item:
-                    try:
-                        item[key] = int(item[key])
-                    except:
-                        item[key] = 0
+        # Подготовка данных для отчета: метрики в записях уже числовые
+        data = [as_record(item) for item in data]
         
         # Сортировка по просмотрам
-        top_videos = sorted(data, key=lambda x: x.get('views', 0), reverse=True)[:10]
+        top_videos = sorted(data, key=lambda x: x.views, reverse=True)[:10]
         
         # Анализ ключевых слов
-        all_titles = [item.get('title', '') for item in data]
+        all_titles = [item.title for item in data]
         keywords = analyze_keywords(all_titles)
         keyword_phrases = analyze_keyword_phrases(all_titles)  # Добавлен анализ сочетаний слов
         question_keywords = analyze_question_keywords(all_titles)
@@ -73,8 +67,8 @@ def generate_html_report(data, query):
             <div class="stats">
                 <p><strong>Дата создания:</strong> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
                 <p><strong>Всего собрано видео:</strong> {len(data)}</p>
-                <p><strong>Общее количество просмотров:</strong> {sum(item.get('views', 0) for item in data):,}</p>
-                <p><span class="date-info">⚠️ Фильтр по дате:</span> Только видео за последние {data[0].get('days_ago', 'Неизвестно')} дней</p>
+                <p><strong>Общее количество просмотров:</strong> {sum(item.views for item in data):,}</p>
+                <p><span class="date-info">⚠️ Фильтр по дате:</span> Только видео за последние {data[0].days_ago if data[0].days_ago is not None else UNKNOWN} дней</p>
             </div>
             
             <div class="section">
@@ -95,18 +89,18 @@ def generate_html_report(data, query):
         
         # Топ-10 видео по просмотрам
         for i, item in enumerate(top_videos, 1):
-            title = item.get('title', '')
+            title = item.title
             if len(title) > 50:
                 title = title[:47] + "..."
                 
             # Форматирование числовых значений
-            views = f"{item.get('views', 0):,}"
-            likes = f"{item.get('likes', 0):,}"
-            comments = f"{item.get('comments', 0):,}"
+            views = f"{item.views:,}"
+            likes = f"{item.likes:,}"
+            comments = f"{item.comments:,}"
             
             # Обработка даты публикации
-            pub_date = item.get('publish_date_formatted', 'Неизвестно')
-            days_ago = item.get('days_ago', 'Неизвестно')
+            pub_date = item.publish_date_formatted
+            days_ago = item.days_ago if item.days_ago is not None else UNKNOWN
             
             # Проверка возраста видео для выделения старых видео
             date_style = ""
@@ -116,14 +110,14 @@ def generate_html_report(data, query):
             html_content += f"""
                     <tr>
                         <td>{i}</td>
-                        <td>{item.get('platform', '')}</td>
+                        <td>{item.platform}</td>
                         <td>{title}</td>
                         <td>{views}</td>
                         <td>{likes}</td>
                         <td>{comments}</td>
                         <td{date_style}>{pub_date}</td>
                         <td{date_style}>{days_ago}</td>
-                        <td><a href="{item.get('url', '#')}" target="_blank">Открыть</a></td>
+                        <td><a href="{item.url or '#'}" target="_blank">Открыть</a></td>
                     </tr>
             """
         
@@ -445,8 +439,8 @@ def analyze_keywords_by_views(data):
         }
         
         for item in data:
-            title = item.get('title', '')
-            views = item.get('views', 0)
+            title = item.title
+            views = item.views
             
             if not isinstance(title, str) or not views:
                 continue